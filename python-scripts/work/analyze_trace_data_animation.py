@@ -33,28 +33,71 @@
 import pandas as pd
 import numpy as np
 import os
-import tempfile
+import argparse
+import concurrent.futures
+import contextlib
+import cProfile
 import shutil
 import glob
+import decimal
+import hashlib
+import html
+import io
+import json
 import logging
+import pickle
+import re
+import multiprocessing
+import threading
+import time
 import holoviews as hv
 from holoviews import opts
 import holoviews.operation.datashader as hd
 import panel as pn
 import imageio.v2 as imageio
-from bokeh.io import export_png
+from bokeh.embed import file_html
+from bokeh.io.export import get_screenshot_as_png
+from bokeh.layouts import column
+from bokeh.models import ColumnDataSource, CustomJS, HoverTool, Range1d, Slider
+from bokeh.plotting import figure
+from bokeh.resources import CDN
+from bokeh.themes import built_in_themes
+from PIL import GifImagePlugin, Image
 from selenium import webdriver
 from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.util import Finalize
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.patches import PathPatch
+    from matplotlib.path import Path
+except ImportError:  # only needed for the browser-free 'agg' GIF backend
+    Figure = FigureCanvasAgg = PathPatch = Path = None
 
 hv.extension('bokeh')
 hv.renderer('bokeh').theme = 'dark_minimal'
 
 def apply_light_background(plot, element):
     """Force a light background and dark text/grid colors for a specific plot."""
-    fig = plot.state
+    _style_light_figure(plot.state)
+
+def _style_light_figure(fig):
+    """Apply the light background and dark text/grid colors to a Bokeh figure."""
     fig.background_fill_color = 'white'
     fig.border_fill_color = 'white'
     fig.outline_line_color = 'black'
@@ -77,6 +120,210 @@ THIRTYTHREE_COLOR_PALETTE = [
     '#637C8F','#B56E75','#C98F8F','#DFB6AE','#EDD5CA','#D5A3A6', '#BD7182','#9E5476','#753C6A'
 ]
 
+# Columns of the trace CSV that the analysis actually uses; everything else is never read
+ANALYSIS_COLUMNS = ['TLP Type', 'Link Dir', 'Length', 'Address', 'DATA', 'Time Stamp']
+
+# Keep these as strings so every chunk gets the same dtypes regardless of its contents
+ANALYSIS_STRING_DTYPES = {'TLP Type': str, 'Link Dir': str, 'Address': str, 'DATA': str, 'Time Stamp': str}
+
+# Low-cardinality text columns, stored as categoricals once a chunk has been filtered
+CATEGORICAL_COLUMNS = ['TLP Type', 'Link Dir']
+
+# Number of CSV rows parsed per chunk while streaming a trace from disk
+CSV_CHUNK_ROWS = 500_000
+
+def _peak_rss_mb():
+    """Return the peak resident set size of this process in MB, or None if it cannot be determined."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+        return peak / (1024 * 1024) if os.uname().sysname == 'Darwin' else peak / 1024
+    if psutil is not None:
+        mem_info = psutil.Process().memory_info()
+        return getattr(mem_info, 'peak_wset', mem_info.rss) / (1024 * 1024)
+    return None
+
+def _current_rss_bytes():
+    """Return the current resident set size of this process in bytes, or None if it cannot be determined."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+# ----------------------------------------------------------------------------------------------------
+# Profiling (--profile): the pipeline marks its stages with profile_stage(), which records nothing unless
+# a profiling() block is active in this process. Stages nest, and a stage entered several times (one per
+# CSV chunk, say) accumulates its calls into one entry named by its path, e.g. 'load/read_csv'.
+# ----------------------------------------------------------------------------------------------------
+
+# Seconds between RSS samples taken to find the peak memory of each open stage
+PROFILE_SAMPLE_SECONDS = 0.01
+
+# File written next to analysis_report.html with the metrics of every stage
+PROFILE_METRICS_FILENAME = 'profile_metrics.json'
+
+class StageProfiler:
+    """Wall time, CPU time, peak RSS and row counts of named, nestable pipeline stages.
+
+    Peak RSS is sampled every PROFILE_SAMPLE_SECONDS by a background thread; when the process-wide peak
+    rises during a stage, that exact peak is used instead. With cprofile_dir, every top-level stage also
+    runs under cProfile (which cannot nest) and is dumped to <cprofile_dir>/<stage>.prof.
+    """
+
+    def __init__(self, cprofile_dir=None):
+        self.cprofile_dir = cprofile_dir
+        self.pid = os.getpid()
+        self.stages = {}
+        self._open_paths = []
+        self._open_peaks = []
+        self._cprofiles = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._start_time = time.perf_counter()
+
+    def start(self):
+        if _current_rss_bytes() is not None:
+            self._sampler = threading.Thread(target=self._sample_rss, name='profile-rss-sampler', daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self.cprofile_dir is not None and self._cprofiles:
+            os.makedirs(self.cprofile_dir, exist_ok=True)
+            for path, profiler in self._cprofiles.items():
+                profiler.dump_stats(os.path.join(self.cprofile_dir, f"{path.replace(' ', '_')}.prof"))
+
+    def _sample_rss(self):
+        while not self._stop.wait(PROFILE_SAMPLE_SECONDS):
+            rss = _current_rss_bytes()
+            with self._lock:
+                self._open_peaks = [max(peak, rss) for peak in self._open_peaks]
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Measure the block as stage `name` inside the currently open stage; set `rows` on the yielded
+        dict to record how many rows the block handled."""
+        path = '/'.join(self._open_paths[-1:] + [name])
+        call = {'rows': None}
+        entry = self.stages.setdefault(path, {
+            'stage': path, 'depth': path.count('/'), 'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+            'child_cpu_seconds': 0.0, 'peak_rss_mb': None, 'rss_change_mb': 0.0, 'rows': None
+        })
+        profiler = None
+        if self.cprofile_dir is not None and not self._open_paths:
+            profiler = self._cprofiles.setdefault(path, cProfile.Profile())
+        start_rss = _current_rss_bytes() or 0
+        start_peak_rss_mb = _peak_rss_mb()
+        with self._lock:
+            self._open_paths.append(path)
+            self._open_peaks.append(start_rss)
+        start_times = os.times()
+        start_wall = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield call
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - start_wall
+            end_times = os.times()
+            end_rss = _current_rss_bytes() or 0
+            with self._lock:
+                self._open_paths.pop()
+                peak_rss = max(self._open_peaks.pop(), end_rss)
+            peak_rss_mb = peak_rss / (1024 * 1024)
+            end_peak_rss_mb = _peak_rss_mb()
+            if start_peak_rss_mb is not None and end_peak_rss_mb is not None and end_peak_rss_mb > start_peak_rss_mb:
+                peak_rss_mb = max(peak_rss_mb, end_peak_rss_mb)
+
+            entry['calls'] += 1
+            entry['wall_seconds'] += wall
+            entry['cpu_seconds'] += (end_times.user - start_times.user) + (end_times.system - start_times.system)
+            # CPU of worker processes that exited during the stage, e.g. the --parse-workers pool
+            entry['child_cpu_seconds'] += (
+                (end_times.children_user - start_times.children_user)
+                + (end_times.children_system - start_times.children_system)
+            )
+            if peak_rss:
+                entry['peak_rss_mb'] = max(entry['peak_rss_mb'] or 0.0, peak_rss_mb)
+                entry['rss_change_mb'] += (end_rss - start_rss) / (1024 * 1024)
+            if call['rows'] is not None:
+                entry['rows'] = (entry['rows'] or 0) + int(call['rows'])
+
+    def metrics(self, **metadata):
+        """The recorded stages, in the order they were first entered, as a JSON-ready dict."""
+        return {
+            **metadata,
+            'pid': self.pid,
+            'total_wall_seconds': time.perf_counter() - self._start_time,
+            'peak_rss_mb': _peak_rss_mb(),
+            'stages': list(self.stages.values())
+        }
+
+    def print_summary(self):
+        """Print the top-level stages with their share of the profiled time."""
+        top_stages = [entry for entry in self.stages.values() if entry['depth'] == 0]
+        total = time.perf_counter() - self._start_time
+        name_width = max([len(entry['stage']) for entry in top_stages] + [5])
+        print("Profile of the top-level stages:")
+        for entry in top_stages:
+            peak = f"{entry['peak_rss_mb']:,.0f} MB" if entry['peak_rss_mb'] is not None else "unknown"
+            print(f"  {entry['stage']:<{name_width}}  {entry['wall_seconds']:8.2f}s wall "
+                  f"{100 * entry['wall_seconds'] / total if total > 0 else 0:5.1f}%  "
+                  f"{entry['cpu_seconds'] + entry['child_cpu_seconds']:8.2f}s CPU  peak RSS {peak}")
+        print(f"  {'Total':<{name_width}}  {total:8.2f}s wall")
+
+# The StageProfiler of the active profiling() block, if any
+_active_profiler = None
+
+@contextlib.contextmanager
+def profiling(metrics_path, cprofile_dir=None, **metadata):
+    """Record the profile_stage() blocks run inside this block and write their metrics to metrics_path as
+    JSON, with `metadata` as extra top-level keys. With metrics_path None nothing is recorded."""
+    global _active_profiler
+    if metrics_path is None:
+        yield None
+        return
+    profiler = StageProfiler(cprofile_dir)
+    previous_profiler, _active_profiler = _active_profiler, profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        _active_profiler = previous_profiler
+        profiler.stop()
+        with open(metrics_path, 'w', encoding='utf-8') as f:
+            json.dump(profiler.metrics(**metadata), f, indent=2)
+        profiler.print_summary()
+        print(f"Profile metrics written to: {metrics_path}")
+
+def profile_stage(name, enabled=True):
+    """Context manager measuring its block as stage `name` of the active profiler; a no-op when profiling
+    is off or `enabled` is false. The yielded dict takes a 'rows' count."""
+    # Forked worker processes inherit the parent's profiler but must not record into their copy of it
+    if not enabled or _active_profiler is None or _active_profiler.pid != os.getpid():
+        return contextlib.nullcontext({'rows': None})
+    return _active_profiler.stage(name)
+
+def profiled_chunks(chunks, name):
+    """Yield the items of `chunks`, timing each fetch (e.g. one read_csv chunk) as stage `name`."""
+    chunks = iter(chunks)
+    while True:
+        with profile_stage(name) as stage:
+            chunk = next(chunks, None)
+            if chunk is not None:
+                stage['rows'] = len(chunk)
+        if chunk is None:
+            return
+        yield chunk
+
 def parse_data_field(data_string):
     """Parse the DATA field from the csv file and convert to list of integers."""
     if pd.isna(data_string) or data_string == '':
@@ -95,23 +342,188 @@ def parse_data_field(data_string):
         # If conversion fails, return empty list
         return []
 
-def parse_address(address_string):
-    """Parse the Address field and extract the lower 16 bits."""
+# Lookup table from ASCII code to hex nibble value; 0xFF marks a character that is not a hex digit
+_HEX_NIBBLE_LUT = np.full(256, 0xFF, dtype=np.uint8)
+for _nibble, _char in enumerate(b'0123456789ABCDEF'):
+    _HEX_NIBBLE_LUT[_char] = _nibble
+for _nibble, _char in enumerate(b'abcdef', start=10):
+    _HEX_NIBBLE_LUT[_char] = _nibble
+
+# Each DATA dword is written as 8 hex digits followed by a single space
+DATA_DWORD_STRIDE = 9
+
+# Prefix of the per-dword payload columns produced by load_and_filter_data
+DATA_WORD_PREFIX = 'DATA_word_'
+
+def _hex_digits_to_uint(digits, dtype):
+    """Convert a (..., n_digits) uint8 array of ASCII hex digits into integers, returning (values, valid).
+
+    n_digits must be twice the item size of dtype: nibble pairs are packed into bytes in place and the
+    result is viewed as big-endian integers, so no per-digit arithmetic happens on the wide type.
+    """
+    nibbles = _HEX_NIBBLE_LUT[digits]
+    # Any invalid digit turns the OR of the word's nibbles into 0xFF
+    valid = np.bitwise_or.reduce(nibbles, axis=-1) <= 0x0F
+    packed = (nibbles[..., 0::2] << 4) | nibbles[..., 1::2]
+    values = np.ascontiguousarray(packed).view(np.dtype(dtype).newbyteorder('>'))[..., 0]
+    return values.astype(dtype), valid
+
+def _strings_to_byte_matrix(strings, width):
+    """Pack a sequence of ASCII strings into a (rows x width) uint8 matrix, NUL-padded on the right."""
+    fixed = np.asarray(strings, dtype=object).astype(f'S{max(width, 1)}')
+    return fixed.view(np.uint8).reshape(len(fixed), max(width, 1))
+
+def decode_data_column(data_series):
+    """Decode a column of DATA strings into a (rows x max dwords) uint32 matrix and a dword count vector."""
+    text = data_series.fillna('')
+    raw = text.to_numpy(dtype=object)
+    n_rows = len(raw)
+    # Each dword takes DATA_DWORD_STRIDE characters; the trailing space after the last one is optional
+    text_lengths = text.str.len().to_numpy(dtype=np.int64)
+    lengths = (text_lengths + 1) // DATA_DWORD_STRIDE
+    max_dwords = int(lengths.max()) if n_rows else 0
+
+    words = np.zeros((n_rows, max_dwords), dtype=np.uint32)
+    well_formed = ((text_lengths + 1) % DATA_DWORD_STRIDE <= 1)
+    if max_dwords:
+        width = max_dwords * DATA_DWORD_STRIDE
+        cells = _strings_to_byte_matrix(raw, width).reshape(n_rows, max_dwords, DATA_DWORD_STRIDE)
+        words, digits_valid = _hex_digits_to_uint(cells[:, :, :8], np.uint32)
+        # Only the first `lengths` cells of each row hold data; the rest are NUL padding
+        in_row = np.arange(max_dwords) < lengths[:, None]
+        separator = cells[:, :, 8]
+        cell_ok = digits_valid & ((separator == ord(' ')) | (separator == 0))
+        well_formed &= (cell_ok | ~in_row).all(axis=1)
+        words[~in_row] = 0
+
+    # Rows that are not in the regular fixed-width layout ('0x' prefixes, odd spacing, bad digits)
+    # take the slow per-row path
+    for row_idx in np.flatnonzero(~well_formed):
+        dwords = parse_data_field(data_series.iloc[row_idx])
+        if len(dwords) > words.shape[1]:
+            words = np.pad(words, ((0, 0), (0, len(dwords) - words.shape[1])))
+        words[row_idx] = 0
+        words[row_idx, :len(dwords)] = dwords
+        lengths[row_idx] = len(dwords)
+
+    return words, lengths
+
+# Addresses are written as two 8-digit hex halves separated by a colon, e.g. 00001F00:0000EE80
+ADDRESS_TEXT_WIDTH = 17
+
+def _parse_address_slow(address_string):
+    """Parse one irregular Address string into a full 64-bit value, or None if it cannot be parsed."""
     if pd.isna(address_string) or address_string == '':
         return None
-    
     try:
-        # Split by colon and get the second part
-        parts = address_string.split(':')
+        parts = address_string.strip().split(':')
         if len(parts) < 2:
             return None
-        
-        # Get the lower 16 bits (4 hex digits)
-        lower_addr_hex = parts[1][-4:] if len(parts[1]) >= 4 else parts[1]
-        return int(lower_addr_hex, 16)
-    except (ValueError, IndexError):
+        address = (int(parts[0], 16) << 32) | int(parts[1], 16)
+        return address if address < (1 << 64) else None
+    except ValueError:
         return None
 
+def parse_address_column(address_series):
+    """Parse a column of Address strings into full 64-bit addresses, returning (uint64 values, valid)."""
+    text = address_series.fillna('')
+    byte_matrix = _strings_to_byte_matrix(text.to_numpy(dtype=object), ADDRESS_TEXT_WIDTH)
+    # Drop the colon and decode the remaining 16 hex digits as one big-endian 64-bit value
+    digits = np.concatenate([byte_matrix[:, :8], byte_matrix[:, 9:]], axis=1)
+    values, valid = _hex_digits_to_uint(digits, np.uint64)
+    regular = (
+        valid
+        & (byte_matrix[:, 8] == ord(':'))
+        & (text.str.len().to_numpy(dtype=np.int64) == ADDRESS_TEXT_WIDTH)
+    )
+    values[~regular] = 0
+
+    # Anything else (shorter halves, surrounding whitespace, malformed text) takes the slow per-row path
+    for row_idx in np.flatnonzero(~regular):
+        address = _parse_address_slow(address_series.iloc[row_idx])
+        if address is not None:
+            values[row_idx] = address
+            regular[row_idx] = True
+
+    return values, regular
+
+# 'Time Stamp' is in seconds with 12 fraction digits, e.g. 0005.477338138060s, so it is kept as int64 picoseconds
+TIMESTAMP_FRACTION_DIGITS = 12
+
+def _parse_timestamp_slow(timestamp_string):
+    """Parse one irregular Time Stamp string into integer picoseconds, or None if it cannot be parsed."""
+    if pd.isna(timestamp_string):
+        return None
+    try:
+        seconds = decimal.Decimal(timestamp_string.strip().rstrip('s').strip())
+        picoseconds = int(seconds.scaleb(TIMESTAMP_FRACTION_DIGITS))
+    except (decimal.InvalidOperation, ValueError, OverflowError):
+        return None
+    return picoseconds if -(1 << 63) <= picoseconds < (1 << 63) else None
+
+def parse_timestamp_column(timestamp_series):
+    """Parse a column of Time Stamp strings into int64 picoseconds, returning (values, valid).
+
+    Digits past picoseconds are truncated.
+    """
+    text = timestamp_series.fillna('')
+    text_lengths = text.str.len().to_numpy(dtype=np.int64)
+    n_rows = len(text)
+    width = int(text_lengths.max()) if n_rows else 0
+    chars = _strings_to_byte_matrix(text.to_numpy(dtype=object), width)
+    # The number is everything before an optional trailing 's'
+    last_char = chars[np.arange(n_rows), np.maximum(text_lengths - 1, 0)]
+    number_lengths = text_lengths - ((text_lengths > 0) & (last_char == ord('s')))
+
+    # Find the decimal point (or the end of the number when there is none)
+    dot_pos = number_lengths.copy()
+    dot_count = np.zeros(n_rows, dtype=np.int64)
+    for col in range(width):
+        is_dot = (chars[:, col] == ord('.')) & (col < number_lengths)
+        dot_pos = np.where(is_dot & (dot_count == 0), col, dot_pos)
+        dot_count += is_dot
+
+    # Accumulate each digit times its power of ten in picoseconds, one character column at a time
+    values = np.zeros(n_rows, dtype=np.int64)
+    # Up to 18 digits fit in an int64, which leaves 6 digits of whole seconds
+    regular = (number_lengths > 0) & (dot_count <= 1) & (dot_pos + TIMESTAMP_FRACTION_DIGITS <= 18)
+    for col in range(width):
+        char = chars[:, col]
+        in_number = col < number_lengths
+        is_digit = (char >= ord('0')) & (char <= ord('9'))
+        regular &= ~in_number | is_digit | (col == dot_pos)
+        exponent = np.where(
+            col < dot_pos, dot_pos - col - 1 + TIMESTAMP_FRACTION_DIGITS, TIMESTAMP_FRACTION_DIGITS - (col - dot_pos)
+        )
+        used = in_number & is_digit & (exponent >= 0) & regular
+        values += np.where(used, (char.astype(np.int64) - ord('0')) * 10 ** np.clip(exponent, 0, 18), 0)
+    values[~regular] = 0
+
+    # Anything else (whitespace, signs, exponents, long integer parts) takes the slow per-row path
+    for row_idx in np.flatnonzero(~regular & (text_lengths > 0)):
+        picoseconds = _parse_timestamp_slow(timestamp_series.iloc[row_idx])
+        if picoseconds is not None:
+            values[row_idx] = picoseconds
+            regular[row_idx] = True
+
+    return values, regular
+
+def data_word_matrix(df):
+    """Return the decoded DATA payload of df as a (rows x max dwords) uint32 array."""
+    word_columns = [col for col in df.columns if col.startswith(DATA_WORD_PREFIX)]
+    return df[word_columns].to_numpy(dtype=np.uint32)
+
+def _stack_word_matrices(matrices):
+    """Concatenate per-chunk payload matrices, zero-padding them to the widest one."""
+    max_dwords = max(matrix.shape[1] for matrix in matrices)
+    return np.concatenate([
+        np.pad(matrix, ((0, 0), (0, max_dwords - matrix.shape[1]))) for matrix in matrices
+    ])
+
+def _nullable_int(values, valid, dtype):
+    """Wrap a numpy integer array as a nullable pandas integer array, with invalid entries set to <NA>."""
+    return pd.arrays.IntegerArray(values.astype(dtype), ~valid)
+
 def _find_chrome_binary():
     """Best-effort discovery of a Chrome/Chromium executable on Windows/Linux."""
     env_candidates = [
@@ -224,87 +636,1705 @@ def _build_chrome_webdriver():
             f"Last error: {e}"
         )
 
-def save_holoviews_frames_as_gif(frames, gif_path, duration=0.12):
-    """Render HoloViews frame objects to PNG and stitch into an animated GIF."""
+# Colors used by the 'agg' GIF backend: the light scheme of apply_light_background, and an
+# approximation of the dark_minimal Bokeh theme for frames without that hook
+LIGHT_RASTER_COLORS = {'background': 'white', 'text': 'black', 'outline': 'black', 'grid': '#D0D0D0'}
+DARK_RASTER_COLORS = {'background': '#20262B', 'text': '#E0E0E0', 'outline': '#20262B', 'grid': '#3A4045'}
+
+# Most category labels drawn on the x-axis of a rasterized frame before labels are thinned out
+RASTER_MAX_XTICKS = 40
+
+# Rendered frame backgrounds (axes, ticks, labels and grid for one y-range) kept per animation
+RASTER_MAX_BACKGROUNDS = 16
+
+# Autoscaled y-axes end at the next of these mantissas (times a power of ten), so that consecutive
+# frames share a y-range, and with it a cached background, until the data outgrows it
+RASTER_NICE_STEPS = (1, 1.2, 1.5, 2, 2.5, 3, 4, 5, 6, 8, 10)
+
+def _nice_ceiling(value):
+    """The smallest RASTER_NICE_STEPS multiple of a power of ten that is at least value (> 0)."""
+    power = 10.0 ** np.floor(np.log10(value))
+    return next(step * power for step in RASTER_NICE_STEPS if step * power >= value)
+
+def _raster_frame_spec(frame_obj):
+    """Reduce an hv.Bars or hv.Scatter frame to what the 'agg' backend draws: (layout, values, title).
+
+    Size, title, axis labels, y-limits and per-bar colors are read from the frame's Bokeh options, so
+    the output follows the same layout as the Chrome export path. The layout is a plain dict that stays
+    the same across the frames of an animation, so one figure can draw them all.
+    """
+    if isinstance(frame_obj, hv.Bars):
+        kind = 'bars'
+    elif isinstance(frame_obj, hv.Scatter):
+        kind = 'scatter'
+    else:
+        raise TypeError(f"Unsupported frame type for raster rendering: {type(frame_obj).__name__}")
+    plot_opts = hv.Store.lookup_options('bokeh', frame_obj, 'plot').kwargs
+    style_opts = hv.Store.lookup_options('bokeh', frame_obj, 'style').kwargs
+    data = frame_obj.data
+    color = style_opts.get('color')
+    layout = {
+        'kind': kind,
+        'width': plot_opts.get('width', 800), 'height': plot_opts.get('height', 600),
+        'light': apply_light_background in plot_opts.get('hooks', []),
+        'x_labels': [str(v) for v in data[frame_obj.kdims[0].name]],
+        'colors': data[color].tolist() if isinstance(color, str) and color in data.columns else color,
+        'xlabel': plot_opts.get('xlabel', frame_obj.kdims[0].label),
+        'ylabel': plot_opts.get('ylabel', frame_obj.vdims[0].label),
+        'ylim': plot_opts.get('ylim'),
+        'bar_width': style_opts.get('bar_width', 0.8), 'line_color': style_opts.get('line_color', 'black'),
+        'size': style_opts.get('size', 6)
+    }
+    values = data[frame_obj.vdims[0].name].to_numpy(dtype=np.float64)
+    return layout, values, plot_opts.get('title', '')
+
+class AggFrameRenderer:
+    """Rasterizes animation frames with matplotlib's Agg canvas, without a browser.
+
+    The figure is built for the first frame and reused while the layout stays the same. Everything but
+    the bars and the title (axes, ticks, labels, grid) is rendered once per y-range and kept as a
+    background; each frame restores it and draws only its data, the spines and its title on top. Bars
+    are drawn as one compound path per color, so a frame costs a few path fills however many bars it has.
+    """
+
+    def __init__(self):
+        if Figure is None:
+            raise RuntimeError("matplotlib is required for the 'agg' GIF backend")
+        self._layout = None
+
+    def _build(self, layout):
+        scheme = LIGHT_RASTER_COLORS if layout['light'] else DARK_RASTER_COLORS
+        self.fig = Figure(figsize=(layout['width'] / 100, layout['height'] / 100), dpi=100,
+                          facecolor=scheme['background'])
+        self.canvas = FigureCanvasAgg(self.fig)
+        ax = self.ax = self.fig.add_subplot()
+        x_labels = layout['x_labels']
+        self.positions = np.arange(len(x_labels), dtype=np.float64)
+        colors = layout['colors']
+        if layout['kind'] == 'bars':
+            edge_color = layout['line_color']
+            bar_colors = colors if isinstance(colors, list) else [colors or 'C0'] * len(x_labels)
+            self.bar_groups = []
+            for bar_color in dict.fromkeys(bar_colors):
+                indices = np.flatnonzero([c == bar_color for c in bar_colors])
+                codes = np.tile([Path.MOVETO, Path.LINETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY], len(indices))
+                patch = PathPatch(Path(np.zeros((0, 2))), facecolor=bar_color, linewidth=0.5,
+                                  edgecolor='none' if edge_color is None else edge_color)
+                ax.add_patch(patch)
+                self.bar_groups.append((indices, codes, patch))
+            self.artists = [patch for _, _, patch in self.bar_groups]
+        else:
+            # Bokeh sizes markers by diameter in pixels, matplotlib by area in points^2
+            marker_points = layout['size'] * 72 / self.fig.dpi
+            self.artists = [ax.scatter(self.positions, np.zeros(len(self.positions)), c=colors, s=marker_points ** 2)]
+        ax.set_xlim(-0.5, len(x_labels) - 0.5)
+
+        tick_step = max(1, int(np.ceil(len(x_labels) / RASTER_MAX_XTICKS)))
+        ax.set_xticks(self.positions[::tick_step])
+        ax.set_xticklabels(x_labels[::tick_step], rotation=90 if tick_step > 1 else 0)
+        self.title = ax.set_title('', color=scheme['text'])
+        ax.set_xlabel(layout['xlabel'], color=scheme['text'])
+        ax.set_ylabel(layout['ylabel'], color=scheme['text'])
+        ax.set_facecolor(scheme['background'])
+        ax.tick_params(colors=scheme['text'])
+        ax.grid(True, color=scheme['grid'])
+        ax.set_axisbelow(True)
+        for spine in ax.spines.values():
+            spine.set_color(scheme['outline'])
+        self._layout = layout
+        self._backgrounds = {}
+
+    def _ylim(self, values):
+        """The layout's y-limits, or limits fitted to the values: bars get a rounded-up top (see
+        RASTER_NICE_STEPS), markers matplotlib's default 5% margins."""
+        if self._layout['ylim'] is not None:
+            return tuple(self._layout['ylim'])
+        finite = values[np.isfinite(values)]
+        low, high = (float(finite.min()), float(finite.max())) if len(finite) else (0.0, 1.0)
+        if self._layout['kind'] == 'bars':
+            # Bars stick to zero, so only the far ends get a margin
+            low, high = min(low, 0.0), max(high, 0.0)
+            span = (high - low) or 1.0
+            return (-_nice_ceiling(0.05 * span - low) if low < 0 else 0.0,
+                    _nice_ceiling(high + 0.05 * span) if high > 0 else 1.0)
+        span = (high - low) or 1.0
+        return low - 0.05 * span, high + 0.05 * span
+
+    def render(self, spec):
+        """Rasterize one _raster_frame_spec() to an (height x width x 3) uint8 array."""
+        layout, values, title = spec
+        rebuilt = layout != self._layout
+        if rebuilt:
+            self._build(layout)
+        if layout['kind'] == 'bars':
+            half_width = layout['bar_width'] / 2
+            verts = np.zeros((len(values), 5, 2))
+            verts[:, :, 0] = self.positions[:, None] + [-half_width, -half_width, half_width, half_width, 0]
+            verts[:, 1:3, 1] = np.nan_to_num(values)[:, None]
+            for indices, codes, patch in self.bar_groups:
+                patch.set_path(Path(verts[indices].reshape(-1, 2), codes))
+        else:
+            self.artists[0].set_offsets(np.column_stack([self.positions, values]))
+        ylim = self._ylim(values)
+        self.ax.set_ylim(*ylim)
+        self.title.set_text(title)
+        if rebuilt:
+            # The margins are fitted once, to the first frame, so every frame keeps the same layout
+            self.fig.tight_layout()
+        background = self._backgrounds.get(ylim)
+        if background is None:
+            # The title is blanked rather than hidden: a hidden title loses its place above the axes
+            self.title.set_text('')
+            for artist in self.artists:
+                artist.set_visible(False)
+            self.canvas.draw()
+            for artist in self.artists:
+                artist.set_visible(True)
+            self.title.set_text(title)
+            if len(self._backgrounds) >= RASTER_MAX_BACKGROUNDS:
+                self._backgrounds.clear()
+            self._backgrounds[ylim] = self.canvas.copy_from_bbox(self.fig.bbox)
+        else:
+            self.canvas.restore_region(background)
+        for artist in self.artists + list(self.ax.spines.values()) + [self.title]:
+            self.ax.draw_artist(artist)
+        # PIL drops the alpha channel faster than a strided numpy copy
+        return np.asarray(Image.fromarray(np.asarray(self.canvas.buffer_rgba()), 'RGBA').convert('RGB'))
+
+def render_frames_rgb(frames):
+    """Yield the RGB image of each (frame_idx, frame_obj) pair, drawing them all on one reused figure."""
+    renderer = AggFrameRenderer()
+    for _, frame_obj in frames:
+        yield renderer.render(_raster_frame_spec(frame_obj))
+
+# Chrome driver and Agg renderer owned by the current ChromeExportPool worker process, created on
+# its first frame
+_export_worker_driver = None
+_export_worker_renderer = None
+
+def _quit_export_worker_driver():
+    """Shut down this worker's Chrome driver when the worker process exits."""
+    global _export_worker_driver
+    if _export_worker_driver is not None:
+        try:
+            _export_worker_driver.quit()
+        except Exception:
+            pass
+        _export_worker_driver = None
+
+def _screenshot_rgb(frame_obj, driver):
+    """Render a HoloViews frame through a Chrome driver and return it as an RGB uint8 array."""
+    bokeh_fig = hv.renderer('bokeh').get_plot(frame_obj).state
+    return np.asarray(get_screenshot_as_png(bokeh_fig, driver=driver).convert('RGB'))
+
+def _export_frame_rgb(task):
+    """Pool worker: render one pickled HoloViews frame with this process's long-lived driver."""
+    global _export_worker_driver
+    frame_idx, frame_bytes = task
+    start_time = time.perf_counter()
+    if _export_worker_driver is None:
+        _export_worker_driver = _build_chrome_webdriver()
+        Finalize(None, _quit_export_worker_driver, exitpriority=10)
+        logging.getLogger('bokeh.io.export').setLevel(logging.ERROR)
+
+    image = _screenshot_rgb(hv.Store.loads(frame_bytes), _export_worker_driver)
+    return frame_idx, image, time.perf_counter() - start_time, os.getpid()
+
+def _render_frame_spec_rgb(task):
+    """Pool worker: rasterize one _raster_frame_spec() on this process's long-lived Agg figure."""
+    global _export_worker_renderer
+    frame_idx, spec = task
+    start_time = time.perf_counter()
+    if _export_worker_renderer is None:
+        _export_worker_renderer = AggFrameRenderer()
+    image = _export_worker_renderer.render(spec)
+    return frame_idx, image, time.perf_counter() - start_time, os.getpid()
+
+class ChromeExportPool:
+    """Pool of worker processes that each keep a headless Chrome driver alive for frame export.
+
+    Workers start on the first export and are reused for every GIF until close(), so Chrome startup
+    is paid once per worker per run instead of once per animation. The 'agg' backend uses the same
+    workers; each keeps one figure and reuses it while consecutive frames share a layout.
+    """
+
+    def __init__(self, n_workers=4):
+        self.n_workers = n_workers
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def export_images(self, frames, backend='chrome'):
+        """Yield the RGB image of each (frame_idx, frame_obj) pair, in frame order, as workers finish."""
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.n_workers)
+
+        if backend == 'agg':
+            # The options are resolved here, so workers receive plain layout dicts and arrays
+            worker = _render_frame_spec_rgb
+            tasks = ((frame_idx, _raster_frame_spec(frame_obj)) for frame_idx, frame_obj in frames)
+        else:
+            # Frames travel with their options attached, which plain pickling would drop
+            worker = _export_frame_rgb
+            tasks = ((frame_idx, hv.Store.dumps(frame_obj)) for frame_idx, frame_obj in frames)
+        start_time = time.perf_counter()
+        frame_times = []
+        worker_stats = {}
+        # imap() hands results back in task order, so frame ordering never depends on worker timing
+        for _, image, frame_time, worker_pid in self._pool.imap(worker, tasks, chunksize=1):
+            frame_times.append(frame_time)
+            count, busy = worker_stats.get(worker_pid, (0, 0.0))
+            worker_stats[worker_pid] = (count + 1, busy + frame_time)
+            yield image
+
+        elapsed = time.perf_counter() - start_time
+        print(f"Exported {len(frame_times)} frames in {elapsed:.2f}s with {self.n_workers} workers "
+              f"(per frame: mean {np.mean(frame_times):.2f}s, max {np.max(frame_times):.2f}s)")
+        for worker_pid, (count, busy) in sorted(worker_stats.items()):
+            print(f"  worker {worker_pid}: {count} frames, {busy:.2f}s busy")
+
+    def close(self):
+        """Stop the workers; each one quits its Chrome driver on the way out."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+class _StreamingGifWriter:
+    """Animated GIF encoder that writes each frame to disk as soon as it is appended.
+
+    Every frame is quantized to its own 256-color local palette, so nothing but the current frame is
+    ever held in memory, however long the animation is.
+    """
+
+    def __init__(self, path, duration, loop=0):
+        self._file = open(path, 'wb')
+        self._duration_ms = int(round(duration * 1000))
+        self._loop = loop
+        self._size = None
+
+    def append_data(self, image):
+        # Fast octree keeps plot colors within a few levels at a fraction of median cut's cost
+        frame = Image.fromarray(np.asarray(image, dtype=np.uint8)[:, :, :3]).quantize(
+            colors=256, method=Image.Quantize.FASTOCTREE)
+        if self._size is None:
+            self._size = frame.size
+            header, _ = GifImagePlugin.getheader(frame, info={'loop': self._loop, 'duration': self._duration_ms})
+            self._file.write(b''.join(header))
+        elif frame.size != self._size:
+            raise ValueError(f"Frame size {frame.size} does not match the first frame {self._size}")
+        for block in GifImagePlugin.getdata(frame, duration=self._duration_ms, include_color_table=True):
+            self._file.write(block)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.write(b';')  # GIF trailer
+            self._file.close()
+
+def open_animation_writer(path, duration):
+    """Open an incremental frame writer for path, chosen by extension (.gif, or any imageio format).
+
+    GIFs use _StreamingGifWriter; other formats (e.g. .mp4 through imageio-ffmpeg) use imageio's
+    get_writer, which streams frames to the encoder as they are appended.
+    """
+    if path.lower().endswith('.gif'):
+        return _StreamingGifWriter(path, duration)
+    return imageio.get_writer(path, fps=1.0 / duration)
+
+def _iter_chrome_frame_images(frames):
+    """Yield RGB images for frames using one Chrome driver started just for this animation."""
+    driver = _build_chrome_webdriver()
+    try:
+        for _, frame_obj in frames:
+            yield _screenshot_rgb(frame_obj, driver)
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+def save_holoviews_frames_as_gif(frames, gif_path, duration=0.12, export_pool=None, backend='chrome'):
+    """Render HoloViews frame objects and stream them into an animated GIF (or .mp4) at gif_path.
+
+    backend='chrome' exports each frame through a headless browser: in parallel by the workers of
+    export_pool when one is given, otherwise with a single Chrome driver started for this GIF.
+    backend='agg' rasterizes the frames with matplotlib and needs no browser at all: split across the
+    export_pool workers when one is given, otherwise on one figure reused for every frame of this GIF.
+    Each frame goes straight to the encoder, so memory stays at a frame or two; duration is in seconds.
+    """
     if not frames:
         return None
 
-    temp_dir = tempfile.mkdtemp(prefix='plot16_frames_')
-    png_paths = []
-    driver = None
     export_logger = logging.getLogger('bokeh.io.export')
     original_export_log_level = export_logger.level
+    writer = None
     try:
         export_logger.setLevel(logging.ERROR)
-        driver = _build_chrome_webdriver()
-        renderer = hv.renderer('bokeh')
-
-        for frame_idx, frame_obj in frames:
-            bokeh_fig = renderer.get_plot(frame_obj).state
-            png_path = os.path.join(temp_dir, f'frame_{frame_idx:03d}.png')
-            export_png(bokeh_fig, filename=png_path, webdriver=driver)
-            png_paths.append(png_path)
-
-        if not png_paths:
-            return None
-
-        images = [imageio.imread(path) for path in png_paths]
-        imageio.mimsave(gif_path, images, duration=duration, loop=0)
+        start_time = time.perf_counter()
+        # Agg frames are CPU-bound, so on a single core the workers would only add pickling overhead
+        if export_pool is not None and (backend != 'agg' or (os.cpu_count() or 1) > 1):
+            images = export_pool.export_images(frames, backend)
+        elif backend == 'agg':
+            images = render_frames_rgb(frames)
+        else:
+            images = _iter_chrome_frame_images(frames)
+
+        writer = open_animation_writer(gif_path, duration)
+        n_frames = 0
+        for image in images:
+            writer.append_data(image)
+            n_frames += 1
+        writer.close()
+        print(f"Encoded {n_frames} frames in {time.perf_counter() - start_time:.2f}s")
         return gif_path
     except Exception as e:
         print(f"Warning: Unable to generate GIF at {gif_path}: {e}")
+        if writer is not None:
+            writer.close()
+            os.remove(gif_path)
         return None
     finally:
         export_logger.setLevel(original_export_log_level)
-        if driver is not None:
-            try:
-                driver.quit()
-            except Exception:
-                pass
 
-def load_and_filter_data(file_path):
-    """Load and filter the CSV file."""
+# ----------------------------------------------------------------------------------------------------
+# Packet filters: which rows of the trace are analyzed. A filter is a set of terms, all of which a
+# packet must pass; a term passes when the column matches any of its comma-separated values:
+#   tlp=MWr(64),MRd(64) dir=Upstream length=2,32 requester=184:00:0
+#   address=0x00001F0000000000..0x00001F0000100000 time=5.4773s..5.48s
+# Ranges include their start and exclude their end, and either end may be left open. Filters are
+# applied to each CSV chunk (or parse worker byte range) before anything is decoded: the text columns
+# are compared first, Address and Time Stamp are parsed only for the rows that pass those, and DATA is
+# decoded only for the rows that pass everything. Several filters can share one pass over the file.
+# ----------------------------------------------------------------------------------------------------
+
+# Filter keys that compare a text column of the CSV with a list of values
+FILTER_TEXT_COLUMNS = {
+    'tlp': 'TLP Type', 'dir': 'Link Dir', 'requester': 'RequesterID', 'dllp': 'DLLP Type',
+    'cxl_type': 'CXL Pkt Type', 'cxl_subtype': 'CXL Pkt Subtype'
+}
+
+# The packets the analysis was written for
+DEFAULT_FILTER_EXPRESSION = 'tlp=MWr(64) dir=Upstream'
+
+# Time units accepted by the time= filter term, in picoseconds
+FILTER_TIME_UNITS = {'s': 10**12, 'ms': 10**9, 'us': 10**6, 'ns': 10**3, 'ps': 1}
+
+# Column of the parsed frame recording which of several filters kept each row, one bit per filter
+FILTER_SET_COLUMN = 'filter_sets'
+
+def _parse_filter_time(text):
+    """'5.4773s', '120us' or '5.48' (seconds) -> exact integer picoseconds."""
+    text = text.strip()
+    for unit in sorted(FILTER_TIME_UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            number, scale = text[:-len(unit)], FILTER_TIME_UNITS[unit]
+            break
+    else:
+        number, scale = text, FILTER_TIME_UNITS['s']
+    try:
+        return int(decimal.Decimal(number) * scale)
+    except decimal.InvalidOperation:
+        raise ValueError(f"invalid time {text!r}; expected a number with an optional unit (s, ms, us, ns, ps)")
+
+def _parse_filter_address(text):
+    """'0x00001F000000EE80', '00001F00:0000EE80' or '1F000000EE80' -> integer address."""
+    digits = text.strip().replace(':', '')
+    try:
+        return int(digits[2:] if digits.lower().startswith('0x') else digits, 16)
+    except ValueError:
+        raise ValueError(f"invalid address {text!r}; expected hex digits, optionally with 0x or a ':' separator")
+
+def _parse_filter_range(text, parse_value):
+    """'low..high' -> (low, high), with None for an omitted end."""
+    if '..' not in text:
+        raise ValueError(f"invalid range {text!r}; expected low..high (either end may be omitted)")
+    low, high = text.split('..', 1)
+    return (parse_value(low) if low.strip() else None, parse_value(high) if high.strip() else None)
+
+class TraceFilter:
+    """The packets of a trace to analyze: every term must pass, and a term passes on any of its values.
+
+    `text` maps CSV column names to the set of accepted strings, `lengths` is a set of accepted Length
+    values, and `address_range` / `time_range` are (low, high) pairs in bytes / picoseconds with high
+    excluded and None for an open end. Unset terms accept everything.
+    """
+
+    def __init__(self, name='packets', text=None, lengths=None, address_range=None, time_range=None):
+        self.name = name
+        self.text = {column: frozenset(values) for column, values in (text or {}).items()}
+        self.lengths = frozenset(lengths) if lengths is not None else None
+        self.address_range = address_range
+        self.time_range = time_range
+
+    @classmethod
+    def parse(cls, expression, name=None):
+        """Build a filter from an expression such as 'tlp=MWr(64) dir=Upstream length=2,32'.
+
+        Terms are separated by whitespace or ';'. A leading 'name:' names the filter set, which is
+        otherwise named after the expression.
+        """
+        if name is None and ':' in expression.split('=', 1)[0]:
+            name, expression = (part.strip() for part in expression.split(':', 1))
+        text, lengths, address_range, time_range = {}, None, None, None
+        for term in expression.replace(';', ' ').split():
+            key, sep, value = term.partition('=')
+            key = key.strip().lower()
+            if not sep or not value:
+                raise ValueError(f"invalid filter term {term!r}; expected key=value")
+            if key in FILTER_TEXT_COLUMNS:
+                text.setdefault(FILTER_TEXT_COLUMNS[key], set()).update(v for v in value.split(',') if v)
+            elif key == 'length':
+                try:
+                    lengths = (lengths or set()) | {int(v) for v in value.split(',') if v}
+                except ValueError:
+                    raise ValueError(f"invalid length in {term!r}; expected integers in dwords")
+            elif key == 'address':
+                address_range = _parse_filter_range(value, _parse_filter_address)
+            elif key == 'time':
+                time_range = _parse_filter_range(value, _parse_filter_time)
+            else:
+                keys = ', '.join(sorted([*FILTER_TEXT_COLUMNS, 'length', 'address', 'time']))
+                raise ValueError(f"unknown filter key {key!r}; expected one of {keys}")
+        trace_filter = cls(name or 'packets', text, lengths, address_range, time_range)
+        if name is None:
+            trace_filter.name = re.sub(r'[^A-Za-z0-9_.-]+', '_', trace_filter.spec).strip('_') or 'all_packets'
+        return trace_filter
+
+    @property
+    def spec(self):
+        """Canonical expression of the filter: equal filters have equal specs, whatever order they were written in."""
+        short_keys = {column: key for key, column in FILTER_TEXT_COLUMNS.items()}
+        terms = [f"{short_keys[column]}={','.join(sorted(values))}" for column, values in sorted(self.text.items())]
+        if self.lengths is not None:
+            terms.append(f"length={','.join(map(str, sorted(self.lengths)))}")
+        if self.address_range is not None:
+            low, high = self.address_range
+            terms.append(f"address={'' if low is None else f'0x{low:016X}'}..{'' if high is None else f'0x{high:016X}'}")
+        if self.time_range is not None:
+            low, high = self.time_range
+            terms.append(f"time={'' if low is None else f'{low}ps'}..{'' if high is None else f'{high}ps'}")
+        return ' '.join(terms)
+
+    def __repr__(self):
+        return f"TraceFilter({self.name!r}: {self.spec or 'all packets'})"
+
+    @property
+    def extra_columns(self):
+        """CSV columns the filter reads that the analysis itself does not."""
+        return [column for column in self.text if column not in ANALYSIS_COLUMNS]
+
+    def text_mask(self, chunk):
+        """Rows of a raw CSV chunk passing the text and Length terms."""
+        mask = np.ones(len(chunk), dtype=bool)
+        for column, values in self.text.items():
+            mask &= chunk[column].isin(values).to_numpy()
+        if self.lengths is not None:
+            mask &= pd.to_numeric(chunk['Length'], errors='coerce').isin(self.lengths).to_numpy()
+        return mask
+
+    def range_mask(self, address, address_valid, time_ps, time_valid):
+        """Rows passing the address and time terms, given their parsed values and validity."""
+        mask = np.ones(len(address), dtype=bool)
+        for bounds, values, valid in ((self.address_range, address, address_valid),
+                                      (self.time_range, time_ps, time_valid)):
+            if bounds is None or bounds == (None, None):
+                continue
+            low, high = bounds
+            mask &= valid
+            if low is not None:
+                mask &= values >= np.array(low, dtype=values.dtype)
+            if high is not None:
+                mask &= values < np.array(high, dtype=values.dtype)
+        return mask
+
+    @property
+    def has_ranges(self):
+        return any(bounds is not None and bounds != (None, None) for bounds in (self.address_range, self.time_range))
+
+DEFAULT_FILTER = TraceFilter.parse(DEFAULT_FILTER_EXPRESSION, name='MWr64_Upstream')
+
+def _filter_columns(filters):
+    """CSV columns and dtypes to read so the analysis and every filter have what they need."""
+    extra = [column for trace_filter in filters for column in trace_filter.extra_columns]
+    columns = ANALYSIS_COLUMNS + sorted(set(extra))
+    return columns, {**ANALYSIS_STRING_DTYPES, **{column: str for column in extra}}
+
+def _check_filter_sets(filters):
+    names = [trace_filter.name for trace_filter in filters]
+    if len(set(names)) != len(names):
+        raise ValueError(f"filter set names must be unique: {', '.join(names)}")
+    if len(filters) > 64:
+        raise ValueError("at most 64 filter sets can share one pass over a trace")
+
+# Bump whenever the parsed columns or the whole-trace consumers change, so cache entries written by older
+# code are rebuilt
+TRACE_CACHE_VERSION = 4
+
+def _trace_cache_key(file_path, trace_filter=DEFAULT_FILTER):
+    """Describe the input file, filter and parser version; a cache entry is only valid for an identical key."""
+    stat = os.stat(file_path)
+    return {
+        'path': os.path.abspath(file_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'filter': trace_filter.spec,
+        'version': TRACE_CACHE_VERSION
+    }
+
+def _trace_cache_path(cache_dir, file_path, trace_filter=DEFAULT_FILTER):
+    """Return the cache entry directory for file_path; one entry is kept per input path and filter."""
+    entry_id = os.path.abspath(file_path) + '\0' + trace_filter.spec
+    path_hash = hashlib.sha1(entry_id.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(file_path)}.{path_hash}")
+
+def save_trace_cache(df, file_path, cache_dir, trace_filter=DEFAULT_FILTER):
+    """Write the parsed trace as a set of .npy column files plus a JSON manifest."""
+    entry_path = _trace_cache_path(cache_dir, file_path, trace_filter)
+    temp_path = f"{entry_path}.tmp-{os.getpid()}"
+    shutil.rmtree(temp_path, ignore_errors=True)
+    os.makedirs(temp_path)
+
+    columns = []
+    word_columns = [col for col in df.columns if col.startswith(DATA_WORD_PREFIX)]
+    for col_idx, col in enumerate(col for col in df.columns if col not in word_columns):
+        series = df[col]
+        file_stem = f'col_{col_idx}'
+        if isinstance(series.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(series.dtype):
+            # Strings are stored as integer codes plus the distinct values in the manifest
+            codes, uniques = pd.factorize(series)
+            np.save(os.path.join(temp_path, f'{file_stem}.npy'), codes.astype(np.int32))
+            kind = 'categorical' if isinstance(series.dtype, pd.CategoricalDtype) else 'string'
+            columns.append({'name': col, 'kind': kind, 'file': file_stem, 'values': [str(v) for v in uniques]})
+        elif isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+            # Nullable integers keep their values and missing-value mask side by side
+            np.save(os.path.join(temp_path, f'{file_stem}.npy'), series.to_numpy(series.dtype.numpy_dtype, na_value=0))
+            np.save(os.path.join(temp_path, f'{file_stem}_mask.npy'), series.isna().to_numpy())
+            columns.append({'name': col, 'kind': 'nullable', 'file': file_stem})
+        else:
+            np.save(os.path.join(temp_path, f'{file_stem}.npy'), series.to_numpy())
+            columns.append({'name': col, 'kind': 'numeric', 'file': file_stem})
+
+    np.save(os.path.join(temp_path, 'index.npy'), df.index.to_numpy())
+    np.save(os.path.join(temp_path, 'payload.npy'), data_word_matrix(df))
+    # Where the payload words sit among the other columns, so a cached frame has the columns of a fresh parse
+    word_position = list(df.columns).index(word_columns[0]) if word_columns else len(columns)
+    manifest = {
+        'key': _trace_cache_key(file_path, trace_filter), 'columns': columns, 'word_columns': word_columns,
+        'word_position': word_position
+    }
+    with open(os.path.join(temp_path, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap the finished entry into place so a crash never leaves a half-written cache behind
+    shutil.rmtree(entry_path, ignore_errors=True)
+    os.replace(temp_path, entry_path)
+    return entry_path
+
+def load_trace_cache(file_path, cache_dir, trace_filter=DEFAULT_FILTER):
+    """Memory-map a previously cached parse of file_path, or return None if there is no valid entry."""
+    entry_path = _trace_cache_path(cache_dir, file_path, trace_filter)
+    manifest_path = os.path.join(entry_path, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('key') != _trace_cache_key(file_path, trace_filter):
+        return None
+
+    def load_array(name):
+        return np.load(os.path.join(entry_path, f'{name}.npy'), mmap_mode='r')
+
+    index = pd.Index(load_array('index'))
+    columns = {}
+    for column in manifest['columns']:
+        values = load_array(column['file'])
+        if column['kind'] in ('categorical', 'string'):
+            values = pd.Categorical.from_codes(values, categories=column['values'])
+            if column['kind'] == 'string':
+                values = values.astype(str)
+        elif column['kind'] == 'nullable':
+            values = pd.arrays.IntegerArray(np.asarray(values), np.asarray(load_array(f"{column['file']}_mask")))
+        columns[column['name']] = values
+
+    # copy=False keeps the numeric columns backed by the memory-mapped files
+    names = list(columns)
+    word_position = manifest['word_position']
+    df = pd.concat([
+        pd.DataFrame({name: columns[name] for name in names[:word_position]}, index=index, copy=False),
+        pd.DataFrame(load_array('payload'), columns=manifest['word_columns'], index=index, copy=False),
+        pd.DataFrame({name: columns[name] for name in names[word_position:]}, index=index, copy=False)
+    ], axis=1)
+    return df
+
+def _format_bytes(n_bytes):
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if n_bytes < 1024 or unit == 'GB':
+            return f"{n_bytes:,.1f} {unit}"
+        n_bytes /= 1024
+
+def print_memory_report(df):
+    """Print the memory used by each column of the trace, with the DATA_word_N columns as one line."""
+    usage = df.memory_usage(index=True, deep=True)
+    word_columns = [col for col in df.columns if col.startswith(DATA_WORD_PREFIX)]
+    rows = [('Index', str(df.index.dtype), usage['Index'])]
+    rows += [(col, str(df[col].dtype), usage[col]) for col in df.columns if col not in word_columns]
+    if word_columns:
+        rows.append((f'{DATA_WORD_PREFIX}0..{len(word_columns) - 1}', f"{df[word_columns[0]].dtype} x {len(word_columns)}",
+                     usage[word_columns].sum()))
+    n_rows = max(len(df), 1)
+    name_width = max(len(name) for name, _, _ in rows)
+    print(f"Memory used by the filtered trace ({len(df):,} packets):")
+    for name, dtype, n_bytes in rows:
+        print(f"  {name:<{name_width}}  {dtype:<12} {_format_bytes(n_bytes):>12}  {n_bytes / n_rows:7.1f} B/packet")
+    print(f"  {'Total':<{name_width}}  {'':<12} {_format_bytes(usage.sum()):>12}  {usage.sum() / n_rows:7.1f} B/packet")
+
+def load_and_filter_data(file_path, chunksize=CSV_CHUNK_ROWS, cache_dir=None, workers=1, trace_filter=None):
+    """Load the packets of a trace that pass trace_filter (by default the MWr(64) Upstream packets), from the
+    parse cache in cache_dir when possible.
+
+    With workers > 1 the CSV is parsed by that many processes, each taking a byte range of the file.
+    """
+    trace_filter = DEFAULT_FILTER if trace_filter is None else trace_filter
+    frames = load_filter_sets(file_path, [trace_filter], chunksize=chunksize, cache_dir=cache_dir, workers=workers)
+    return frames[trace_filter.name] if frames is not None else None
+
+def load_filter_sets(file_path, filters, chunksize=CSV_CHUNK_ROWS, cache_dir=None, workers=1):
+    """Load the packets passing each of several TraceFilters in one pass over the file.
+
+    Returns {filter name: frame, or None when no packet passes}, or None when the file cannot be read.
+    Sets found in the parse cache are not parsed again; the others share a single parse.
+    """
     try:
         # Check if file exists
         if not os.path.exists(file_path):
             print(f"Error: File not found: {file_path}")
             return None
-            
-        # Read the CSV file
-        df = pd.read_csv(file_path)
-        
-        # Filter for MWr(64) Upstream packets
-        filtered_df = df[(df['TLP Type'] == 'MWr(64)') & (df['Link Dir'] == 'Upstream')].copy()
-        
-        if filtered_df.empty:
-            print(f"No MWr(64) Upstream packets found in {file_path}")
-            return None
-        
-        # Parse the DATA field
-        filtered_df['DATA_parsed'] = filtered_df['DATA'].apply(parse_data_field)
-        
-        # Add column for number of dwords in DATA
-        filtered_df['DATA_dword_count'] = filtered_df['DATA_parsed'].apply(len)
-        
-        # Parse address field to extract lower 16 bits
-        filtered_df['Address_lower_16bits'] = filtered_df['Address'].apply(parse_address)
-        
-        # Convert 'Time Stamp' to numeric for sequence analysis
-        filtered_df['Time Stamp'] = pd.to_numeric(filtered_df['Time Stamp'].str.replace('s', ''), errors='coerce')
-        
-        # Sort by timestamp to ensure correct sequence
-        filtered_df = filtered_df.sort_values('Time Stamp')
-        
-        # Add a sequence number for tracking transaction order
-        filtered_df['seq_num'] = range(len(filtered_df))
+        _check_filter_sets(filters)
+
+        frames = {}
+        if cache_dir is not None:
+            for trace_filter in filters:
+                start_time = time.perf_counter()
+                with profile_stage('cache load') as stage:
+                    cached_df = load_trace_cache(file_path, cache_dir, trace_filter)
+                    stage['rows'] = len(cached_df) if cached_df is not None else 0
+                if cached_df is not None:
+                    print(f"Loaded {len(cached_df):,} cached packets in {time.perf_counter() - start_time:.2f}s "
+                          f"from {_trace_cache_path(cache_dir, file_path, trace_filter)}")
+                    print_memory_report(cached_df)
+                    frames[trace_filter.name] = cached_df
+
+        to_parse = [trace_filter for trace_filter in filters if trace_filter.name not in frames]
+        if to_parse:
+            if workers > 1:
+                parsed = _parse_trace_csv_parallel(file_path, chunksize, workers, to_parse)
+            else:
+                parsed = _parse_trace_csv(file_path, chunksize, to_parse)
+            for trace_filter, filtered_df in zip(to_parse, parsed):
+                frames[trace_filter.name] = filtered_df
+                if filtered_df is None:
+                    continue
+                print_memory_report(filtered_df)
+                if cache_dir is not None:
+                    with profile_stage('cache save') as stage:
+                        entry_path = save_trace_cache(filtered_df, file_path, cache_dir, trace_filter)
+                        stage['rows'] = len(filtered_df)
+                    print(f"Cached parsed trace in {entry_path}")
+        return {trace_filter.name: frames[trace_filter.name] for trace_filter in filters}
 
-        return filtered_df
-    
     except Exception as e:
         print(f"Error loading or processing file {file_path}: {e}")
         return None
 
-def extract_analysis_sets(df):
+def _decode_trace_chunk(chunk, filters=(DEFAULT_FILTER,)):
+    """Keep the packets of one CSV chunk that pass any of `filters` and decode them; returns (frame, words)
+    or None. With several filters, the FILTER_SET_COLUMN bitmask records which of them kept each row."""
+    # Compare the text columns first, so rejected rows are never parsed or decoded
+    masks = [trace_filter.text_mask(chunk) for trace_filter in filters]
+    keep = np.logical_or.reduce(masks)
+    if not keep.any():
+        return None
+    kept = chunk[keep]
+    masks = [mask[keep] for mask in masks]
+    # Parse the full 64-bit address once; only Address_u64 is stored, the FeatureStore derives the rest
+    with profile_stage('Address') as stage:
+        address, address_valid = parse_address_column(kept['Address'])
+        stage['rows'] = len(kept)
+    # Convert 'Time Stamp' to exact integer picoseconds for sequence analysis
+    with profile_stage('Time Stamp') as stage:
+        time_ps, time_valid = parse_timestamp_column(kept['Time Stamp'])
+        stage['rows'] = len(kept)
+    if any(trace_filter.has_ranges for trace_filter in filters):
+        masks = [
+            mask & trace_filter.range_mask(address, address_valid, time_ps, time_valid) if trace_filter.has_ranges else mask
+            for trace_filter, mask in zip(filters, masks)
+        ]
+        keep = np.logical_or.reduce(masks)
+        if not keep.any():
+            return None
+        kept = kept[keep]
+        masks = [mask[keep] for mask in masks]
+        address, address_valid, time_ps, time_valid = address[keep], address_valid[keep], time_ps[keep], time_valid[keep]
+    # Decode the DATA payload while the chunk is small, then drop the raw strings
+    with profile_stage('DATA') as stage:
+        words, dword_counts = decode_data_column(kept['DATA'])
+        stage['rows'] = len(kept)
+    kept = kept.drop(columns=['DATA', 'Address', 'Time Stamp'] + [col for col in kept.columns if col not in ANALYSIS_COLUMNS])
+    # Store every column in the smallest type that holds it
+    for col in CATEGORICAL_COLUMNS:
+        kept[col] = kept[col].astype('category')
+    kept['Length'] = _nullable_int(kept['Length'].fillna(0).to_numpy(), kept['Length'].notna().to_numpy(), np.uint16)
+    kept['DATA_dword_count'] = dword_counts.astype(np.uint16)
+    kept['Address_u64'] = _nullable_int(address, address_valid, np.uint64)
+    kept['Time_Stamp_ps'] = _nullable_int(time_ps, time_valid, np.int64)
+    if len(filters) > 1:
+        kept[FILTER_SET_COLUMN] = sum(mask.astype(np.uint64) << np.uint64(bit) for bit, mask in enumerate(masks))
+    return kept, words
+
+def _print_parse_rate(total_rows, start_time, workers=1):
+    elapsed = time.perf_counter() - start_time
+    rows_per_sec = total_rows / elapsed if elapsed > 0 else float('inf')
+    peak_rss = _peak_rss_mb()
+    peak_rss_text = f"{peak_rss:,.0f} MB" if peak_rss is not None else "unknown"
+    worker_text = f" with {workers} workers" if workers > 1 else ""
+    print(f"Read {total_rows:,} rows in {elapsed:.2f}s{worker_text} ({rows_per_sec:,.0f} rows/s), "
+          f"peak RSS {peak_rss_text}")
+
+def _finish_trace_frame(kept_chunks, kept_words, file_path, trace_filter=DEFAULT_FILTER):
+    """Join the decoded chunks of a trace, in file order, into one frame sorted by time."""
+    if not kept_chunks:
+        print(f"No packets matching {trace_filter.spec or 'the filter'} found in {file_path}")
+        return None
+
+    # Chunks only know the categories they contain; give them all the same ones so they stay categorical
+    for col in CATEGORICAL_COLUMNS:
+        categories = sorted(set().union(*(chunk[col].cat.categories for chunk in kept_chunks)))
+        for chunk in kept_chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+
+    # Chunk indexes continue across chunks, so the original row numbers are preserved
+    filtered_df = pd.concat(kept_chunks)
+    print(f"Kept {len(filtered_df):,} packets matching {trace_filter.spec or 'all packets'}")
+
+    # Attach the payload as one uint32 column per dword, stored together as a single 2-D block
+    words = _stack_word_matrices(kept_words)
+    word_columns = [f'{DATA_WORD_PREFIX}{i}' for i in range(words.shape[1])]
+    filtered_df = pd.concat(
+        [filtered_df, pd.DataFrame(words, columns=word_columns, index=filtered_df.index)], axis=1
+    )
+
+    # Sort by timestamp to ensure correct sequence. Captures are normally already in time order, so check
+    # that first; otherwise a stable sort (timsort) merges the in-order runs of a locally shuffled trace
+    time_ps, time_valid = _nullable_parts(filtered_df['Time_Stamp_ps'], np.int64)
+    sort_keys = np.where(time_valid, time_ps, np.iinfo(np.int64).max)
+    out_of_order = int(np.count_nonzero(sort_keys[1:] < sort_keys[:-1]))
+    if out_of_order:
+        print(f"Sorting by time: {out_of_order:,} packets are earlier than the packet before them")
+        filtered_df = filtered_df.iloc[np.argsort(sort_keys, kind='stable')]
+
+    # Add a sequence number for tracking transaction order
+    filtered_df['seq_num'] = np.arange(len(filtered_df), dtype=np.int32 if len(filtered_df) < 2**31 else np.int64)
+
+    return filtered_df
+
+def _finish_filter_sets(kept_chunks, kept_words, file_path, filters):
+    """Split chunks decoded for several filters into one finished frame per filter, in the order of filters."""
+    with profile_stage('assemble') as stage:
+        if len(filters) == 1:
+            frames = [_finish_trace_frame(kept_chunks, kept_words, file_path, filters[0])]
+        else:
+            frames = []
+            for bit, trace_filter in enumerate(filters):
+                set_chunks, set_words = [], []
+                for chunk, words in zip(kept_chunks, kept_words):
+                    in_set = ((chunk[FILTER_SET_COLUMN].to_numpy() >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+                    if in_set.any():
+                        set_chunk = chunk[in_set].drop(columns=[FILTER_SET_COLUMN])
+                        # Keep only this set's categories, as if it had been parsed on its own
+                        for col in CATEGORICAL_COLUMNS:
+                            set_chunk[col] = set_chunk[col].cat.remove_unused_categories()
+                        set_chunks.append(set_chunk)
+                        set_words.append(words[in_set, :int(set_chunk['DATA_dword_count'].max())])
+                frames.append(_finish_trace_frame(set_chunks, set_words, file_path, trace_filter))
+        stage['rows'] = sum(len(frame) for frame in frames if frame is not None)
+    return frames
+
+def _parse_trace_csv(file_path, chunksize, filters=(DEFAULT_FILTER,)):
+    """Stream the CSV in chunks and keep only the analysis columns of the packets passing each filter;
+    returns one frame (or None) per filter."""
+    # Read only the columns we need, a chunk at a time, so the unfiltered trace is never held in memory
+    start_time = time.perf_counter()
+    total_rows = 0
+    kept_chunks = []
+    kept_words = []
+    usecols, dtypes = _filter_columns(filters)
+    reader = pd.read_csv(
+        file_path,
+        usecols=usecols,
+        dtype=dtypes,
+        chunksize=chunksize
+    )
+    for chunk in profiled_chunks(reader, 'read_csv'):
+        total_rows += len(chunk)
+        with profile_stage('decode') as stage:
+            decoded = _decode_trace_chunk(chunk, filters)
+            stage['rows'] = len(chunk)
+        if decoded is not None:
+            kept_chunks.append(decoded[0])
+            kept_words.append(decoded[1])
+
+    _print_parse_rate(total_rows, start_time)
+    return _finish_filter_sets(kept_chunks, kept_words, file_path, filters)
+
+# ----------------------------------------------------------------------------------------------------
+# Parallel parsing: the CSV is split into newline-aligned byte ranges that a process pool parses and
+# filters independently. Each worker packs its decoded columns into one shared memory block and returns
+# only the block's layout; the parent copies the columns out and unlinks the block.
+# ----------------------------------------------------------------------------------------------------
+
+# Byte ranges per parse worker; more ranges than workers keeps the pool busy when ranges differ in cost
+PARSE_RANGES_PER_WORKER = 4
+
+# Shared memory blocks created by this worker. Windows frees a block as soon as its last handle closes,
+# so there the worker keeps its handles open until it exits; elsewhere they are closed right away.
+_worker_shared_blocks = []
+
+class _ByteRangeFile(io.RawIOBase):
+    """Read-only file object over bytes [start, end) of a file."""
+
+    def __init__(self, path, start, end):
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        n_read = self._file.readinto(memoryview(buffer)[:size])
+        self._remaining -= n_read
+        return n_read
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+def newline_aligned_ranges(file_path, n_ranges):
+    """Split the rows after the header line into at most n_ranges (start, end) byte ranges.
+
+    Every range starts at the beginning of a line, so each can be parsed on its own. This assumes no
+    quoted field contains a newline, which holds for protocol analyzer exports.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        f.readline()
+        bounds = [f.tell()]
+        data_size = size - bounds[0]
+        for range_idx in range(1, n_ranges):
+            split = bounds[0] + data_size * range_idx // n_ranges
+            if split <= bounds[-1]:
+                continue
+            # Move the split to just after the next newline (or keep it if a line starts there)
+            f.seek(split - 1)
+            f.readline()
+            if bounds[-1] < f.tell() < size:
+                bounds.append(f.tell())
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+def _share_arrays(arrays, block_name):
+    """Copy arrays into a new shared memory block named block_name; returns [(dtype, shape, offset)]."""
+    layout = []
+    offset = 0
+    for array in arrays:
+        layout.append((array.dtype.str, array.shape, offset))
+        # Keep every array 8-byte aligned
+        offset += -(-array.nbytes // 8) * 8
+    block = shared_memory.SharedMemory(name=block_name, create=True, size=max(offset, 1))
+    for array, (dtype, shape, array_offset) in zip(arrays, layout):
+        np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=array_offset)[...] = array
+    if os.name == 'nt':
+        _worker_shared_blocks.append(block)
+    else:
+        # Ownership passes to the parent, which unlinks the block once it has copied it out. The tracker
+        # knows POSIX blocks by their shm_open() name, which is the block name with a leading slash
+        resource_tracker.unregister(f'/{block.name}', 'shared_memory')
+        block.close()
+    return layout
+
+def _take_shared_arrays(block_name, layout):
+    """Copy the arrays out of a block made by _share_arrays, then free the block."""
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        return [
+            np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset).copy()
+            for dtype, shape, offset in layout
+        ]
+    finally:
+        block.close()
+        block.unlink()
+
+def _discard_shared_block(block_name):
+    """Unlink a worker's block that was never taken, e.g. after another range failed."""
+    try:
+        block = shared_memory.SharedMemory(name=block_name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
+
+def _parse_byte_range(task):
+    """Pool worker: parse and decode one byte range of the CSV into a shared memory block."""
+    file_path, header, start, end, chunksize, block_name, filters = task
+    kept_chunks = []
+    kept_words = []
+    total_rows = 0
+    usecols, dtypes = _filter_columns(filters)
+    reader = pd.read_csv(
+        io.BufferedReader(_ByteRangeFile(file_path, start, end)),
+        header=None,
+        names=header,
+        usecols=usecols,
+        dtype=dtypes,
+        chunksize=chunksize
+    )
+    for chunk in reader:
+        total_rows += len(chunk)
+        decoded = _decode_trace_chunk(chunk, filters)
+        if decoded is not None:
+            kept_chunks.append(decoded[0])
+            kept_words.append(decoded[1])
+    if not kept_chunks:
+        return total_rows, None
+
+    kept = pd.concat(kept_chunks)
+    # Same column encoding as the trace cache: strings as codes plus values, nullable ints as data plus mask
+    columns = []
+    arrays = [kept.index.to_numpy(), _stack_word_matrices(kept_words)]
+    for col in kept.columns:
+        series = kept[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            columns.append({'name': col, 'kind': 'categorical', 'values': [str(v) for v in series.cat.categories]})
+            arrays.append(series.cat.codes.to_numpy())
+        elif not pd.api.types.is_numeric_dtype(series.dtype):
+            codes, uniques = pd.factorize(series)
+            columns.append({'name': col, 'kind': 'string', 'values': [str(v) for v in uniques]})
+            arrays.append(codes.astype(np.int32))
+        elif isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+            columns.append({'name': col, 'kind': 'nullable'})
+            arrays += [series.to_numpy(series.dtype.numpy_dtype, na_value=0), series.isna().to_numpy()]
+        else:
+            columns.append({'name': col, 'kind': 'numeric'})
+            arrays.append(series.to_numpy())
+    return total_rows, (columns, _share_arrays(arrays, block_name))
+
+def _unpack_byte_range(columns, arrays, row_offset):
+    """Rebuild a worker's (frame, words) from its shared arrays; row_offset makes the index file-global."""
+    index, words, *column_arrays = arrays
+    column_arrays = iter(column_arrays)
+    values = {}
+    for column in columns:
+        if column['kind'] == 'categorical':
+            values[column['name']] = pd.Categorical.from_codes(next(column_arrays), categories=column['values'])
+        elif column['kind'] == 'string':
+            strings = np.asarray(column['values'], dtype=object)[next(column_arrays)]
+            values[column['name']] = pd.array(strings, dtype=ANALYSIS_STRING_DTYPES.get(column['name'], str))
+        elif column['kind'] == 'nullable':
+            values[column['name']] = pd.arrays.IntegerArray(next(column_arrays), next(column_arrays))
+        else:
+            values[column['name']] = next(column_arrays)
+    return pd.DataFrame(values, index=pd.Index(index + row_offset)), words
+
+def _parse_trace_csv_parallel(file_path, chunksize, workers, filters=(DEFAULT_FILTER,)):
+    """Parse the CSV with a pool of `workers` processes, one newline-aligned byte range per task;
+    returns one frame (or None) per filter."""
+    start_time = time.perf_counter()
+    header = pd.read_csv(file_path, nrows=0).columns.tolist()
+    ranges = newline_aligned_ranges(file_path, workers * PARSE_RANGES_PER_WORKER)
+    block_names = [f'trace_{os.getpid()}_{range_idx}' for range_idx in range(len(ranges))]
+    tasks = [
+        (file_path, header, range_start, range_end, chunksize, block_name, list(filters))
+        for (range_start, range_end), block_name in zip(ranges, block_names)
+    ]
+    total_rows = 0
+    kept_chunks = []
+    kept_words = []
+    taken = 0
+    try:
+        # The workers' CPU time is reported as child_cpu_seconds of this stage
+        with profile_stage('parallel parse') as stage, multiprocessing.Pool(workers) as pool:
+            # Ranges come back in file order, so each one's row offset is the number of rows before it
+            for range_rows, shared in pool.imap(_parse_byte_range, tasks):
+                if shared is not None:
+                    columns, layout = shared
+                    arrays = _take_shared_arrays(block_names[taken], layout)
+                    kept, words = _unpack_byte_range(columns, arrays, total_rows)
+                    kept_chunks.append(kept)
+                    kept_words.append(words)
+                taken += 1
+                total_rows += range_rows
+            stage['rows'] = total_rows
+    finally:
+        for block_name in block_names[taken:]:
+            _discard_shared_block(block_name)
+
+    _print_parse_rate(total_rows, start_time, workers)
+    return _finish_filter_sets(kept_chunks, kept_words, file_path, filters)
+
+# ----------------------------------------------------------------------------------------------------
+# Quantile sketches: per-row (e.g. per time bin) latency or distance distributions in fixed-size arrays.
+# Values are counted in log-spaced buckets (as in DDSketch), so every row's quantiles are known to a
+# fixed relative accuracy whatever the number of values, and two sketches with the same parameters
+# merge by adding their counts. Count, sum, minimum and maximum are kept exactly beside the buckets.
+# ----------------------------------------------------------------------------------------------------
+
+# Relative accuracy of the quantile estimates: each is within 1% of a value of that rank
+SKETCH_RELATIVE_ACCURACY = 0.01
+
+class QuantileSketches:
+    """n_sketches mergeable quantile sketches with shared bucket boundaries, one per row.
+
+    A value x in (min_value, max_value] goes to bucket ceil(log_gamma(x / min_value)), with
+    gamma = (1 + a) / (1 - a) for relative accuracy a. Values up to min_value share bucket 0 and values
+    above max_value the last bucket; their estimates are still clamped to the exact min and max.
+    """
+
+    def __init__(self, n_sketches, min_value, max_value, relative_accuracy=SKETCH_RELATIVE_ACCURACY):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.n_buckets = int(np.ceil(np.log(max_value / min_value) / np.log(self.gamma))) + 2
+        self.counts = np.zeros((n_sketches, self.n_buckets), dtype=np.int64)
+        self.count = np.zeros(n_sketches, dtype=np.int64)
+        self.sum = np.zeros(n_sketches, dtype=np.float64)
+        self.min = np.full(n_sketches, np.inf)
+        self.max = np.full(n_sketches, -np.inf)
+
+    def __len__(self):
+        return len(self.count)
+
+    def bucket_ids(self, values):
+        """Bucket of each value."""
+        ratios = np.maximum(np.asarray(values, dtype=np.float64) / self.min_value, 1.0)
+        return np.minimum(np.ceil(np.log(ratios) / np.log(self.gamma)).astype(np.int64), self.n_buckets - 1)
+
+    def bucket_edges(self):
+        """The n_buckets + 1 bucket boundaries; bucket 0 is drawn from min_value / gamma."""
+        return self.min_value * self.gamma ** np.arange(-1, self.n_buckets, dtype=np.float64)
+
+    def add(self, sketch_ids, values):
+        """Add each value to the sketch of the same index in sketch_ids, with one bincount over the touched cells."""
+        sketch_ids = np.asarray(sketch_ids, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        cells = sketch_ids * self.n_buckets + self.bucket_ids(values)
+        first_cell = int(cells.min())
+        cell_counts = np.bincount(cells - first_cell)
+        self.counts.reshape(-1)[first_cell:first_cell + len(cell_counts)] += cell_counts
+        self.count += np.bincount(sketch_ids, minlength=len(self))
+        self.sum += np.bincount(sketch_ids, weights=values, minlength=len(self))
+        np.minimum.at(self.min, sketch_ids, values)
+        np.maximum.at(self.max, sketch_ids, values)
+
+    def _check_compatible(self, other):
+        if (other.min_value, other.max_value, other.relative_accuracy) != (self.min_value, self.max_value,
+                                                                           self.relative_accuracy):
+            raise ValueError("only sketches with the same value range and accuracy can be merged")
+
+    def merge(self, other):
+        """Fold another set of as many sketches, with the same parameters, into this one row by row."""
+        self._check_compatible(other)
+        self.counts += other.counts
+        self.count += other.count
+        self.sum += other.sum
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+
+    def merge_row_pairs(self):
+        """Merge rows 2i and 2i + 1 into row i (e.g. to double a time bin width); the upper half is emptied."""
+        half = len(self) // 2
+        for name, reduce, empty in (('counts', np.add, 0), ('count', np.add, 0), ('sum', np.add, 0.0),
+                                    ('min', np.minimum, np.inf), ('max', np.maximum, -np.inf)):
+            values = getattr(self, name)
+            merged = reduce.reduce(values[:2 * half].reshape(half, 2, *values.shape[1:]), axis=1)
+            values[:half] = merged
+            values[half:] = empty
+
+    def total(self):
+        """A single sketch merging every row."""
+        total = QuantileSketches(1, self.min_value, self.max_value, self.relative_accuracy)
+        total.counts[0] = self.counts.sum(axis=0)
+        total.count[0] = self.count.sum()
+        total.sum[0] = self.sum.sum()
+        total.min[0] = self.min.min() if len(self) else np.inf
+        total.max[0] = self.max.max() if len(self) else -np.inf
+        return total
+
+    def mean(self):
+        """Exact mean of each sketch, NaN when empty."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 0, self.sum / self.count, np.nan)
+
+    def minimum(self):
+        return np.where(self.count > 0, self.min, np.nan)
+
+    def maximum(self):
+        return np.where(self.count > 0, self.max, np.nan)
+
+    def quantiles(self, qs):
+        """(n_sketches x len(qs)) quantile estimates, clamped to each sketch's exact min and max; NaN when empty."""
+        cumulative = np.cumsum(self.counts, axis=1)
+        ranks = np.outer(np.maximum(self.count - 1, 0), np.asarray(qs, dtype=np.float64))
+        # The bucket of each rank: the first whose cumulative count exceeds it
+        buckets = np.stack([(cumulative <= ranks[:, [q_idx]]).sum(axis=1) for q_idx in range(len(qs))], axis=1)
+        buckets = np.minimum(buckets, self.n_buckets - 1)
+        estimates = self.min_value * 2 * self.gamma ** buckets / (self.gamma + 1)
+        estimates = np.clip(estimates, self.min[:, None], self.max[:, None])
+        estimates[self.count == 0] = np.nan
+        return estimates
+
+# ----------------------------------------------------------------------------------------------------
+# ACK latency: a streaming join of the upstream TLPs (by PSN) with the downstream ACK/NAK DLLPs
+# (by AckNak_Seq_Num) that retire them. ACKs are cumulative, so an ACK of PSN n retires every
+# outstanding TLP up to n. Sequence numbers are 12 bits on the wire and are unwrapped into a running
+# count; per chunk, the outstanding PSNs (sorted) are merged against the running maximum of the
+# acknowledged PSNs (also sorted) with one searchsorted. Only the TLPs still waiting for an ACK are
+# carried between chunks, at most half the sequence space, and the latencies go straight into one
+# quantile sketch per time bin, so memory stays bounded however long the trace is.
+# ----------------------------------------------------------------------------------------------------
+
+# PSNs and AckNak_Seq_Nums are 12 bits; an ACK can only refer to the last half of the sequence space
+PSN_MODULUS = 1 << 12
+
+# Latency range of the sketch buckets, 1 ps to 2^40 ps (~1.1 s); longer latencies share the last bucket
+LATENCY_MIN_PS = 1
+LATENCY_MAX_PS = 1 << 40
+
+# Time bins of the latency histograms start at this width and double whenever the trace outgrows
+# LATENCY_MAX_TIME_BINS bins, so a trace of any length ends up with between half and all of them
+LATENCY_INITIAL_BIN_PS = 1_000_000
+LATENCY_MAX_TIME_BINS = 1024
+
+def _parse_sequence_numbers(series):
+    """Parse a PSN/AckNak_Seq_Num column (decimal, or 0x-prefixed hex) into (int64 values, valid)."""
+    values = pd.to_numeric(series, errors='coerce')
+    unparsed = values.isna() & series.notna()
+    if unparsed.any():
+        def parse_hex(text):
+            try:
+                return int(text.strip(), 0)
+            except ValueError:
+                return np.nan
+        values[unparsed] = series[unparsed].map(parse_hex)
+    valid = values.notna().to_numpy()
+    return values.fillna(0).to_numpy(dtype=np.int64), valid
+
+def unwrap_sequence_numbers(values, previous=None, modulus=PSN_MODULUS):
+    """Unwrap sequence numbers taken modulo `modulus` into a running count.
+
+    Each value is placed within half the modulus of the one before it (starting from `previous`, an
+    unwrapped value, or at the first value itself), so replays may step backwards and wraps step forward.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    if not len(values):
+        return values
+    start = int(values[0]) if previous is None else previous
+    steps = np.diff(values, prepend=start % modulus)
+    steps = (steps + modulus // 2) % modulus - modulus // 2
+    return start + np.cumsum(steps)
+
+class LatencyHistogram:
+    """A QuantileSketches row of latencies per fixed-width time bin.
+
+    Time bin b covers [origin + b * bin_width_ps, origin + (b + 1) * bin_width_ps) from the first sample's
+    time. When a sample lands past the last bin, neighbouring bins are merged pairwise and the width
+    doubles, so the sketches never grow.
+    """
+
+    def __init__(self, bin_width_ps=LATENCY_INITIAL_BIN_PS, max_bins=LATENCY_MAX_TIME_BINS):
+        self.bin_width_ps = bin_width_ps
+        self.max_bins = max_bins
+        self.origin = None
+        self.sketches = QuantileSketches(max_bins, LATENCY_MIN_PS, LATENCY_MAX_PS)
+
+    def add(self, times_ps, latencies_ps):
+        """Count latencies observed at times_ps."""
+        if not len(latencies_ps):
+            return
+        if self.origin is None:
+            self.origin = int(times_ps[0])
+        last_bin = (int(np.max(times_ps)) - self.origin) // self.bin_width_ps
+        while last_bin >= self.max_bins:
+            self.sketches.merge_row_pairs()
+            self.bin_width_ps *= 2
+            last_bin //= 2
+        bin_ids = np.maximum((np.asarray(times_ps, dtype=np.int64) - self.origin) // self.bin_width_ps, 0)
+        self.sketches.add(bin_ids, latencies_ps)
+
+    @property
+    def total(self):
+        return int(self.sketches.count.sum())
+
+    @property
+    def sum_ps(self):
+        return float(self.sketches.sum.sum())
+
+    @property
+    def min_ps(self):
+        return float(self.sketches.min.min()) if self.total else None
+
+    @property
+    def max_ps(self):
+        return float(self.sketches.max.max()) if self.total else None
+
+    @property
+    def n_bins(self):
+        """Time bins up to the last non-empty one."""
+        used = np.flatnonzero(self.sketches.count)
+        return int(used[-1]) + 1 if len(used) else 0
+
+    def distribution(self):
+        """(the n_buckets + 1 bucket edges in ps, counts per bucket) over the whole trace."""
+        return self.sketches.bucket_edges(), self.sketches.counts.sum(axis=0)
+
+    def quantiles(self, qs, per_bin=False):
+        """Latency quantiles in ps over the whole trace, or with per_bin an (n_bins x len(qs)) array with
+        NaN for empty bins."""
+        if per_bin:
+            return self.sketches.quantiles(qs)[:self.n_bins]
+        return self.sketches.total().quantiles(qs)[0]
+
+class AckLatencyJoin:
+    """Matches upstream TLPs with the downstream ACK/NAK DLLPs retiring them, one chunk of rows at a time.
+
+    A TLP's latency runs from its first transmission (a replay keeps the original time) to the first
+    ACK or NAK whose sequence number covers its PSN; it is counted in the time bin of the transmission.
+    A TLP that falls more than half the sequence space behind the newest PSN without being acknowledged
+    can no longer be matched and is counted as unacknowledged.
+    """
+
+    # Key of the results dict, and the trace columns read by add(), for stream_trace
+    name = 'ack_latency'
+    columns = {'Link Dir': 'category', 'DLLP Type': 'category', 'PSN': str, 'AckNak_Seq_Num': str, 'Time Stamp': str}
+
+    def __init__(self, bin_width_ps=LATENCY_INITIAL_BIN_PS, max_bins=LATENCY_MAX_TIME_BINS):
+        self.histogram = LatencyHistogram(bin_width_ps, max_bins)
+        self.last_psn = None        # unwrapped PSN of the latest upstream TLP
+        self.max_psn = None         # highest unwrapped PSN transmitted so far
+        self.acked_psn = None       # highest unwrapped PSN acknowledged so far
+        self.pending_psns = np.zeros(0, dtype=np.int64)
+        self.pending_times = np.zeros(0, dtype=np.int64)
+        self.rows = 0
+        self.tlps = 0
+        self.replays = 0
+        self.acks = 0
+        self.naks = 0
+        self.unacknowledged = 0
+
+    def add(self, chunk):
+        """Join the next chunk of trace rows (the `columns`, in trace order); returns the TLPs matched."""
+        self.rows += len(chunk)
+        link_dir = chunk['Link Dir']
+        tlp_rows = (link_dir == 'Upstream').to_numpy() & chunk['PSN'].notna().to_numpy()
+        dllp_types = chunk['DLLP Type']
+        ack_rows = ((link_dir == 'Downstream') & dllp_types.isin(['ACK', 'NAK'])).to_numpy()
+        ack_rows = ack_rows & chunk['AckNak_Seq_Num'].notna().to_numpy()
+        rows = np.flatnonzero(tlp_rows | ack_rows)
+        if not len(rows):
+            return 0
+        subset = chunk.iloc[rows]
+        times, time_valid = parse_timestamp_column(subset['Time Stamp'])
+        is_tlp = tlp_rows[rows]
+        sequence_numbers, sequence_valid = _parse_sequence_numbers(
+            subset['PSN'].where(is_tlp, subset['AckNak_Seq_Num'])
+        )
+        keep = time_valid & sequence_valid
+        times, sequence_numbers, is_tlp = times[keep], sequence_numbers[keep], is_tlp[keep]
+        is_nak = (dllp_types.to_numpy()[rows][keep] == 'NAK') & ~is_tlp
+
+        # Upstream TLPs: unwrap the PSNs; first transmissions are the ones above every earlier PSN
+        psns = unwrap_sequence_numbers(sequence_numbers[is_tlp], self.last_psn)
+        tlp_times = times[is_tlp]
+        before_chunk = psns[0] - 1 if self.max_psn is None and len(psns) else self.max_psn
+        running_max = np.maximum.accumulate(np.maximum(psns, before_chunk)) if len(psns) else psns
+        previous_max = np.concatenate([[before_chunk], running_max[:-1]]) if len(psns) else psns
+        first = psns > previous_max
+        self.tlps += len(psns)
+        self.replays += int((~first).sum())
+        if len(psns):
+            self.last_psn = int(psns[-1])
+            self.max_psn = int(running_max[-1])
+
+        # ACK/NAK DLLPs: unwrap each sequence number to the newest PSN transmitted before it that it can
+        # name; ACKs before the first TLP of the trace retire nothing
+        tlps_before = np.cumsum(is_tlp)[~is_tlp]
+        newest_psns = np.where(
+            tlps_before > 0, running_max[np.maximum(tlps_before - 1, 0)] if len(psns) else 0,
+            -1 if before_chunk is None else before_chunk
+        )
+        known = (tlps_before > 0) | (before_chunk is not None)
+        ack_psns = newest_psns - np.mod(newest_psns - sequence_numbers[~is_tlp], PSN_MODULUS)
+        ack_psns = np.where(known, ack_psns, np.iinfo(np.int64).min)
+        ack_times = times[~is_tlp]
+        self.acks += len(ack_times)
+        self.naks += int(is_nak.sum())
+        if self.acked_psn is not None:
+            ack_psns = np.maximum(ack_psns, self.acked_psn)
+        acked = np.maximum.accumulate(ack_psns) if len(ack_psns) else ack_psns
+        if len(acked):
+            self.acked_psn = int(acked[-1])
+
+        # Merge the outstanding PSNs (sorted) with the cumulative ACKs (sorted): each TLP is retired by
+        # the first ACK covering its PSN
+        pending_psns = np.concatenate([self.pending_psns, psns[first]])
+        pending_times = np.concatenate([self.pending_times, tlp_times[first]])
+        ack_idx = np.searchsorted(acked, pending_psns, side='left')
+        matched = ack_idx < len(acked)
+        self.histogram.add(pending_times[matched], ack_times[ack_idx[matched]] - pending_times[matched])
+
+        # Keep what is still outstanding, except PSNs too far behind to ever be acknowledged
+        pending_psns, pending_times = pending_psns[~matched], pending_times[~matched]
+        alive = pending_psns > (self.max_psn if self.max_psn is not None else 0) - PSN_MODULUS // 2
+        self.unacknowledged += int((~alive).sum())
+        self.pending_psns, self.pending_times = pending_psns[alive], pending_times[alive]
+        return int(matched.sum())
+
+    def summary(self):
+        """Counts and latency statistics (in ns) as plain Python data."""
+        histogram = self.histogram
+        p50, p90, p99 = (histogram.quantiles([0.5, 0.9, 0.99]) / 1e3).tolist() if histogram.total else [None] * 3
+        return {
+            'tlps': self.tlps, 'replays': self.replays, 'acks': self.acks, 'naks': self.naks,
+            'matched': histogram.total, 'unacknowledged': self.unacknowledged, 'outstanding': len(self.pending_psns),
+            'min_ns': histogram.min_ps / 1e3 if histogram.total else None,
+            'mean_ns': histogram.sum_ps / histogram.total / 1e3 if histogram.total else None,
+            'p50_ns': p50, 'p90_ns': p90, 'p99_ns': p99,
+            'max_ns': histogram.max_ps / 1e3 if histogram.total else None,
+        }
+
+    def describe(self):
+        return f"Joined {self.histogram.total} of {self.tlps} upstream TLPs with their ACKs"
+
+def stream_trace(file_path, consumers, chunksize=CSV_CHUNK_ROWS):
+    """Read the whole trace once, in order, handing every chunk to each consumer's add().
+
+    Each consumer has a `name` and lists the columns (and their dtypes) it reads in a `columns` dict;
+    only their union is parsed. Returns the number of rows read.
+    """
+    start_time = time.perf_counter()
+    dtype = {column: column_dtype for consumer in consumers for column, column_dtype in consumer.columns.items()}
+    chunks = pd.read_csv(file_path, usecols=list(dtype), dtype=dtype, chunksize=chunksize)
+    total_rows = 0
+    for chunk in profiled_chunks(chunks, 'read_csv'):
+        total_rows += len(chunk)
+        for consumer in consumers:
+            with profile_stage(consumer.name):
+                consumer.add(chunk)
+    elapsed = time.perf_counter() - start_time
+    for consumer in consumers:
+        print(f"{consumer.describe()} ({total_rows} rows in {elapsed:.1f}s)")
+    return total_rows
+
+# ----------------------------------------------------------------------------------------------------
+# Link bandwidth: packet counts and payload bytes of every TLP per fixed-width time bin, split by
+# (Link Dir, TLP Type), accumulated chunk by chunk with one bincount over integer time bins and pair
+# ids. Time bins double in width as the trace grows, like the latency histograms, so memory is bounded.
+# ----------------------------------------------------------------------------------------------------
+
+# TLP types whose Length is a payload carried by the packet (a read's Length is what it asks for)
+PAYLOAD_TLP_PREFIXES = ('MWr', 'CplD', 'IOWr', 'CfgWr', 'MsgD', 'FetchAdd', 'Swap', 'CAS')
+
+BANDWIDTH_INITIAL_BIN_PS = 1_000_000
+BANDWIDTH_MAX_TIME_BINS = 2048
+
+# Time bins in the rolling bandwidth window
+BANDWIDTH_WINDOW_BINS = 10
+
+def merge_time_bins(counts, bin_width_ps, last_bin):
+    """Merge the rows of a (time bins x ...) count array pairwise, doubling the bin width, until bin
+    `last_bin` fits; returns (counts, bin_width_ps). The array keeps its shape."""
+    max_bins = len(counts)
+    while last_bin >= max_bins:
+        counts = np.concatenate([
+            counts.reshape(max_bins // 2, 2, *counts.shape[1:]).sum(axis=1), np.zeros_like(counts[:max_bins // 2])
+        ])
+        bin_width_ps *= 2
+        last_bin //= 2
+    return counts, bin_width_ps
+
+class BandwidthTimeline:
+    """Packets and payload bytes per (time bin, Link Dir, TLP Type) over a whole trace.
+
+    Time bin b covers [origin + b * bin_width_ps, origin + (b + 1) * bin_width_ps) from the first TLP's
+    time. (Link Dir, TLP Type) pairs get column ids in the order they first appear.
+    """
+
+    # Key of the results dict, and the trace columns read by add(), for stream_trace
+    name = 'bandwidth'
+    columns = {'Link Dir': 'category', 'TLP Type': 'category', 'Length': 'float64', 'Time Stamp': str}
+
+    def __init__(self, bin_width_ps=BANDWIDTH_INITIAL_BIN_PS, max_bins=BANDWIDTH_MAX_TIME_BINS):
+        self.bin_width_ps = bin_width_ps
+        self.origin = None
+        self.pairs = []             # (Link Dir, TLP Type) of each column
+        self._pair_ids = {}
+        # Packets and payload bytes, stacked on the last axis
+        self.counts = np.zeros((max_bins, 0, 2), dtype=np.int64)
+        self.end_ps = None
+
+    def _pair_columns(self, link_dirs, tlp_types):
+        """Column id of each (Link Dir, TLP Type) pair, adding columns for new pairs."""
+        keys = pd.MultiIndex.from_arrays([link_dirs, tlp_types])
+        codes, uniques = pd.factorize(keys)
+        ids = np.array([self._pair_ids.setdefault(pair, len(self._pair_ids)) for pair in uniques], dtype=np.int64)
+        if len(self._pair_ids) > len(self.pairs):
+            self.pairs = list(self._pair_ids)
+            self.counts = np.pad(self.counts, ((0, 0), (0, len(self.pairs) - self.counts.shape[1]), (0, 0)))
+        return ids[codes]
+
+    def add(self, chunk):
+        """Count the TLPs of the next chunk of trace rows (in trace order)."""
+        tlps = chunk[chunk['TLP Type'].notna() & chunk['Link Dir'].notna()]
+        if tlps.empty:
+            return
+        times, valid = parse_timestamp_column(tlps['Time Stamp'])
+        tlps, times = tlps[valid], times[valid]
+        if not len(times):
+            return
+        if self.origin is None:
+            self.origin = int(times[0])
+        self.end_ps = max(int(times.max()), self.end_ps or 0)
+        last_bin = (int(times.max()) - self.origin) // self.bin_width_ps
+        self.counts, self.bin_width_ps = merge_time_bins(self.counts, self.bin_width_ps, last_bin)
+        columns = self._pair_columns(tlps['Link Dir'].to_numpy(dtype=object), tlps['TLP Type'].to_numpy(dtype=object))
+        tlp_types = tlps['TLP Type'].astype(str)
+        has_payload = tlp_types.str.startswith(PAYLOAD_TLP_PREFIXES).to_numpy()
+        payload_bytes = np.where(has_payload, tlps['Length'].fillna(0).to_numpy(dtype=np.int64) * 4, 0)
+        cells = np.maximum((times - self.origin) // self.bin_width_ps, 0) * len(self.pairs) + columns
+        n_cells = len(self.counts) * len(self.pairs)
+        self.counts[:, :, 0] += np.bincount(cells, minlength=n_cells).reshape(len(self.counts), -1)
+        self.counts[:, :, 1] += np.bincount(cells, weights=payload_bytes, minlength=n_cells).astype(np.int64).reshape(
+            len(self.counts), -1)
+
+    @property
+    def n_bins(self):
+        """Time bins up to the last non-empty one."""
+        used = np.flatnonzero(self.counts[:, :, 0].any(axis=1))
+        return int(used[-1]) + 1 if len(used) else 0
+
+    def rolling_gbps(self, window=BANDWIDTH_WINDOW_BINS):
+        """Payload bandwidth in GB/s of each pair over a rolling window of `window` bins ending at each bin;
+        the first bins average over the bins seen so far. An (n_bins x pairs) array."""
+        payload = self.counts[:self.n_bins, :, 1].astype(np.float64)
+        window_bytes = sliding_window_sum(payload, window)
+        window_bins = np.minimum(np.arange(1, len(payload) + 1), window)[:, None]
+        return window_bytes / (window_bins * self.bin_width_ps / 1e12) / 1e9
+
+    def summary(self):
+        """Per (Link Dir, TLP Type): packets, payload bytes, mean and peak rolling payload bandwidth (GB/s)."""
+        if not self.pairs or self.origin is None:
+            return []
+        totals = self.counts.sum(axis=0)
+        # At least one bin, so a trace of a few packets does not report an absurd mean
+        duration_s = max(self.end_ps - self.origin, self.bin_width_ps) / 1e12
+        peak = self.rolling_gbps().max(axis=0)
+        rows = [{
+            'link_dir': link_dir, 'tlp_type': tlp_type, 'packets': int(totals[pair_idx, 0]),
+            'payload_bytes': int(totals[pair_idx, 1]), 'mean_gbps': float(totals[pair_idx, 1] / duration_s / 1e9),
+            'peak_gbps': float(peak[pair_idx])
+        } for pair_idx, (link_dir, tlp_type) in enumerate(self.pairs)]
+        return sorted(rows, key=lambda row: (-row['payload_bytes'], -row['packets']))
+
+    def describe(self):
+        packets = int(self.counts[:, :, 0].sum())
+        return f"Counted {packets} TLPs in {len(self.pairs)} (Link Dir, TLP Type) pairs for the bandwidth timeline"
+
+# Number of set bits in each byte value, for popcount on numpy versions without np.bitwise_count
+_POPCOUNT_LUT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def popcount(values):
+    """Number of set bits in each element of an unsigned integer array."""
+    values = np.ascontiguousarray(values)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    byte_counts = _POPCOUNT_LUT[values.view(np.uint8)].reshape(values.shape + (values.itemsize,))
+    return byte_counts.sum(axis=-1, dtype=np.uint8)
+
+# Bits set in each byte value, as a 256 x 8 table of 0/1 indexed by [byte value, bit]
+_BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1, bitorder='little').astype(np.int64)
+
+# Rows per block when bit_pair_agreement() multiplies out the bit matrix, bounding its temporary memory
+BIT_PAIR_CHUNK_ROWS = 1 << 20
+
+def bit_counts(values, n_bits=None):
+    """Number of elements with each bit set, for bits 0 .. n_bits-1 (default: every bit of the dtype)."""
+    values = np.asarray(values)
+    n_bits = values.dtype.itemsize * 8 if n_bits is None else n_bits
+    # One histogram per byte position; each byte value's count goes to the bits it has set
+    value_bytes = values.astype(values.dtype.newbyteorder('<'), copy=False).view(np.uint8)
+    value_bytes = value_bytes.reshape(len(values), values.dtype.itemsize)
+    counts = np.concatenate([np.bincount(value_bytes[:, byte], minlength=256) @ _BYTE_BITS
+                             for byte in range(values.dtype.itemsize)])
+    return counts[:n_bits]
+
+def bit_pair_agreement(values, bits):
+    """k x k matrix of how many elements have bits[i] equal to bits[j], computed in one pass over values."""
+    values = np.asarray(values)
+    shifts = np.array(bits, dtype=values.dtype)
+    both_set = np.zeros((len(bits), len(bits)), dtype=np.int64)
+    for start in range(0, len(values), BIT_PAIR_CHUNK_ROWS):
+        # float32 products are exact here: no entry of a block can exceed BIT_PAIR_CHUNK_ROWS
+        block = ((values[start:start + BIT_PAIR_CHUNK_ROWS, None] >> shifts) & values.dtype.type(1)).astype(np.float32)
+        both_set += (block.T @ block).astype(np.int64)
+    ones = np.diag(both_set)
+    # Equal when both are set or both are clear; both clear = n - ones_a - ones_b + both set
+    return len(values) - ones[:, None] - ones[None, :] + 2 * both_set
+
+class FeatureStore:
+    """A packet subset whose derived columns are computed the first time they are requested, then kept.
+
+    `providers` maps a tuple of column names to a function of the store returning one array per name;
+    providers request the columns they depend on through the store, so dependencies resolve on demand.
+    """
+
+    def __init__(self, frame, providers):
+        self.frame = frame
+        self._providers = {name: (names, func) for names, func in providers.items() for name in names}
+        self._cubes = {}
+
+    @property
+    def empty(self):
+        return self.frame.empty
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __getitem__(self, name):
+        return self.require(name)[name]
+
+    def time_value_cube(self, column):
+        """TimeValueCube of `column` against Time_Stamp_ps over the rows where both are present, built once."""
+        if column not in self._cubes:
+            valid = self.require(column, 'Time_Stamp_ps').dropna(subset=['Time_Stamp_ps', column])
+            self._cubes[column] = TimeValueCube(
+                valid['Time_Stamp_ps'].to_numpy(dtype=np.int64), valid[column].to_numpy(dtype=np.int64)
+            )
+        return self._cubes[column]
+
+    def require(self, *names):
+        """Compute any of `names` not yet present and return the underlying frame."""
+        for name in names:
+            if name in self.frame.columns:
+                continue
+            if name not in self._providers:
+                raise KeyError(f"No column or derived feature named {name!r}")
+            provided_names, func = self._providers[name]
+            for provided_name, values in zip(provided_names, func(self)):
+                self.frame[provided_name] = values
+        return self.frame
+
+def _nullable_parts(series, dtype):
+    """Split a nullable integer column into (numpy values with <NA> as 0, validity mask)."""
+    return series.to_numpy(dtype=dtype, na_value=0), series.notna().to_numpy()
+
+def _dw2_first_word(store):
+    dw2 = store.frame
+    dw2_words = data_word_matrix(dw2)
+    dw2_counts = dw2['DATA_dword_count'].to_numpy()
+    first_word = (dw2_words[:, 0] >> 16) & 0xFFFF if dw2_words.shape[1] else np.zeros(len(dw2), np.uint32)
+    return [_nullable_int(first_word, dw2_counts > 0, np.uint32)]
+
+def _dw2_first_word_big_endian(store):
+    # convert first_word from little-endian to big-endian
+    first_word, valid = _nullable_parts(store['first_word'], np.uint32)
+    first_word_big_endian = _nullable_int(((first_word & 0xFF) << 8) | ((first_word & 0xFF00) >> 8), valid, np.uint32)
+    # find the smallest and largest values in the first_word column
+    min_first_word = first_word_big_endian.min()
+    max_first_word = first_word_big_endian.max()
+    if pd.notna(min_first_word) and pd.notna(max_first_word):
+        # print some statistics about the first word
+        print(f"Analyzing 2-dword writes:")
+        print(f"Number of 2-dword writes: {len(store)}")
+        print(f"Minimum first word: 0x{min_first_word:04X}")
+        print(f"Maximum first word: 0x{max_first_word:04X}")
+        print(f"Range of first word: {max_first_word - min_first_word:04X}")
+    else:
+        print("Warning: Unable to find min or max first word values.")
+    return [first_word_big_endian]
+
+def _dw2_normalized_first_word(store):
+    first_word_big_endian = store['first_word_big_endian']
+    min_first_word = first_word_big_endian.min()
+    return [first_word_big_endian - min_first_word if pd.notna(min_first_word) else first_word_big_endian]
+
+def _dw2_remainder_6(store):
+    # the remainder when dividing the normalized first word by 6
+    return [store['normalized_first_word'] % 6]
+
+def _dw2_color(store):
+    # Map remainder_6 to color
+    remainder, valid = _nullable_parts(store['remainder_6'], np.int64)
+    return [np.where(valid, np.array(SIX_COLOR_PALETTE, dtype=object)[remainder], '#CCCCCC')]
+
+def _dw32_address_bits_15_7(store):
+    address, valid = _nullable_parts(store['Address_u64'], np.uint64)
+    return [_nullable_int((address >> 7) & 0x1FF, valid, np.uint16)]
+
+def _dw32_address_lower_16bits(store):
+    address, valid = _nullable_parts(store['Address_u64'], np.uint64)
+    return [_nullable_int(address & 0xFFFF, valid, np.uint16)]
+
+def _dw32_qwords(store):
+    dw32 = store.frame
+    dw32_words = data_word_matrix(dw32)
+    dw32_counts = dw32['DATA_dword_count'].to_numpy()
+    has_qword = dw32_counts > 1
+    if dw32_words.shape[1] > 1:
+        rows = np.arange(len(dw32))
+        last_idx = np.maximum(dw32_counts - 2, 0)
+        first_qword = (dw32_words[:, 0].astype(np.uint64) << 32) | dw32_words[:, 1]
+        last_qword = (dw32_words[rows, last_idx].astype(np.uint64) << 32) | dw32_words[rows, last_idx + 1]
+    else:
+        first_qword = last_qword = np.zeros(len(dw32), dtype=np.uint64)
+    return [_nullable_int(first_qword, has_qword, np.uint64), _nullable_int(last_qword, has_qword, np.uint64)]
+
+def _dw32_remainder_6(store):
+    # the remainder when dividing the address bits 15:7 by 6
+    return [store['Address_bits_15_7'] % 6]
+
+# Derived columns of each packet subset, keyed by the column names each provider returns
+DW2_FEATURES = {
+    ('first_word',): _dw2_first_word,
+    ('first_word_big_endian',): _dw2_first_word_big_endian,
+    ('normalized_first_word',): _dw2_normalized_first_word,
+    ('remainder_6',): _dw2_remainder_6,
+    ('color',): _dw2_color,
+}
+DW32_FEATURES = {
+    ('Address_bits_15_7',): _dw32_address_bits_15_7,
+    ('Address_lower_16bits',): _dw32_address_lower_16bits,
+    ('first_qword', 'last_qword'): _dw32_qwords,
+    ('remainder_6',): _dw32_remainder_6,
+}
+
+# Derived columns read by generate_summary_report, whatever plots are enabled
+REPORT_FEATURES = {'dw2': ['first_word_big_endian'], 'dw32': ['Address_u64']}
+
+def extract_analysis_sets(df, plots=None):
+    """Split the trace into the 2-DW and 32-DW write subsets, each wrapped in a FeatureStore.
+
+    When `plots` is given, the derived columns those plots and the summary report read are computed up
+    front; any other column is computed only if something asks for it.
+    """
     results = {}
     if df is None or df.empty:
         return results
@@ -320,66 +2350,17 @@ def extract_analysis_sets(df):
     # analyzing 2-dword writes
     dw2 = df[df['Length'] == 2].copy()
     if not dw2.empty:
-        dw2['first_word'] = dw2['DATA_parsed'].apply(lambda x: (x[0] >> 16) & 0xFFFF if len(x) > 0 else None)
-        # Extract individual data bits 15:7
-        for bit in range(7, 16):
-            dw2[f'data_bit_{bit}'] = dw2['first_word'].apply(lambda x: (x >> bit) & 1 if pd.notna(x) else None)
-        results['dw2'] = dw2
-        # convert first_word from little-endian to big-endian
-        dw2['first_word_big_endian'] = dw2['first_word'].apply(lambda x: ((x & 0xFF) << 8) | ((x & 0xFF00) >> 8) if pd.notna(x) else None)
-        # find the smallest and largest values in the first_word column
-        min_first_word = dw2['first_word_big_endian'].min()
-        max_first_word = dw2['first_word_big_endian'].max()
-        if not pd.notna(min_first_word) or not pd.notna(max_first_word):
-            print("Warning: Unable to find min or max first word values. Aborting further analysis.")
-            return results
-
-        # print some statistics about the first word
-        print(f"Analyzing 2-dword writes:")
-        print(f"Number of 2-dword writes: {len(dw2)}")
-        print(f"Minimum first word: 0x{min_first_word:04X}")
-        print(f"Maximum first word: 0x{max_first_word:04X}")
-        print(f"Range of first word: {max_first_word - min_first_word:04X}")
-
-        dw2['normalized_first_word'] = dw2['first_word_big_endian'] - min_first_word if pd.notna(min_first_word) else dw2['first_word_big_endian']
-        # create a column for the remainder when dividing the normalized first word by 6
-        dw2['remainder_6'] = dw2['normalized_first_word'] % 6
-
-        # Map remainder_6 to color
-        dw2['color'] = dw2['remainder_6'].apply(lambda x: SIX_COLOR_PALETTE[int(x)] if pd.notna(x) else '#CCCCCC')
-
-        # --- Enhancement: Count bit 0 of first_word_big_endian ---
-        dw2['bit0'] = dw2['first_word_big_endian'].apply(lambda x: (int(x) & 1) if pd.notna(x) else None)
-        bit0_0_count = dw2['bit0'].eq(0).sum()
-        bit0_1_count = dw2['bit0'].eq(1).sum()
-        results['dw2_bit0_0_count'] = int(bit0_0_count)
-        results['dw2_bit0_1_count'] = int(bit0_1_count)
+        results['dw2'] = FeatureStore(dw2, DW2_FEATURES)
 
     # analyzing 32-dword writes
     dw32 = df[df['Length'] == 32].copy()
     if not dw32.empty:
-        dw32['Address_bits_15_7'] = dw32['Address_lower_16bits'].apply(
-            lambda x: (x >> 7) & 0x1FF if pd.notna(x) else None
-        )
-        # Extract individual address bits 15:7
-        for bit in range(7, 16):
-            dw32[f'addr_bit_{bit}'] = dw32['Address_lower_16bits'].apply(lambda x: (x >> bit) & 1 if pd.notna(x) else None)
-        dw32['first_qword'] = dw32['DATA_parsed'].apply(
-            lambda x: ((x[0] << 32) | x[1]) if len(x) > 1 else None
-        )
-        dw32['last_qword'] = dw32['DATA_parsed'].apply(
-            lambda x: ((x[-2] << 32) | x[-1]) if len(x) > 1 else None
-        )
-        results['dw32'] = dw32
-        # create a column for the remainder when dividing the address bits 15:7 by 6
-        dw32['remainder_6'] = dw32['Address_bits_15_7'] % 6
+        results['dw32'] = FeatureStore(dw32, DW32_FEATURES)
 
-        # --- Enhancement: Count bit 7 of address ---
-        dw32['addr_bit_7'] = dw32['Address_lower_16bits'].apply(lambda x: (int(x) >> 7) & 1 if pd.notna(x) else None)
-        addr_bit7_0_count = dw32['addr_bit_7'].eq(0).sum()
-        addr_bit7_1_count = dw32['addr_bit_7'].eq(1).sum()
-        results['dw32_addr_bit7_0_count'] = int(addr_bit7_0_count)
-        results['dw32_addr_bit7_1_count'] = int(addr_bit7_1_count)
+    if plots is not None:
+        for subset, columns in required_features(plots).items():
+            if subset in results:
+                results[subset].require(*columns)
 
     # The actual byte size for the copy is calculated using the formula: 
     # (threadsPerBlock * deviceSMCount) * floor(copySize / (threadsPerBlock * deviceSMCount)). 
@@ -389,317 +2370,666 @@ def extract_analysis_sets(df):
 
     return results
 
-def plot_relationships(results, output_dir, plot_heights, enable_plot):
-    output_paths = []
-    dw2 = results.get('dw2', pd.DataFrame())
-    dw32 = results.get('dw32', pd.DataFrame())
+# Value range of the plot 18 sketches in ns: timestamps are whole picoseconds, and 10 s is past any trace
+PARTNER_DELTA_MIN_NS = 1e-3
+PARTNER_DELTA_MAX_NS = 1e10
 
-    # 16. Animated histogram: Number of occurrences of each first_word_big_endian value for each time bin (not cumulative)
-    if not dw2.empty and 16 in enable_plot:
-        # Create time bins (e.g., 100 bins)
-        n_bins = 100
-        time_min = dw2['Time Stamp'].min()
-        time_max = dw2['Time Stamp'].max()
-        time_bins = np.linspace(time_min, time_max, n_bins + 1)
-
-        # Assign each row to a time bin
-        dw2['time_bin'] = pd.cut(dw2['Time Stamp'], bins=time_bins, labels=False, include_lowest=True)
-
-        # Find all unique first_word_big_endian values across all bins, sorted
-        all_fw_values = sorted(dw2['first_word_big_endian'].dropna().unique())
-        color_map = {fw: THIRTYTHREE_COLOR_PALETTE[i % len(THIRTYTHREE_COLOR_PALETTE)] for i, fw in enumerate(all_fw_values)}
-
-        # Prepare frame data for animation (sliding window of 10 bins)
-        frame_dfs = []
-        global_count_max = 0
-        for bin_idx in range(n_bins):
-            # Select the current and previous 10 bins
-            if bin_idx < 10:
-                frame_df = dw2[dw2['time_bin'].isin(range(0, bin_idx + 1))]
-            else:
-                frame_df = dw2[dw2['time_bin'].isin(range(bin_idx - 9, bin_idx + 1))]
-            counts = frame_df['first_word_big_endian'].value_counts().sort_index()
-            if counts.empty:
-                continue
-            # Ensure all_fw_values are present in every frame (fill missing with 0)
-            frame_data = []
-            for fw in all_fw_values:
-                frame_data.append({
-                    'first_word_big_endian': fw,
-                    'count': counts.get(fw, 0),
-                    'color': color_map[fw]
-                })
-            fw_hist_df = pd.DataFrame(frame_data)
-            global_count_max = max(global_count_max, int(fw_hist_df['count'].max()))
-            frame_dfs.append((bin_idx, fw_hist_df))
-
-        # Build frames with fixed y-scale across all bins
-        fixed_ylim = (0, max(1, global_count_max))
-        frames = []
-        for bin_idx, fw_hist_df in frame_dfs:
-            bars = hv.Bars(
-                fw_hist_df, kdims=['first_word_big_endian'], vdims=['count', 'color']
-            ).opts(
-                opts.Bars(
-                    title=f'Occurrences of Each First Word Value (2-DW Writes) - Time Bin {bin_idx+1}/{n_bins}',
-                    color='color', 
-                    line_color=None,
-                    width=2300, height=800,
-                    xlabel='First Word (16 bits)', ylabel='Count',
-                    ylim=fixed_ylim,
-                    tools=['hover'],
-                    hooks=[apply_light_background]
-                )
-            )
-            frames.append((bin_idx, bars))
+def nearest_bit_partner_deltas(times, addresses, bit):
+    """For each row with address bit `bit` clear, return the time to the nearest row whose address differs
+    only in that bit being set (searching forward and backward), or NaN when there is none.
 
-        # Create HoloMap for animation
-        anim = hv.HoloMap(dict(frames), kdims='Time Bin')
-        out_anim = os.path.join(output_dir, 'anim_hist_2dw_firstword_occurrences.html')
-        pn.panel(anim).save(out_anim, embed=True)
-        output_paths.append(out_anim)
-        plot_heights['anim_hist_2dw_firstword_occurrences.html'] = 800
+    Rows with the bit set are indexed once by (address with the bit masked, time), so every lookup is a
+    binary search instead of a scan over the whole trace. Deltas are in the units of `times`.
+    """
+    times = np.asarray(times)
+    addresses = np.asarray(addresses, dtype=np.int64)
+    n_rows = len(times)
+    deltas = np.full(n_rows, np.nan)
+    bit_mask = np.int64(1 << bit)
+    keys = addresses & ~bit_mask
+    is_partner = (addresses & bit_mask) != 0
+    query_idx = np.flatnonzero(~is_partner)
+    partner_idx = np.flatnonzero(is_partner)
+    if len(query_idx) == 0 or len(partner_idx) == 0:
+        return deltas
+
+    # Rank every timestamp so (key, time) can be folded into one sortable int64: key_id * (n + 1) + rank
+    time_rank = np.searchsorted(np.sort(times), times)
+    unique_keys = np.unique(keys[partner_idx])
+    partner_key_id = np.searchsorted(unique_keys, keys[partner_idx])
+    partner_composite = partner_key_id * (n_rows + 1) + time_rank[partner_idx]
+    order = np.argsort(partner_composite, kind='stable')
+    partner_composite = partner_composite[order]
+    partner_times = times[partner_idx][order]
+    partner_key_id = partner_key_id[order]
+
+    query_key_id = np.searchsorted(unique_keys, keys[query_idx])
+    has_group = query_key_id < len(unique_keys)
+    has_group[has_group] = unique_keys[query_key_id[has_group]] == keys[query_idx][has_group]
+    query_composite = query_key_id * (n_rows + 1) + time_rank[query_idx]
+    query_times = times[query_idx]
+
+    # The nearest partner is either the first one at/after the query time or the last one before it
+    pos = np.searchsorted(partner_composite, query_composite)
+    best = np.full(len(query_idx), np.inf)
+    for candidate in (pos, pos - 1):
+        in_range = (candidate >= 0) & (candidate < len(partner_composite))
+        clipped = np.clip(candidate, 0, len(partner_composite) - 1)
+        same_group = in_range & has_group & (partner_key_id[clipped] == query_key_id)
+        gap = np.abs(partner_times[clipped] - query_times)
+        best = np.where(same_group, np.minimum(best, gap), best)
+
+    deltas[query_idx] = np.where(np.isfinite(best), best, np.nan)
+    return deltas
+
+def time_bin_index(times, n_bins):
+    """Assign each timestamp to one of n_bins equal-width bins spanning its min..max.
+
+    Matches pd.cut(times, np.linspace(min, max, n_bins + 1), labels=False, include_lowest=True):
+    bins are closed on the right and the first bin also includes the minimum. Integer timestamps are
+    binned exactly, with no rounding at the bin edges.
+    """
+    times = np.asarray(times)
+    if np.issubdtype(times.dtype, np.integer) and len(times):
+        start = int(times.min())
+        span = int(times.max()) - start
+        # An integer t is above the edge start + i * span / n_bins exactly when it is above that edge rounded
+        # down, so integer edges computed with Python ints give exact bins for any span
+        edges = np.array([start + edge_idx * span // n_bins for edge_idx in range(n_bins + 1)], dtype=np.int64)
+    else:
+        times = times.astype(np.float64)
+        edges = np.linspace(np.nanmin(times), np.nanmax(times), n_bins + 1)
+    bin_ids = np.searchsorted(edges, times, side='left') - 1
+    return np.clip(bin_ids, 0, n_bins - 1)
+
+def sliding_window_sum(counts, window):
+    """Sum the rows of a (bins x levels) count array over a sliding window: row b covers bins
+    max(0, b - window + 1) .. b. One cumulative-sum difference, so linear in the array size."""
+    window_counts = np.cumsum(counts, axis=0)
+    window_counts[window:] -= window_counts[:-window].copy()
+    return window_counts
+
+# Base time resolution of TimeValueCube. 50400 = 2^5 * 3^2 * 5^2 * 7, so every bin count from 1 to 10, and
+# 50, 100, 200, 400 and many others, divide it and can be reduced from the cube exactly
+CUBE_BASE_BINS = 50400
+
+class TimeValueCube:
+    """Counts of (time bin, value) pairs at CUBE_BASE_BINS time bins and exact values, built in one pass.
+
+    Any time binning whose bin count divides the base bin count, and any value bucketing, is a reduction
+    over the cube, so sweeping bin counts, window sizes and group sizes never rescans the trace. Only the
+    non-empty cells are stored, as (base bin, level index, count) triples sorted by bin then level.
+    """
 
-        out_gif = os.path.join(output_dir, 'anim_hist_2dw_firstword_occurrences.gif')
-        gif_path = save_holoviews_frames_as_gif(frames, out_gif, duration=0.12)
-        if gif_path is not None:
-            print(f"Animated GIF written to: {gif_path}")
+    def __init__(self, times, values, base_bins=CUBE_BASE_BINS):
+        self.base_bins = base_bins
+        self.levels, level_ids = np.unique(np.asarray(values, dtype=np.int64), return_inverse=True)
+        base_bin_ids = time_bin_index(times, base_bins)
+        keys, self.counts = np.unique(base_bin_ids * len(self.levels) + level_ids, return_counts=True)
+        self.base_bin_ids, self.level_ids = np.divmod(keys, max(len(self.levels), 1))
+
+    def histogram(self, n_bins, group_size=None):
+        """Counts per time bin, the same as time_bin_index(times, n_bins) would give.
+
+        Returns (levels, counts): the sorted distinct values (or 1-based group numbers when group_size is
+        given, with group 1 starting at the smallest value) and an (n_bins x levels) count array.
+        """
+        if n_bins < 1 or self.base_bins % n_bins:
+            raise ValueError(f"{n_bins} time bins do not evenly divide the cube's {self.base_bins} base bins")
+        levels = self.levels
+        level_ids = self.level_ids
+        if group_size is not None:
+            levels, group_ids = np.unique((levels - levels.min()) // group_size + 1, return_inverse=True)
+            level_ids = group_ids[level_ids]
+        # Coarse bin b is exactly base bins b * k .. b * k + k - 1, because the bin edges nest
+        counts = np.bincount(
+            (self.base_bin_ids // (self.base_bins // n_bins)) * len(levels) + level_ids,
+            weights=self.counts, minlength=n_bins * len(levels)
+        )
+        return levels, counts.astype(np.int64).reshape(n_bins, len(levels))
 
-    # 19. Animated histogram (grouped x-axis): like plot 16, but 50 time bins and first_word_big_endian grouped into size-33 buckets
-    if not dw2.empty and 19 in enable_plot:
-        # Create time bins (50 bins)
-        n_bins = 50
-        time_min = dw2['Time Stamp'].min()
-        time_max = dw2['Time Stamp'].max()
-        time_bins = np.linspace(time_min, time_max, n_bins + 1)
-
-        # Assign each row to a time bin
-        dw2['time_bin_19'] = pd.cut(dw2['Time Stamp'], bins=time_bins, labels=False, include_lowest=True)
-
-        fw_min = int(dw2['first_word_big_endian'].min())
-        # Group first_word_big_endian values into buckets of size 33:
-        # group 1 => [fw_min .. fw_min+32], group 2 => [fw_min+33 .. fw_min+65], etc.
-        dw2['first_word_big_endian_group33'] = dw2['first_word_big_endian'].apply(
-            lambda x: ((int(x) - fw_min) // 33) + 1 if pd.notna(x) else None
+    def sliding_window_histogram(self, n_bins, window, group_size=None):
+        """Like histogram, with each row summed over a sliding window of `window` bins (see sliding_window_sum)."""
+        levels, counts = self.histogram(n_bins, group_size)
+        return levels, sliding_window_sum(counts, window)
+
+def sliding_histogram_bar_frames(levels, window_counts, value_name, title, fixed_ylim=True, **bar_options):
+    """Turn sliding-window counts into (bin_idx, hv.Bars) animation frames, skipping empty windows.
+
+    `title` may use {bin} (1-based) and {n_bins}; bar_options are passed to opts.Bars.
+    """
+    n_bins = len(window_counts)
+    colors = [THIRTYTHREE_COLOR_PALETTE[i % len(THIRTYTHREE_COLOR_PALETTE)] for i in range(len(levels))]
+    if fixed_ylim:
+        # Fixed y-scale across all bins
+        bar_options['ylim'] = (0, max(1, int(window_counts.max(initial=0))))
+    frames = []
+    for bin_idx in np.flatnonzero(window_counts.sum(axis=1) > 0):
+        hist_df = pd.DataFrame({value_name: levels, 'count': window_counts[bin_idx], 'color': colors})
+        bars = hv.Bars(
+            hist_df, kdims=[value_name], vdims=['count', 'color']
+        ).opts(
+            opts.Bars(
+                title=title.format(bin=bin_idx + 1, n_bins=n_bins),
+                color='color',
+                tools=['hover'],
+                **bar_options
+            )
         )
+        frames.append((int(bin_idx), bars))
+    return frames
+
+# Client-side frame switcher for save_compact_animation: copies one row of the flat frame matrix
+# into the single glyph's data source and updates the title
+_COMPACT_ANIMATION_JS = """
+const n = categories.length;
+const i = slider.value;
+const values = frames.data.values;
+const data = Object.assign({}, source.data);
+data[value_column] = Array.from(values.slice(i * n, (i + 1) * n));
+source.data = data;
+fig.title.text = title.replace('{bin}', frame_labels[i]);
+"""
+
+def save_compact_animation(out_path, categories, frame_values, frame_labels, title, glyph='bars',
+                           colors=None, width=800, height=800, xlabel='', ylabel='', ylim=None,
+                           light_background=False, line_color='black', marker_size=20):
+    """Save an animation as one Bokeh glyph plus a slider, with all frame data stored once.
+
+    frame_values is an (n_frames x categories) array that is embedded as a single compressed typed
+    array; a small CustomJS callback swaps rows into the glyph's data source as the slider moves. The
+    HTML therefore grows with the data only, not with frames times the per-frame plot document.
+    `title` may contain {bin}, replaced by the frame's entry in frame_labels.
+    """
+    categories = [str(c) for c in categories]
+    frame_values = np.asarray(frame_values)
+    frame_values = frame_values.astype(np.float32 if glyph == 'scatter' else np.int32)
+    value_column = 'y' if glyph == 'scatter' else 'top'
+    if colors is None:
+        colors = [THIRTYTHREE_COLOR_PALETTE[i % len(THIRTYTHREE_COLOR_PALETTE)] for i in range(len(categories))]
+
+    source = ColumnDataSource({'x': categories, value_column: frame_values[0].tolist(), 'color': list(colors)})
+    frames_source = ColumnDataSource({'values': frame_values.ravel()})
+    fig = figure(
+        x_range=categories, width=width, height=height,
+        title=title.replace('{bin}', str(frame_labels[0])),
+        x_axis_label=xlabel, y_axis_label=ylabel, tools='pan,wheel_zoom,box_zoom,reset,save'
+    )
+    if ylim is not None:
+        fig.y_range = Range1d(*ylim)
+    if glyph == 'scatter':
+        fig.scatter(x='x', y='y', size=marker_size, color='color', source=source)
+    else:
+        fig.vbar(x='x', top='top', width=0.8, color='color', line_color=line_color, source=source)
+    fig.add_tools(HoverTool(tooltips=[(xlabel or 'value', '@x'), (ylabel or 'count', f'@{value_column}')]))
+    if light_background:
+        _style_light_figure(fig)
+
+    slider = Slider(start=0, end=max(1, len(frame_values) - 1), value=0, step=1, title='Frame', width=width)
+    slider.js_on_change('value', CustomJS(
+        args=dict(source=source, frames=frames_source, slider=slider, fig=fig, categories=categories,
+                  frame_labels=[str(label) for label in frame_labels], title=title,
+                  value_column=value_column),
+        code=_COMPACT_ANIMATION_JS
+    ))
+
+    page = file_html(column(fig, slider), CDN, title=os.path.basename(out_path),
+                     theme=built_in_themes['dark_minimal'])
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    return out_path
+
+def save_compact_histogram_animation(out_path, levels, window_counts, title, fixed_ylim=True, **kwargs):
+    """Save sliding-window histogram counts with save_compact_animation, skipping empty windows.
+
+    `title` may use {bin} (1-based) and {n_bins}, as in sliding_histogram_bar_frames.
+    """
+    frame_bins = np.flatnonzero(window_counts.sum(axis=1) > 0)
+    if fixed_ylim:
+        kwargs['ylim'] = (0, max(1, int(window_counts.max(initial=0))))
+    return save_compact_animation(
+        out_path, levels, window_counts[frame_bins], frame_bins + 1,
+        title.replace('{n_bins}', str(len(window_counts))), **kwargs
+    )
 
-        all_fw_group_values = sorted(dw2['first_word_big_endian_group33'].dropna().unique())
-        color_map = {
-            fw: THIRTYTHREE_COLOR_PALETTE[i % len(THIRTYTHREE_COLOR_PALETTE)]
-            for i, fw in enumerate(all_fw_group_values)
-        }
+# Relationships 1-7 from the header of this script: (plot number, output name, title, x, y), where x and
+# y name a (frame, column) pair; 'dw2_x_dw32' is each 2-DW write paired with the latest preceding 32-DW write
+SCATTER_RELATIONSHIPS = [
+    (1, 'scatter_2dw_firstword_vs_seq', 'First Word of 2-DW Writes vs. Sequence Number',
+     ('dw2', 'seq_num'), ('dw2', 'first_word_big_endian')),
+    (2, 'scatter_32dw_addr_vs_seq', 'Address Bits 15:7 of 32-DW Writes vs. Sequence Number',
+     ('dw32', 'seq_num'), ('dw32', 'Address_bits_15_7')),
+    (3, 'scatter_2dw_firstword_vs_32dw_addr', 'First Word of 2-DW Writes vs. Address Bits 15:7 of 32-DW Writes',
+     ('dw2_x_dw32', 'Address_bits_15_7'), ('dw2_x_dw32', 'first_word_big_endian')),
+    (4, 'scatter_32dw_lastqword_vs_seq', 'Last Qword of 32-DW Writes vs. Sequence Number',
+     ('dw32', 'seq_num'), ('dw32', 'last_qword')),
+    (5, 'scatter_32dw_firstqword_vs_seq', 'First Qword of 32-DW Writes vs. Sequence Number',
+     ('dw32', 'seq_num'), ('dw32', 'first_qword')),
+    (6, 'scatter_32dw_firstqword_vs_lastqword', 'First Qword vs. Last Qword of 32-DW Writes',
+     ('dw32', 'last_qword'), ('dw32', 'first_qword')),
+    (7, 'scatter_32dw_lastqword_vs_addr', 'Last Qword vs. Address Bits 15:7 of 32-DW Writes',
+     ('dw32', 'Address_bits_15_7'), ('dw32', 'last_qword')),
+]
 
-        # Prepare frame data for animation (sliding window of 10 bins)
-        frame_dfs = []
-        global_count_max = 0
-        for bin_idx in range(n_bins):
-            if bin_idx < 10:
-                frame_df = dw2[dw2['time_bin_19'].isin(range(0, bin_idx + 1))]
-            else:
-                frame_df = dw2[dw2['time_bin_19'].isin(range(bin_idx - 9, bin_idx + 1))]
+def _scatter_requirements(*axes):
+    """Columns a scatter relationship reads, by subset."""
+    requires = {}
+    for frame_name, column in axes:
+        if frame_name == 'dw2_x_dw32':
+            # _pair_with_preceding_dw32 reads these from both subsets
+            requires.setdefault('dw2', ['seq_num', 'first_word_big_endian'])
+            requires.setdefault('dw32', ['seq_num', 'Address_bits_15_7'])
+        elif column not in requires.setdefault(frame_name, []):
+            requires[frame_name].append(column)
+    return requires
+
+# Every plot this script can draw: plot number -> (description, {subset: columns the plot reads}).
+# Only the columns of the enabled plots (and REPORT_FEATURES) are derived from the trace.
+PLOT_REGISTRY = {
+    plot_num: (title, _scatter_requirements(x, y)) for plot_num, _, title, x, y in SCATTER_RELATIONSHIPS
+}
+PLOT_REGISTRY.update({
+    16: ('Animated histogram of 2-DW first word values per time bin', {'dw2': ['first_word_big_endian']}),
+    17: ('Animated histogram of 32-DW address bits 15:7 per time bin', {'dw32': ['Address_bits_15_7']}),
+    18: ('Animated time to the closest 32-DW write differing in one address bit', {'dw32': ['Address_lower_16bits']}),
+    19: ('Animated histogram of 2-DW first word groups (size 33) per time bin', {'dw2': ['first_word_big_endian']}),
+    # The ACK latency and bandwidth plots read the whole trace through stream_trace rather than a packet subset
+    20: ('Distribution of the ACK latency of upstream TLPs', {}),
+    21: ('ACK latency percentiles of upstream TLPs per time bin', {}),
+    22: ('Rolling payload bandwidth per link direction and TLP type', {}),
+})
+
+# Plots drawn from a stream_trace consumer over the whole trace: plot number -> consumer class
+WHOLE_TRACE_PLOTS = {20: AckLatencyJoin, 21: AckLatencyJoin, 22: BandwidthTimeline}
+
+def required_features(plots):
+    """Union of the derived columns read by `plots` and the summary report, by subset."""
+    requires = {subset: list(columns) for subset, columns in REPORT_FEATURES.items()}
+    for plot_num in sorted(plots):
+        for subset, columns in PLOT_REGISTRY[plot_num][1].items():
+            requires.setdefault(subset, [])
+            requires[subset] += [column for column in columns if column not in requires[subset]]
+    return requires
+
+def _plot_inputs(results, plot_num):
+    """The frames a registered plot reads, with its derived columns computed, or None if a subset is empty."""
+    inputs = {}
+    for subset, columns in PLOT_REGISTRY[plot_num][1].items():
+        store = results.get(subset)
+        if store is None or store.empty:
+            return None
+        inputs[subset] = store.require(*columns)
+    return inputs
+
+# Pixel size of the rasterized scatter plots; fixed, so output size does not depend on trace length
+SCATTER_RASTER_WIDTH = 1600
+SCATTER_RASTER_HEIGHT = 800
+
+def _pair_with_preceding_dw32(dw2, dw32):
+    """Pair each 2-DW write with the most recent 32-DW write before it (by seq_num)."""
+    dw32_seq = dw32['seq_num'].to_numpy()
+    preceding = np.searchsorted(dw32_seq, dw2['seq_num'].to_numpy()) - 1
+    has_preceding = preceding >= 0
+    return pd.DataFrame({
+        'first_word_big_endian': dw2['first_word_big_endian'].to_numpy(dtype=np.float64, na_value=np.nan)[has_preceding],
+        'Address_bits_15_7': dw32['Address_bits_15_7'].to_numpy(dtype=np.float64, na_value=np.nan)[preceding[has_preceding]]
+    })
 
-            counts = frame_df['first_word_big_endian_group33'].value_counts().sort_index()
-            if counts.empty:
-                continue
+def rasterized_scatter(x, y, xlabel, ylabel, title):
+    """Aggregate (x, y) points server-side into a fixed-size datashader count image."""
+    points_df = pd.DataFrame({
+        'x': np.asarray(x, dtype=np.float64),
+        'y': np.asarray(y, dtype=np.float64)
+    }).dropna()
+    points = hv.Points(points_df, kdims=['x', 'y'])
+    image = hd.rasterize(
+        points, dynamic=False, aggregator='count',
+        width=SCATTER_RASTER_WIDTH, height=SCATTER_RASTER_HEIGHT
+    )
+    return image.opts(
+        opts.Image(
+            cmap='fire', cnorm='eq_hist', colorbar=True, clipping_colors={'min': 'transparent'},
+            width=SCATTER_RASTER_WIDTH, height=SCATTER_RASTER_HEIGHT,
+            title=f'{title} ({len(points_df):,} points)',
+            xlabel=xlabel, ylabel=ylabel, tools=['hover']
+        )
+    )
 
-            frame_data = []
-            for fw in all_fw_group_values:
-                frame_data.append({
-                    'first_word_big_endian_group33': fw,
-                    'count': counts.get(fw, 0),
-                    'color': color_map[fw]
-                })
-
-            fw_hist_df = pd.DataFrame(frame_data)
-            global_count_max = max(global_count_max, int(fw_hist_df['count'].max()))
-            frame_dfs.append((bin_idx, fw_hist_df))
-
-        # Build frames with fixed y-scale across all bins
-        fixed_ylim = (0, max(1, global_count_max))
-        frames = []
-        for bin_idx, fw_hist_df in frame_dfs:
-            bars = hv.Bars(
-                fw_hist_df, kdims=['first_word_big_endian_group33'], vdims=['count', 'color']
-            ).opts(
-                opts.Bars(
-                    title=f'Occurrences by First Word Group (size 33) (2-DW Writes) - Time Bin {bin_idx+1}/{n_bins}',
-                    color='color',
-                    line_color=None,
-                    width=800, height=800,
-                    xlabel='First Word Group (size 33 buckets)', ylabel='Count',
-                    ylim=fixed_ylim,
-                    tools=['hover'],
-                    hooks=[apply_light_background]
+def plot_relationships(results, output_dir, plot_heights, enable_plot, export_pool=None, gif_backend='chrome',
+                       html_mode='holomap'):
+    output_paths = []
+
+    # 1-7. Scatter relationships over the full trace, rasterized with datashader
+    for plot_num, out_name, title, (x_frame, x_col), (y_frame, y_col) in SCATTER_RELATIONSHIPS:
+        with profile_stage(f'plot {plot_num}', enabled=plot_num in enable_plot) as stage:
+            inputs = _plot_inputs(results, plot_num) if plot_num in enable_plot else None
+            if not inputs:
+                continue
+            if 'dw2_x_dw32' in (x_frame, y_frame):
+                inputs['dw2_x_dw32'] = _pair_with_preceding_dw32(inputs['dw2'], inputs['dw32'])
+            x_df, y_df = inputs[x_frame], inputs[y_frame]
+            stage['rows'] = len(x_df)
+            with profile_stage('rasterize'):
+                image = rasterized_scatter(
+                    x_df[x_col].to_numpy(dtype=np.float64, na_value=np.nan),
+                    y_df[y_col].to_numpy(dtype=np.float64, na_value=np.nan),
+                    xlabel=x_col, ylabel=y_col, title=title
                 )
-            )
-            frames.append((bin_idx, bars))
+            out_plot = os.path.join(output_dir, f'{out_name}.html')
+            with profile_stage('html'):
+                hv.save(image, out_plot, backend='bokeh')
+            output_paths.append(out_plot)
+            plot_heights[f'{out_name}.html'] = SCATTER_RASTER_HEIGHT
 
-        # Create HoloMap for animation
-        anim = hv.HoloMap(dict(frames), kdims='Time Bin')
-        out_anim = os.path.join(output_dir, 'anim_hist_2dw_firstword_occurrences_group33.html')
-        pn.panel(anim).save(out_anim, embed=True)
-        output_paths.append(out_anim)
-        plot_heights['anim_hist_2dw_firstword_occurrences_group33.html'] = 800
+    # 16. Animated histogram: Number of occurrences of each first_word_big_endian value for each time bin (not cumulative)
+    with profile_stage('plot 16', enabled=16 in enable_plot) as stage:
+        inputs = _plot_inputs(results, 16) if 16 in enable_plot else None
+        if inputs:
+            # 100 time bins, sliding window of the current and previous 9 bins
+            n_bins = 100
+            stage['rows'] = len(results['dw2'])
+            with profile_stage('histogram'):
+                cube = results['dw2'].time_value_cube('first_word_big_endian')
+                levels, window_counts = cube.sliding_window_histogram(n_bins, window=10)
+            frames = sliding_histogram_bar_frames(
+                levels, window_counts, 'first_word_big_endian',
+                title='Occurrences of Each First Word Value (2-DW Writes) - Time Bin {bin}/{n_bins}',
+                line_color=None,
+                width=2300, height=800,
+                xlabel='First Word (16 bits)', ylabel='Count',
+                hooks=[apply_light_background]
+            )
 
-        out_gif = os.path.join(output_dir, 'anim_hist_2dw_firstword_occurrences_group33.gif')
-        gif_path = save_holoviews_frames_as_gif(frames, out_gif, duration=0.12)
-        if gif_path is not None:
-            print(f"Animated GIF written to: {gif_path}")
+            out_anim = os.path.join(output_dir, 'anim_hist_2dw_firstword_occurrences.html')
+            with profile_stage('html'):
+                if html_mode == 'compact':
+                    save_compact_histogram_animation(
+                        out_anim, levels, window_counts,
+                        title='Occurrences of Each First Word Value (2-DW Writes) - Time Bin {bin}/{n_bins}',
+                        line_color=None, width=2300, height=800,
+                        xlabel='First Word (16 bits)', ylabel='Count', light_background=True
+                    )
+                else:
+                    # Create HoloMap for animation
+                    anim = hv.HoloMap(dict(frames), kdims='Time Bin')
+                    pn.panel(anim).save(out_anim, embed=True)
+            output_paths.append(out_anim)
+            plot_heights['anim_hist_2dw_firstword_occurrences.html'] = 800
 
-    # 17. Animated histogram: Number of occurrences of each address bits 15:7 value for each time bin (not cumulative)
-    if not dw32.empty and 17 in enable_plot:
-        # Create time bins (e.g., 100 bins)
-        n_bins = 100
-        time_min = dw32['Time Stamp'].min()
-        time_max = dw32['Time Stamp'].max()
-        time_bins = np.linspace(time_min, time_max, n_bins + 1)
-
-        # Assign each row to a time bin
-        dw32['time_bin'] = pd.cut(dw32['Time Stamp'], bins=time_bins, labels=False, include_lowest=True)
-
-        # Find all unique address bits 15:7 values across all bins, sorted
-        all_addr_values = sorted(dw32['Address_bits_15_7'].dropna().unique())
-        color_map = {addr: THIRTYTHREE_COLOR_PALETTE[i % len(THIRTYTHREE_COLOR_PALETTE)] for i, addr in enumerate(all_addr_values)}
-
-        # Prepare frames for animation (sliding window of 10 bins)
-        frames = []
-        for bin_idx in range(n_bins):
-            # Select the current and previous 10 bins
-            if bin_idx < 10:
-                frame_df = dw32[dw32['time_bin'].isin(range(0, bin_idx + 1))]
-            else:
-                frame_df = dw32[dw32['time_bin'].isin(range(bin_idx - 9, bin_idx + 1))]
-            counts = frame_df['Address_bits_15_7'].value_counts().sort_index()
-            if counts.empty:
-                continue
-            # Ensure all_addr_values are present in every frame (fill missing with 0)
-            frame_data = []
-            for addr in all_addr_values:
-                frame_data.append({
-                    'Address_bits_15_7': addr,
-                    'count': counts.get(addr, 0),
-                    'color': color_map[addr]
-                })
-            addr_hist_df = pd.DataFrame(frame_data)
-            bars = hv.Bars(
-                addr_hist_df, kdims=['Address_bits_15_7'], vdims=['count', 'color']
-            ).opts(
-                opts.Bars(
-                    title=f'Occurrences of Each Address Bits 15:7 Value (32-DW Writes) - Time Bin {bin_idx+1}/{n_bins}',
-                    color='color', 
-                    width=2300, height=800,
-                    xlabel='Address Bits 15:7', ylabel='Count',
-                    tools=['hover']
+            out_gif = os.path.join(output_dir, 'anim_hist_2dw_firstword_occurrences.gif')
+            with profile_stage('gif'):
+                gif_path = save_holoviews_frames_as_gif(
+                    frames, out_gif, duration=0.12, export_pool=export_pool, backend=gif_backend
                 )
+            if gif_path is not None:
+                print(f"Animated GIF written to: {gif_path}")
+
+    # 19. Animated histogram (grouped x-axis): like plot 16, but 50 time bins and first_word_big_endian grouped into size-33 buckets
+    with profile_stage('plot 19', enabled=19 in enable_plot) as stage:
+        inputs = _plot_inputs(results, 19) if 19 in enable_plot else None
+        if inputs:
+            # Group first_word_big_endian values into buckets of size 33:
+            # group 1 => [fw_min .. fw_min+32], group 2 => [fw_min+33 .. fw_min+65], etc.
+            n_bins = 50
+            stage['rows'] = len(results['dw2'])
+            with profile_stage('histogram'):
+                cube = results['dw2'].time_value_cube('first_word_big_endian')
+                levels, window_counts = cube.sliding_window_histogram(n_bins, window=10, group_size=33)
+            frames = sliding_histogram_bar_frames(
+                levels, window_counts, 'first_word_big_endian_group33',
+                title='Occurrences by First Word Group (size 33) (2-DW Writes) - Time Bin {bin}/{n_bins}',
+                line_color=None,
+                width=800, height=800,
+                xlabel='First Word Group (size 33 buckets)', ylabel='Count',
+                hooks=[apply_light_background]
             )
-            frames.append((bin_idx, bars))
 
-        # Create HoloMap for animation
-        anim = hv.HoloMap(dict(frames), kdims='Time Bin')
-        out_anim = os.path.join(output_dir, 'anim_hist_32dw_addr_occurrences.html')
-        pn.panel(anim).save(out_anim, embed=True)
-        output_paths.append(out_anim)
-        plot_heights['anim_hist_32dw_addr_occurrences.html'] = 800
+            out_anim = os.path.join(output_dir, 'anim_hist_2dw_firstword_occurrences_group33.html')
+            with profile_stage('html'):
+                if html_mode == 'compact':
+                    save_compact_histogram_animation(
+                        out_anim, levels, window_counts,
+                        title='Occurrences by First Word Group (size 33) (2-DW Writes) - Time Bin {bin}/{n_bins}',
+                        line_color=None, width=800, height=800,
+                        xlabel='First Word Group (size 33 buckets)', ylabel='Count', light_background=True
+                    )
+                else:
+                    # Create HoloMap for animation
+                    anim = hv.HoloMap(dict(frames), kdims='Time Bin')
+                    pn.panel(anim).save(out_anim, embed=True)
+            output_paths.append(out_anim)
+            plot_heights['anim_hist_2dw_firstword_occurrences_group33.html'] = 800
 
-    # 18. Animation: For each 32DW write with address bit n = 0, time to closest 32DW write with same address but bit n = 1 (forward or backward)
-    if not dw32.empty and 18 in enable_plot:
-        n_bins = 100
-        n_samples = 10  # Number of samples to take from each bin
-        global_ymax = 2000 # y-axis max, in ns
-        time_min = dw32['Time Stamp'].min()
-        time_max = dw32['Time Stamp'].max()
-        time_bins = np.linspace(time_min, time_max, n_bins + 1)
-        dw32['time_bin'] = pd.cut(dw32['Time Stamp'], bins=time_bins, labels=False, include_lowest=True)
-        valid_dw32 = dw32.dropna(subset=['Time Stamp'])
-
-        # --- Compute global y-axis max for all bins and all bits ---
-        all_time_deltas_by_bit = {bit: [] for bit in range(7, 16)}
-        for bit in range(7, 16):
-            mask = valid_dw32[f'addr_bit_{bit}'] == 0
-            for bin_idx in range(n_bins):
-                bin_df = valid_dw32[valid_dw32['time_bin'] == bin_idx]
-                bit0_df = bin_df[bin_df[f'addr_bit_{bit}'] == 0]
-                if len(bit0_df) > n_samples:
-                    bit0_df = bit0_df.sample(n=n_samples, random_state=42)
-                for idx, row in bit0_df.iterrows():
-                    # Mask out the bit under test
-                    addr_mask = ~(1 << bit)
-                    addr = row['Address_lower_16bits'] & addr_mask
-                    t0 = row['Time Stamp']
-                    candidates = valid_dw32[
-                        (valid_dw32['Address_lower_16bits'] & addr_mask == addr) &
-                        (valid_dw32[f'addr_bit_{bit}'] == 1)
-                    ]
-                    if not candidates.empty:
-                        time_diffs = np.abs(candidates['Time Stamp'] - t0)
-                        min_idx = time_diffs.idxmin()
-                        t1 = candidates.loc[min_idx, 'Time Stamp']
-                        all_time_deltas_by_bit[bit].append(abs(t1 - t0) * 1e9)
-
-        # --- Create frames for each bit ---
-        for bit in range(7, 16):
-            frames = []
-            for bin_idx in range(n_bins):
-                bin_df = valid_dw32[valid_dw32['time_bin'] == bin_idx]
-                bit0_df = bin_df[bin_df[f'addr_bit_{bit}'] == 0]
-                if len(bit0_df) > n_samples:
-                    bit0_df = bit0_df.sample(n=n_samples, random_state=42)
-                time_deltas = []
-                for idx, row in bit0_df.iterrows():
-                    addr_mask = ~(1 << bit)
-                    addr = row['Address_lower_16bits'] & addr_mask
-                    t0 = row['Time Stamp']
-                    candidates = valid_dw32[
-                        (valid_dw32['Address_lower_16bits'] & addr_mask == addr) &
-                        (valid_dw32[f'addr_bit_{bit}'] == 1)
-                    ]
-                    if not candidates.empty:
-                        time_diffs = np.abs(candidates['Time Stamp'] - t0)
-                        min_idx = time_diffs.idxmin()
-                        t1 = candidates.loc[min_idx, 'Time Stamp']
-                        time_deltas.append(abs(t1 - t0) * 1e9)
-                if time_deltas:
-                    avg_time = min(float(np.mean(time_deltas)), global_ymax)
-                    median_time = min(float(np.median(time_deltas)), global_ymax)
-                    min_time = min(float(np.min(time_deltas)), global_ymax)
+            out_gif = os.path.join(output_dir, 'anim_hist_2dw_firstword_occurrences_group33.gif')
+            with profile_stage('gif'):
+                gif_path = save_holoviews_frames_as_gif(
+                    frames, out_gif, duration=0.12, export_pool=export_pool, backend=gif_backend
+                )
+            if gif_path is not None:
+                print(f"Animated GIF written to: {gif_path}")
+
+    # 17. Animated histogram: Number of occurrences of each address bits 15:7 value for each time bin (not cumulative)
+    with profile_stage('plot 17', enabled=17 in enable_plot) as stage:
+        inputs = _plot_inputs(results, 17) if 17 in enable_plot else None
+        if inputs:
+            # 100 time bins, sliding window of the current and previous 9 bins
+            n_bins = 100
+            stage['rows'] = len(results['dw32'])
+            with profile_stage('histogram'):
+                cube = results['dw32'].time_value_cube('Address_bits_15_7')
+                levels, window_counts = cube.sliding_window_histogram(n_bins, window=10)
+            out_anim = os.path.join(output_dir, 'anim_hist_32dw_addr_occurrences.html')
+            title = 'Occurrences of Each Address Bits 15:7 Value (32-DW Writes) - Time Bin {bin}/{n_bins}'
+            with profile_stage('html'):
+                if html_mode == 'compact':
+                    save_compact_histogram_animation(
+                        out_anim, levels, window_counts, title=title, fixed_ylim=False,
+                        width=2300, height=800, xlabel='Address Bits 15:7', ylabel='Count'
+                    )
                 else:
-                    avg_time = median_time = min_time = np.nan
-                stats_df = pd.DataFrame({
-                    'stat': ['avg', 'median', 'min'],
-                    'value': [avg_time, median_time, min_time]
-                })
-                color_map = {'avg': '#00FFFF', 'median': '#FFD700', 'min': '#32CD32'}
-                stats_df['color'] = stats_df['stat'].map(color_map)
-                points = hv.Scatter(
-                    stats_df, kdims=['stat'], vdims=['value', 'color']
-                ).opts(
-                    opts.Scatter(
-                        color='color',
-                        size=20,
+                    frames = sliding_histogram_bar_frames(
+                        levels, window_counts, 'Address_bits_15_7', title=title,
+                        fixed_ylim=False,
                         width=2300, height=800,
-                        title=f'Time to Closest Bit{bit}=1 Write (Bin {bin_idx+1}/{n_bins})',
-                        xlabel='Statistic', ylabel='Time (ns)',
-                        tools=['hover'],
-                        ylim=(0, global_ymax)
+                        xlabel='Address Bits 15:7', ylabel='Count'
                     )
-                )
-                frames.append((bin_idx, points))
-            anim = hv.HoloMap(dict(frames), kdims='Time Bin')
-            out_anim = os.path.join(output_dir, f'anim_time_to_closest_bit{bit}_1.html')
-            pn.panel(anim).save(out_anim, embed=True)
+                    # Create HoloMap for animation
+                    anim = hv.HoloMap(dict(frames), kdims='Time Bin')
+                    pn.panel(anim).save(out_anim, embed=True)
             output_paths.append(out_anim)
-            plot_heights[f'anim_time_to_closest_bit{bit}_1.html'] = 800
+            plot_heights['anim_hist_32dw_addr_occurrences.html'] = 800
+
+    # 18. Animation: For each 32DW write with address bit n = 0, time to closest 32DW write with same address but bit n = 1 (forward or backward)
+    with profile_stage('plot 18', enabled=18 in enable_plot) as stage:
+        inputs = _plot_inputs(results, 18) if 18 in enable_plot else None
+        if inputs:
+            dw32 = inputs['dw32']
+            n_bins = 100
+            global_ymax = 2000 # y-axis max, in ns
+            valid_dw32 = dw32.dropna(subset=['Time_Stamp_ps', 'Address_lower_16bits'])
+            valid_times = valid_dw32['Time_Stamp_ps'].to_numpy(dtype=np.int64)
+            valid_addresses = valid_dw32['Address_lower_16bits'].to_numpy(dtype=np.int64)
+            valid_bins = time_bin_index(valid_times, n_bins)
+            stage['rows'] = len(valid_times)
+
+            # --- Compute the time to the closest partner once per bit, for every row (no sampling) ---
+            with profile_stage('partner search'):
+                all_time_deltas_by_bit = {
+                    bit: nearest_bit_partner_deltas(valid_times, valid_addresses, bit) / 1e3
+                    for bit in range(7, 16)
+                }
+
+            # --- Create frames for each bit ---
+            for bit in range(7, 16):
+                deltas = all_time_deltas_by_bit[bit]
+                has_delta = ~np.isnan(deltas)
+                # Every delta goes into its time bin's sketch: exact mean and min, median within 1%
+                with profile_stage('sketch'):
+                    sketches = QuantileSketches(n_bins, PARTNER_DELTA_MIN_NS, PARTNER_DELTA_MAX_NS)
+                    sketches.add(valid_bins[has_delta], deltas[has_delta])
+                    bin_stats = np.minimum(np.column_stack([
+                        sketches.mean(), sketches.quantiles([0.5])[:, 0], sketches.minimum()
+                    ]), global_ymax)
+
+                stat_names = ['avg', 'median', 'min']
+                color_map = {'avg': '#00FFFF', 'median': '#FFD700', 'min': '#32CD32'}
+                out_anim = os.path.join(output_dir, f'anim_time_to_closest_bit{bit}_1.html')
+                with profile_stage('html'):
+                    if html_mode == 'compact':
+                        save_compact_animation(
+                            out_anim, stat_names, bin_stats, np.arange(1, n_bins + 1),
+                            title=f'Time to Closest Bit{bit}=1 Write (Bin {{bin}}/{n_bins})',
+                            glyph='scatter', colors=[color_map[stat] for stat in stat_names],
+                            width=2300, height=800, xlabel='Statistic', ylabel='Time (ns)', ylim=(0, global_ymax)
+                        )
+                    else:
+                        frames = []
+                        for bin_idx in range(n_bins):
+                            stats_df = pd.DataFrame({'stat': stat_names, 'value': bin_stats[bin_idx]})
+                            stats_df['color'] = stats_df['stat'].map(color_map)
+                            points = hv.Scatter(
+                                stats_df, kdims=['stat'], vdims=['value', 'color']
+                            ).opts(
+                                opts.Scatter(
+                                    color='color',
+                                    size=20,
+                                    width=2300, height=800,
+                                    title=f'Time to Closest Bit{bit}=1 Write (Bin {bin_idx+1}/{n_bins})',
+                                    xlabel='Statistic', ylabel='Time (ns)',
+                                    tools=['hover'],
+                                    ylim=(0, global_ymax)
+                                )
+                            )
+                            frames.append((bin_idx, points))
+                        anim = hv.HoloMap(dict(frames), kdims='Time Bin')
+                        pn.panel(anim).save(out_anim, embed=True)
+                output_paths.append(out_anim)
+                plot_heights[f'anim_time_to_closest_bit{bit}_1.html'] = 800
+
+    # 20. Histogram of the ACK latency of every upstream TLP, on log-spaced latency buckets
+    with profile_stage('plot 20', enabled=20 in enable_plot) as stage:
+        join = results.get('ack_latency') if 20 in enable_plot else None
+        if join is not None and join.histogram.total:
+            stage['rows'] = join.histogram.total
+            edges, counts = join.histogram.distribution()
+            used = np.flatnonzero(counts)
+            edges_ns = edges[used[0]:used[-1] + 2] / 1e3
+            histogram = hv.Histogram((edges_ns, counts[used[0]:used[-1] + 1])).opts(
+                opts.Histogram(
+                    width=2300, height=800, logx=True, line_color=None, tools=['hover'],
+                    title=f'ACK Latency of Upstream TLPs ({join.histogram.total} TLPs)',
+                    xlabel='ACK Latency (ns)', ylabel='Count', hooks=[apply_light_background]
+                )
+            )
+            out_plot = os.path.join(output_dir, 'ack_latency_distribution.html')
+            with profile_stage('html'):
+                hv.save(histogram, out_plot, backend='bokeh')
+            output_paths.append(out_plot)
+            plot_heights['ack_latency_distribution.html'] = 800
+
+    # 21. ACK latency percentiles per time bin of the TLP transmissions
+    with profile_stage('plot 21', enabled=21 in enable_plot) as stage:
+        join = results.get('ack_latency') if 21 in enable_plot else None
+        if join is not None and join.histogram.total:
+            stage['rows'] = join.histogram.total
+            latency = join.histogram
+            quantiles = {'p50': 0.5, 'p90': 0.9, 'p99': 0.99, 'p99.9': 0.999}
+            bin_quantiles = latency.quantiles(list(quantiles.values()), per_bin=True) / 1e3
+            bin_times_us = (latency.origin + (np.arange(latency.n_bins) + 0.5) * latency.bin_width_ps) / 1e6
+            curves = hv.Overlay([
+                hv.Curve((bin_times_us, bin_quantiles[:, quantile_idx]), 'Time (us)', 'ACK Latency (ns)', label=name)
+                for quantile_idx, name in enumerate(quantiles)
+            ]).opts(
+                opts.Curve(tools=['hover']),
+                opts.Overlay(
+                    width=2300, height=800, logy=True, legend_position='top_left',
+                    title=f'ACK Latency Percentiles per {latency.bin_width_ps / 1e6:g} us Time Bin',
+                    hooks=[apply_light_background]
+                )
+            )
+            out_plot = os.path.join(output_dir, 'ack_latency_percentiles.html')
+            with profile_stage('html'):
+                hv.save(curves, out_plot, backend='bokeh')
+            output_paths.append(out_plot)
+            plot_heights['ack_latency_percentiles.html'] = 800
+
+    # 22. Payload bandwidth over a rolling window of time bins, one curve per (Link Dir, TLP Type) with payload
+    with profile_stage('plot 22', enabled=22 in enable_plot) as stage:
+        timeline = results.get('bandwidth') if 22 in enable_plot else None
+        if timeline is not None and timeline.n_bins:
+            stage['rows'] = int(timeline.counts[:, :, 0].sum())
+            gbps = timeline.rolling_gbps()
+            bin_ends_us = (timeline.origin + (np.arange(timeline.n_bins) + 1) * timeline.bin_width_ps) / 1e6
+            curves = hv.Overlay([
+                hv.Curve((bin_ends_us, gbps[:, pair_idx]), 'Time (us)', 'Payload Bandwidth (GB/s)',
+                         label=f'{link_dir} {tlp_type}')
+                for pair_idx, (link_dir, tlp_type) in enumerate(timeline.pairs) if gbps[:, pair_idx].any()
+            ]).opts(
+                opts.Curve(tools=['hover']),
+                opts.Overlay(
+                    width=2300, height=800, legend_position='top_left',
+                    title=f'Payload Bandwidth over a Rolling {BANDWIDTH_WINDOW_BINS} x '
+                          f'{timeline.bin_width_ps / 1e6:g} us Window',
+                    hooks=[apply_light_background]
+                )
+            )
+            out_plot = os.path.join(output_dir, 'link_bandwidth_timeline.html')
+            with profile_stage('html'):
+                hv.save(curves, out_plot, backend='bokeh')
+            output_paths.append(out_plot)
+            plot_heights['link_bandwidth_timeline.html'] = 800
 
     return output_paths
 
-def generate_summary_report(results, output_paths, plot_heights, output_dir):
-    """Generate an HTML summary report linking to all plots."""
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>PCIe Trace Analysis Report (HoloViews)</title>
-        <style>
+# The bit-pair table of the report covers at most this many varying address bits (lowest first)
+ADDRESS_PAIR_TABLE_MAX_BITS = 16
+
+def _packed_values(results, subset, column, dtype):
+    """The non-null values of an integer column of `subset` as a numpy array; empty if the subset is absent."""
+    store = results.get(subset)
+    if store is None or store.empty:
+        return np.zeros(0, dtype=dtype)
+    values, valid = _nullable_parts(store[column], dtype)
+    return values[valid]
+
+def _address_bit_tables(addresses):
+    """HTML tables of the per-bit value counts of the 64 address bits, and of how often pairs of them agree."""
+    html_content = "<h2>32DW Write Address Bits</h2>"
+    if not len(addresses):
+        return html_content + "<p>No 32DW writes with a valid address.</p>"
+    ones = bit_counts(addresses)
+    zeros = len(addresses) - ones
+    varying_bits = [bit for bit in range(64) if 0 < ones[bit] < len(addresses)]
+    constant_value = int(addresses[0]) & ~sum(1 << bit for bit in varying_bits)
+    toggled = popcount(addresses[1:] ^ addresses[:-1])
+    html_content += "<table>"
+    html_content += "<tr><th>Metric</th><th>Value</th></tr>"
+    html_content += f"<tr><td>Address bits that vary</td><td>{len(varying_bits)} of 64</td></tr>"
+    html_content += f"<tr><td>Value of the constant bits</td><td>0x{constant_value:016X}</td></tr>"
+    if len(toggled):
+        html_content += f"<tr><td>Mean address bits toggled between consecutive writes</td><td>{toggled.mean():.2f}</td></tr>"
+    html_content += "</table>"
+
+    html_content += "<table>"
+    html_content += "<tr><th>Address Bit</th><th>0</th><th>1</th></tr>"
+    for bit in reversed(varying_bits):
+        html_content += f"<tr><td>{bit}</td><td>{zeros[bit]}</td><td>{ones[bit]}</td></tr>"
+    html_content += "</table>"
+
+    # Fraction of writes where two varying bits are equal: 0.5 for independent bits, 0 or 1 for bits that move together
+    pair_bits = varying_bits[:ADDRESS_PAIR_TABLE_MAX_BITS]
+    if len(pair_bits) > 1:
+        html_content += "<h3>Fraction of 32DW Writes Where Two Address Bits Are Equal</h3>"
+        html_content += "<table>"
+        html_content += "<tr><th>Bit</th>" + "".join(f"<th>{bit}</th>" for bit in pair_bits) + "</tr>"
+        agreement = bit_pair_agreement(addresses, pair_bits) / len(addresses)
+        for bit_a, row in zip(pair_bits, agreement):
+            html_content += f"<tr><th>{bit_a}</th>" + "".join(f"<td>{fraction:.3f}</td>" for fraction in row) + "</tr>"
+        html_content += "</table>"
+    return html_content
+
+# Stylesheet shared by the per-trace and batch reports
+REPORT_CSS = """
             body { font-family: Arial, sans-serif; margin: 20px; }
             h1 { color: #2c3e50; }
             h2 { color: #3498db; }
@@ -710,7 +3040,69 @@ def generate_summary_report(results, output_paths, plot_heights, output_dir):
             .plot-link { margin-bottom: 10px; }
             .plot-section { margin-top: 20px; }
             iframe { border: 1px solid #ddd; margin: 10px 0; width: 100%; min-height: 840px; }
-        </style>
+"""
+
+def summarize_results(results):
+    """The summary table values of one trace, as plain Python data that can be sent between processes."""
+    length_distribution = results.get('length_distribution', pd.DataFrame({'Length': [], 'Count': []}))
+    first_words = _packed_values(results, 'dw2', 'first_word_big_endian', np.uint32)
+    addresses = _packed_values(results, 'dw32', 'Address_u64', np.uint64)
+    bit0_1_count = int(bit_counts(first_words, 1)[0])
+    addr_bit7_1_count = int(bit_counts(addresses, 8)[7])
+    summary = {
+        'total_packets': int(length_distribution['Count'].sum()),
+        'length_counts': {int(length): int(count) for length, count in zip(length_distribution['Length'], length_distribution['Count'])},
+        # Category -> (count with the bit clear, count with the bit set)
+        'bit_counts': {
+            '2DW writes, first_word_big_endian bit 0': (len(first_words) - bit0_1_count, bit0_1_count),
+            '32DW writes, address bit 7': (len(addresses) - addr_bit7_1_count, addr_bit7_1_count),
+        },
+    }
+    if results.get('ack_latency') is not None:
+        summary['ack_latency'] = results['ack_latency'].summary()
+    if results.get('bandwidth') is not None:
+        summary['bandwidth'] = results['bandwidth'].summary()
+    return summary
+
+# Rows of the ACK latency tables: summary key -> label
+ACK_LATENCY_REPORT_ROWS = {
+    'tlps': 'Upstream TLPs', 'replays': 'Replayed TLPs', 'acks': 'Downstream ACK/NAK DLLPs', 'naks': 'NAK DLLPs',
+    'matched': 'TLPs matched with an ACK', 'unacknowledged': 'TLPs never acknowledged',
+    'outstanding': 'TLPs outstanding at the end of the trace', 'min_ns': 'Minimum latency (ns)',
+    'mean_ns': 'Mean latency (ns)', 'p50_ns': 'Median latency (ns, approx.)', 'p90_ns': 'p90 latency (ns, approx.)',
+    'p99_ns': 'p99 latency (ns, approx.)', 'max_ns': 'Maximum latency (ns)'
+}
+
+def _bandwidth_table(bandwidth):
+    """HTML table of a BandwidthTimeline.summary()."""
+    table = "<table>"
+    table += (f"<tr><th>Link Dir</th><th>TLP Type</th><th>Packets</th><th>Payload Bytes</th><th>Mean GB/s</th>"
+              f"<th>Peak GB/s ({BANDWIDTH_WINDOW_BINS}-bin window)</th></tr>")
+    for row in bandwidth:
+        table += (f"<tr><td>{html.escape(row['link_dir'])}</td><td>{html.escape(row['tlp_type'])}</td>"
+                  f"<td>{row['packets']:,}</td><td>{row['payload_bytes']:,}</td>"
+                  f"<td>{row['mean_gbps']:.3f}</td><td>{row['peak_gbps']:.3f}</td></tr>")
+    return table + "</table>"
+
+def _format_ack_latency_value(value):
+    if value is None:
+        return '-'
+    return f"{value:,.1f}" if isinstance(value, float) else f"{value:,}"
+
+def _packet_count_label(filter_spec):
+    if filter_spec == DEFAULT_FILTER.spec:
+        return 'Total MWr(64) Upstream Packets'
+    return f"Total Packets Matching <code>{html.escape(filter_spec or 'all packets')}</code>"
+
+def generate_summary_report(results, output_paths, plot_heights, output_dir, trace_filter=None):
+    """Generate an HTML summary report linking to all plots."""
+    trace_filter = DEFAULT_FILTER if trace_filter is None else trace_filter
+    html_content = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>PCIe Trace Analysis Report (HoloViews)</title>
+        <style>""" + REPORT_CSS + """</style>
     </head>
     <body>
         <h1>PCIe Trace Analysis Report (HoloViews)</h1>
@@ -724,7 +3116,7 @@ def generate_summary_report(results, output_paths, plot_heights, output_dir):
     if 'length_distribution' in results:
         # total packets
         total_packets = sum(results['length_distribution'].Count)
-        html_content += f"<tr><td>Total MWr(64) Upstream Packets</td><td>{total_packets}</td></tr>"
+        html_content += f"<tr><td>{_packet_count_label(trace_filter.spec)}</td><td>{total_packets}</td></tr>"
         # count of packets by length
         html_content += "<tr><td colspan='2'>Length Distribution of Packets</td></tr>"
         html_content += "<tr><th>Length</th><th>Count</th></tr>"
@@ -739,13 +3131,23 @@ def generate_summary_report(results, output_paths, plot_heights, output_dir):
     html_content += "<h2>Bitwise Summary Table</h2>"
     html_content += "<table>"
     html_content += "<tr><th>Category</th><th>Bit Value</th><th>Count</th></tr>"
-    # 2DW writes, bit 0 of first_word_big_endian
-    html_content += "<tr><td>2DW writes, first_word_big_endian bit 0</td><td>0</td><td>{}</td></tr>".format(results.get('dw2_bit0_0_count', 0))
-    html_content += "<tr><td>2DW writes, first_word_big_endian bit 0</td><td>1</td><td>{}</td></tr>".format(results.get('dw2_bit0_1_count', 0))
-    # 32DW writes, bit 7 of address
-    html_content += "<tr><td>32DW writes, address bit 7</td><td>0</td><td>{}</td></tr>".format(results.get('dw32_addr_bit7_0_count', 0))
-    html_content += "<tr><td>32DW writes, address bit 7</td><td>1</td><td>{}</td></tr>".format(results.get('dw32_addr_bit7_1_count', 0))
+    for category, (zero_count, one_count) in summarize_results(results)['bit_counts'].items():
+        html_content += f"<tr><td>{category}</td><td>0</td><td>{zero_count}</td></tr>"
+        html_content += f"<tr><td>{category}</td><td>1</td><td>{one_count}</td></tr>"
     html_content += "</table>"
+    html_content += _address_bit_tables(_packed_values(results, 'dw32', 'Address_u64', np.uint64))
+
+    if results.get('ack_latency') is not None:
+        html_content += "<h2>ACK Latency of Upstream TLPs</h2>"
+        html_content += "<table>"
+        html_content += "<tr><th>Metric</th><th>Value</th></tr>"
+        for key, value in results['ack_latency'].summary().items():
+            html_content += f"<tr><td>{ACK_LATENCY_REPORT_ROWS[key]}</td><td>{_format_ack_latency_value(value)}</td></tr>"
+        html_content += "</table>"
+
+    if results.get('bandwidth') is not None:
+        html_content += "<h2>Link Bandwidth by Direction and TLP Type</h2>"
+        html_content += _bandwidth_table(results['bandwidth'].summary())
 
     # Embed all plots as iframes
     html_content += "<h2>Interactive Analysis Plots</h2>"
@@ -777,24 +3179,613 @@ def generate_summary_report(results, output_paths, plot_heights, output_dir):
     
     return report_path
 
-def main():
-    enable_plot = {19}  # Set of plot numbers to enable
+def _parse_plot_list(text):
+    """argparse type for --plots: 'all' or a comma-separated list of registered plot numbers."""
+    if text.strip().lower() == 'all':
+        return set(PLOT_REGISTRY)
+    try:
+        plots = {int(item) for item in text.split(',') if item.strip()}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected 'all' or comma-separated plot numbers, got {text!r}")
+    unknown = sorted(plots - set(PLOT_REGISTRY))
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown plot number(s): {', '.join(map(str, unknown))}")
+    return plots
+
+def parse_args(argv=None):
+    plot_list = '\n'.join(f'  {plot_num:>2}  {description}' for plot_num, (description, _) in sorted(PLOT_REGISTRY.items()))
+    parser = argparse.ArgumentParser(
+        description='Analyze the DATA fields of the packets of a PCIe trace CSV, by default the upstream MWr(64) packets.',
+        epilog=f'plots:\n{plot_list}',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--input', default='traces/csv/huge/GPUtoGPU_H100_P2P_NVBandwidthWriteSM_RequesterSide_compressed.csv',
+                        help='trace CSV to analyze (default: %(default)s)')
+    parser.add_argument('--batch', metavar='DIR_OR_GLOB',
+                        help='analyze every *.csv in a directory, or every file matching a glob, instead of --input; '
+                             'each trace gets a subdirectory of --output-dir and batch_report.html indexes them')
+    parser.add_argument('--batch-workers', type=int, default=2,
+                        help='traces analyzed at the same time in batch mode (default: %(default)s)')
+    parser.add_argument('--follow', action='store_true',
+                        help='tail --input while it is still being written and serve live plot 16/19 histograms')
+    parser.add_argument('--bin-width-us', type=float, default=100.0,
+                        help='follow mode: width of a time bin in microseconds (default: %(default)s)')
+    parser.add_argument('--window', type=int, default=10,
+                        help='follow mode: time bins in the sliding window (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=5006, help='follow mode: Panel server port (default: %(default)s)')
+    parser.add_argument('--poll-ms', type=int, default=1000,
+                        help='follow mode: milliseconds between checks for new rows (default: %(default)s)')
+    parser.add_argument('--filter', action='append', metavar='[NAME:]EXPR', dest='filters',
+                        help=f"packets to analyze, as space-separated key=value terms over {', '.join(FILTER_TEXT_COLUMNS)}, "
+                             f"length (dwords), address (hex range low..high) and time (range low..high with ns/us/ms/s units), "
+                             f"e.g. 'tlp=CplD dir=Downstream length=2,32'. Repeat to analyze several filter sets in one "
+                             f"pass over the trace, each into <output-dir>/<NAME> (default: '{DEFAULT_FILTER_EXPRESSION}')")
+    parser.add_argument('--output-dir', default='reports', help='directory for the plots and report (default: %(default)s)')
+    parser.add_argument('--plots', type=_parse_plot_list, default={19},
+                        help="comma-separated plot numbers to draw, or 'all' (default: 19)")
+    parser.add_argument('--parse-workers', type=int, default=1,
+                        help='processes parsing the CSV in parallel byte ranges, 1 = serial (default: %(default)s)')
+    parser.add_argument('--gif-backend', choices=['agg', 'chrome'], default='agg',
+                        help="'agg' rasterizes GIF frames in-process; 'chrome' exports them through a browser (default: %(default)s)")
+    parser.add_argument('--export-workers', type=int, default=4,
+                        help="worker processes that render GIF frames (headless Chrome for 'chrome'), 1 = serial (default: %(default)s)")
+    parser.add_argument('--html-mode', choices=['compact', 'holomap'], default='compact',
+                        help="'compact' embeds the frame data once; 'holomap' embeds a full plot per frame (default: %(default)s)")
+    parser.add_argument('--profile', action='store_true',
+                        help=f'write wall time, CPU time, peak memory and row counts of each stage and plot to '
+                             f'{PROFILE_METRICS_FILENAME} next to the report')
+    parser.add_argument('--cprofile', action='store_true',
+                        help='implies --profile; also dump a cProfile of each top-level stage to <output-dir>/profile/<stage>.prof')
+    args = parser.parse_args(argv)
+    try:
+        args.filters = [TraceFilter.parse(expression) for expression in args.filters or []]
+        _check_filter_sets(args.filters)
+    except ValueError as e:
+        parser.error(f"--filter: {e}")
+    if len(args.filters) > 1 and (args.batch is not None or args.follow):
+        parser.error("--batch and --follow take a single --filter")
+    return args
+
+# ----------------------------------------------------------------------------------------------------
+# Follow mode: tail a trace CSV while the analyzer is still exporting it and keep the plot 16/19
+# histograms of the 2-DW first words current on a local Panel server page. Time bins have a fixed width
+# from the first packet on (the end of a growing capture is unknown), and each poll only touches the
+# rows appended since the previous one, so update latency does not grow with the capture.
+# ----------------------------------------------------------------------------------------------------
+
+# Most bytes of new rows parsed per poll, so catching up with a large existing file stays responsive
+FOLLOW_MAX_POLL_BYTES = 64 * 1024 * 1024
+
+class TraceTail:
+    """Decodes the complete rows appended to a growing trace CSV since the previous poll."""
+
+    def __init__(self, file_path, trace_filter=None):
+        self.file_path = file_path
+        self.trace_filter = DEFAULT_FILTER if trace_filter is None else trace_filter
+        self.offset = 0
+        self.header = None
+        self.total_rows = 0
+        self.restarts = 0
+
+    def poll(self):
+        """Return (frame, words) for the packets passing the trace filter among the new rows, or None."""
+        try:
+            size = os.path.getsize(self.file_path)
+        except FileNotFoundError:
+            return None
+        if size < self.offset:
+            # The file was truncated or replaced by a new capture: start over
+            print(f"{self.file_path} shrank; following it from the start")
+            self.offset = 0
+            self.header = None
+            self.total_rows = 0
+            self.restarts += 1
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(min(size - self.offset, FOLLOW_MAX_POLL_BYTES))
+        # A trailing partial line is still being written; leave it for the next poll
+        data = data[:data.rfind(b'\n') + 1]
+        if not data:
+            return None
+        if self.header is None:
+            header_end = data.index(b'\n') + 1
+            self.header = pd.read_csv(io.BytesIO(data[:header_end]), nrows=0).columns.tolist()
+            self.offset += header_end
+            data = data[header_end:]
+            if not data:
+                return None
+        self.offset += len(data)
+        usecols, dtype = _filter_columns([self.trace_filter])
+        chunk = pd.read_csv(
+            io.BytesIO(data),
+            header=None,
+            names=self.header,
+            usecols=usecols,
+            dtype=dtype
+        )
+        self.total_rows += len(chunk)
+        return _decode_trace_chunk(chunk, [self.trace_filter])
+
+class SlidingWindowHistogram:
+    """Counts of integer values in [0, n_levels) over the latest `window` fixed-width time bins.
+
+    Bin b covers [origin + b * bin_width_ps, origin + (b + 1) * bin_width_ps), where origin is the first
+    packet's time. Each bin keeps its own count vector and the window total is updated by adding new
+    counts and subtracting bins as they leave the window, so an update costs O(new packets + n_levels).
+    """
+
+    def __init__(self, bin_width_ps, window, n_levels=1 << 16):
+        self.bin_width_ps = int(bin_width_ps)
+        self.window = window
+        self.n_levels = n_levels
+        self.origin_ps = None
+        self.newest_bin = None
+        self.min_value = None
+        self.max_value = None
+        self.late_packets = 0
+        self.window_counts = np.zeros(n_levels, dtype=np.int64)
+        self._bin_counts = {}
+
+    def add(self, times_ps, values):
+        """Count packets; ones whose bin has already left the window are only tallied in late_packets."""
+        times_ps = np.asarray(times_ps, dtype=np.int64)
+        values = np.asarray(values, dtype=np.int64)
+        if not len(times_ps):
+            return
+        if self.origin_ps is None:
+            self.origin_ps = int(times_ps.min())
+        bin_ids = (times_ps - self.origin_ps) // self.bin_width_ps
+        newest_bin = max(int(bin_ids.max()), self.newest_bin if self.newest_bin is not None else 0)
+        in_window = bin_ids > newest_bin - self.window
+        self.late_packets += int(np.count_nonzero(~in_window))
+        bin_ids, values = bin_ids[in_window], values[in_window]
+        if len(values):
+            self.min_value = int(values.min()) if self.min_value is None else min(self.min_value, int(values.min()))
+            self.max_value = int(values.max()) if self.max_value is None else max(self.max_value, int(values.max()))
+
+        # Count each bin's new packets with one bincount over the (at most `window`) bins they fall in
+        first_bin = newest_bin - self.window + 1
+        new_counts = np.bincount(
+            (bin_ids - first_bin) * self.n_levels + values, minlength=self.window * self.n_levels
+        ).reshape(self.window, self.n_levels)
+        for offset in np.flatnonzero(new_counts.any(axis=1)):
+            bin_id = first_bin + int(offset)
+            if bin_id in self._bin_counts:
+                self._bin_counts[bin_id] += new_counts[offset]
+            else:
+                self._bin_counts[bin_id] = new_counts[offset]
+            self.window_counts += new_counts[offset]
+        self.newest_bin = newest_bin
+
+        # Retire the bins that slid out of the window
+        for bin_id in [bin_id for bin_id in self._bin_counts if bin_id < first_bin]:
+            self.window_counts -= self._bin_counts.pop(bin_id)
+
+    def histogram(self, group_size=None):
+        """(levels, counts) of the current window for every value between the smallest and largest seen.
+
+        With group_size, levels are 1-based groups of that many values starting at the smallest value seen,
+        like the group33 buckets of plot 19.
+        """
+        if self.min_value is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        counts = self.window_counts[self.min_value:self.max_value + 1]
+        if group_size is None:
+            return np.arange(self.min_value, self.max_value + 1), counts.copy()
+        group_starts = np.arange(0, len(counts), group_size)
+        return np.arange(1, len(group_starts) + 1), np.add.reduceat(counts, group_starts)
+
+class LiveFirstWordMonitor:
+    """Follows a trace and keeps a SlidingWindowHistogram of the first words of its 2-DW writes."""
+
+    def __init__(self, file_path, bin_width_ps, window, trace_filter=None):
+        self.tail = TraceTail(file_path, trace_filter)
+        self.histogram = SlidingWindowHistogram(bin_width_ps, window)
+        self.packets = 0
+        self._restarts = 0
+
+    def poll(self):
+        """Read the newly appended rows into the histogram; returns the number of 2-DW writes added."""
+        decoded = self.tail.poll()
+        if self.tail.restarts != self._restarts:
+            # A new capture replaced the file: its time origin and counts start from scratch
+            self._restarts = self.tail.restarts
+            self.histogram = SlidingWindowHistogram(self.histogram.bin_width_ps, self.histogram.window)
+            self.packets = 0
+        if decoded is None:
+            return 0
+        kept, words = decoded
+        times, time_valid = _nullable_parts(kept['Time_Stamp_ps'], np.int64)
+        use = (
+            kept['Length'].eq(2).to_numpy(dtype=bool, na_value=False)
+            & time_valid
+            & (kept['DATA_dword_count'].to_numpy() > 0)
+        )
+        # Same value as the first_word_big_endian column: bits 31:16 of the first dword, byte-swapped
+        first_word = (words[:, 0] >> 16) & 0xFFFF if words.shape[1] else np.zeros(len(kept), dtype=np.uint32)
+        first_word_big_endian = ((first_word & 0xFF) << 8) | ((first_word & 0xFF00) >> 8)
+        self.histogram.add(times[use], first_word_big_endian[use])
+        self.packets += int(use.sum())
+        return int(use.sum())
+
+def _live_bar_figure(title, xlabel, width):
+    source = ColumnDataSource({'x': [], 'top': [], 'color': []})
+    fig = figure(
+        width=width, height=500, title=title, x_axis_label=xlabel, y_axis_label='Count',
+        tools='pan,wheel_zoom,box_zoom,reset,save'
+    )
+    fig.vbar(x='x', top='top', width=0.8, color='color', line_color=None, source=source)
+    fig.add_tools(HoverTool(tooltips=[(xlabel, '@x'), ('Count', '@top')]))
+    _style_light_figure(fig)
+    return fig, source
+
+def live_histogram_page(monitor, poll_ms):
+    """Panel page with the plot 16 and 19 histograms of a LiveFirstWordMonitor, refreshed every poll_ms."""
+    status = pn.pane.Markdown('Waiting for packets...')
+    fig16, source16 = _live_bar_figure('Occurrences of Each First Word Value (2-DW Writes)', 'First Word (16 bits)', 1600)
+    fig19, source19 = _live_bar_figure('Occurrences by First Word Group (size 33) (2-DW Writes)',
+                                       'First Word Group (size 33 buckets)', 800)
+
+    def update():
+        monitor.poll()
+        histogram = monitor.histogram
+        for source, group_size in ((source16, None), (source19, 33)):
+            levels, counts = histogram.histogram(group_size)
+            source.data = {
+                'x': levels.tolist(),
+                'top': counts.tolist(),
+                'color': [THIRTYTHREE_COLOR_PALETTE[i % len(THIRTYTHREE_COLOR_PALETTE)] for i in range(len(levels))]
+            }
+        if histogram.newest_bin is not None:
+            first_bin = max(0, histogram.newest_bin - histogram.window + 1)
+            status.object = (
+                f"**{monitor.packets:,}** 2-DW writes from {monitor.tail.total_rows:,} rows; window is time bins "
+                f"{first_bin + 1}-{histogram.newest_bin + 1} of {histogram.bin_width_ps / 1e6:g} us each"
+                + (f"; {histogram.late_packets:,} packets older than the window skipped" if histogram.late_packets else "")
+            )
+
+    update()
+    pn.state.add_periodic_callback(update, period=poll_ms)
+    return pn.Column(status, fig16, fig19)
+
+def follow_trace(file_path, bin_width_ps, window=10, port=5006, poll_ms=1000, trace_filter=None):
+    """Serve live plot 16/19 histograms of a growing trace at http://localhost:<port>/live until interrupted."""
+    monitor = LiveFirstWordMonitor(file_path, bin_width_ps, window, trace_filter)
+    print(f"Following {file_path}; live histograms at http://localhost:{port}/live (Ctrl+C to stop)")
+    pn.serve({'live': lambda: live_histogram_page(monitor, poll_ms)}, port=port, show=False,
+             title='PCIe Trace Live Histograms')
+
+def _whole_trace_cache_path(cache_dir, file_path, name):
+    """Return the cache file of stream_trace consumer `name` for file_path; the consumers read every
+    packet, so unlike the parse cache one entry serves every filter."""
+    path_hash = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(file_path)}.{path_hash}.{name}.pkl")
+
+def _whole_trace_cache_key(file_path, name):
+    """Like _trace_cache_key, with the consumer name in place of the filter."""
+    stat = os.stat(file_path)
+    return {
+        'path': os.path.abspath(file_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'consumer': name,
+        'version': TRACE_CACHE_VERSION
+    }
+
+def load_whole_trace_cache(file_path, cache_dir, name):
+    """The cached stream_trace consumer `name` for file_path, or None if there is no valid entry."""
+    cache_path = _whole_trace_cache_path(cache_dir, file_path, name)
+    if not os.path.exists(cache_path):
+        return None
+    with open(cache_path, 'rb') as f:
+        entry = pickle.load(f)
+    if entry.get('key') != _whole_trace_cache_key(file_path, name):
+        return None
+    return entry['consumer']
+
+def save_whole_trace_cache(consumer, file_path, cache_dir):
+    """Pickle a stream_trace consumer that has read all of file_path next to the parse cache entries."""
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = _whole_trace_cache_path(cache_dir, file_path, consumer.name)
+    temp_path = f"{cache_path}.tmp-{os.getpid()}"
+    entry = {'key': _whole_trace_cache_key(file_path, consumer.name), 'consumer': consumer}
+    with open(temp_path, 'wb') as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, cache_path)
+    return cache_path
+
+def _whole_trace_stage(input_file, plots, cache_dir=None):
+    """Run the stream_trace consumers the enabled plots need in one pass; returns {consumer name: consumer}.
+
+    With cache_dir, consumers cached for this version of the file are loaded instead, and the trace is
+    only streamed for the rest, which are then cached.
+    """
+    consumer_classes = {WHOLE_TRACE_PLOTS[plot_num] for plot_num in plots if plot_num in WHOLE_TRACE_PLOTS}
+    results = {}
+    consumers = []
+    for consumer_class in sorted(consumer_classes, key=lambda cls: cls.name):
+        cached = load_whole_trace_cache(input_file, cache_dir, consumer_class.name) if cache_dir is not None else None
+        if cached is not None:
+            print(f"Loaded the cached {cached.name} results: {cached.describe()}")
+            results[cached.name] = cached
+        else:
+            consumers.append(consumer_class())
+    if not consumers:
+        return results
+    print(f"Streaming {input_file} for the whole-trace analyses...")
+    with profile_stage('whole trace') as stage:
+        stage['rows'] = stream_trace(input_file, consumers)
+    for consumer in consumers:
+        if cache_dir is not None:
+            save_whole_trace_cache(consumer, input_file, cache_dir)
+        results[consumer.name] = consumer
+    return results
+
+def _analyze_frame(df, output_dir, plots, trace_filter, gif_backend, export_workers, html_mode, whole_trace=None):
+    """Analyze and plot one loaded packet set into output_dir; returns summarize_results() plus the report path."""
     plot_heights = {} # Set plot heights in plot_relationships function
-    print("Starting PCIe Trace Analysis with HoloViews...")
-    input_file = 'traces/csv/huge/GPUtoGPU_H100_P2P_NVBandwidthWriteSM_RequesterSide_compressed.csv'
-    output_dir = 'reports'
     os.makedirs(output_dir, exist_ok=True)
-    print(f"Loading and filtering data from {input_file}...")
-    df = load_and_filter_data(input_file)
-    if df is None or df.empty:
-        print("No valid data to analyze. Exiting.")
-        return
-    results = extract_analysis_sets(df)
+    with profile_stage('extract_analysis_sets') as stage:
+        results = extract_analysis_sets(df, plots=plots)
+        stage['rows'] = len(df)
+    results.update(whole_trace or {})
     print("Generating relationship plots...")
-    output_paths = plot_relationships(results, output_dir, plot_heights, enable_plot)
+    # One pool of browsers is shared by every GIF in the run
+    with ChromeExportPool(export_workers) as export_pool:
+        output_paths = plot_relationships(
+            results, output_dir, plot_heights, plots,
+            export_pool=export_pool if export_workers > 1 else None,
+            gif_backend=gif_backend, html_mode=html_mode
+        )
     print("Generating summary report...")
-    report_path = generate_summary_report(results, output_paths, plot_heights, output_dir)
-    print(f"Analysis complete. Summary report available at: {report_path}")
+    with profile_stage('report'):
+        report_path = generate_summary_report(results, output_paths, plot_heights, output_dir, trace_filter)
+        summary = summarize_results(results)
+    summary['filter'] = trace_filter.spec
+    summary['report_path'] = report_path
+    return summary
+
+def analyze_trace(input_file, output_dir, plots, cache_dir=None, parse_workers=1, gif_backend='agg',
+                  export_workers=4, html_mode='compact', profile=False, cprofile=False, trace_filter=None):
+    """Load, analyze and plot one trace into output_dir; returns summarize_results() plus the report path
+    and runtime, or None when the trace has no packets to analyze.
+
+    trace_filter selects the packets to analyze (default: the MWr(64) Upstream packets). With profile,
+    per-stage metrics are written to PROFILE_METRICS_FILENAME in output_dir; with cprofile as well, each
+    top-level stage is also dumped for cProfile/pstats into output_dir/profile.
+    """
+    start_time = time.perf_counter()
+    trace_filter = DEFAULT_FILTER if trace_filter is None else trace_filter
+    cache_dir = os.path.join(output_dir, 'trace_cache') if cache_dir is None else cache_dir
+    os.makedirs(output_dir, exist_ok=True)
+    metrics_path = os.path.join(output_dir, PROFILE_METRICS_FILENAME) if profile else None
+    cprofile_dir = os.path.join(output_dir, 'profile') if profile and cprofile else None
+    with profiling(metrics_path, cprofile_dir, input_file=input_file, plots=sorted(plots), filter=trace_filter.spec,
+                   parse_workers=parse_workers, gif_backend=gif_backend, html_mode=html_mode):
+        print(f"Loading and filtering data from {input_file}...")
+        with profile_stage('load') as stage:
+            df = load_and_filter_data(input_file, cache_dir=cache_dir, workers=parse_workers, trace_filter=trace_filter)
+            stage['rows'] = len(df) if df is not None else 0
+        if df is None or df.empty:
+            print("No valid data to analyze.")
+            return None
+        whole_trace = _whole_trace_stage(input_file, plots, cache_dir)
+        summary = _analyze_frame(df, output_dir, plots, trace_filter, gif_backend, export_workers, html_mode,
+                                 whole_trace)
+    summary['seconds'] = time.perf_counter() - start_time
+    if metrics_path is not None:
+        summary['profile_path'] = metrics_path
+    return summary
+
+def analyze_filter_sets(input_file, output_dir, plots, filters, cache_dir=None, parse_workers=1, gif_backend='agg',
+                        export_workers=4, html_mode='compact', profile=False, cprofile=False):
+    """Like analyze_trace for several TraceFilters, reading the trace once: each filter set is analyzed into
+    output_dir/<filter name>. Returns {filter name: summary, or None when no packet passes that filter}."""
+    start_time = time.perf_counter()
+    cache_dir = os.path.join(output_dir, 'trace_cache') if cache_dir is None else cache_dir
+    os.makedirs(output_dir, exist_ok=True)
+    metrics_path = os.path.join(output_dir, PROFILE_METRICS_FILENAME) if profile else None
+    cprofile_dir = os.path.join(output_dir, 'profile') if profile and cprofile else None
+    summaries = {}
+    with profiling(metrics_path, cprofile_dir, input_file=input_file, plots=sorted(plots),
+                   filters={trace_filter.name: trace_filter.spec for trace_filter in filters},
+                   parse_workers=parse_workers, gif_backend=gif_backend, html_mode=html_mode):
+        print(f"Loading {len(filters)} filter sets from {input_file} in one pass...")
+        with profile_stage('load') as stage:
+            frames = load_filter_sets(input_file, filters, cache_dir=cache_dir, workers=parse_workers)
+            stage['rows'] = sum(len(df) for df in (frames or {}).values() if df is not None)
+        if frames is None:
+            print("No valid data to analyze.")
+            return None
+        # The whole-trace analyses do not depend on the filters, so every set shares them
+        whole_trace = _whole_trace_stage(input_file, plots, cache_dir)
+        for trace_filter in filters:
+            df = frames.pop(trace_filter.name)
+            if df is None or df.empty:
+                print(f"No packets to analyze for filter set {trace_filter.name}.")
+                summaries[trace_filter.name] = None
+                continue
+            print(f"Analyzing filter set {trace_filter.name} ({trace_filter.spec or 'all packets'})...")
+            with profile_stage(trace_filter.name):
+                summaries[trace_filter.name] = _analyze_frame(
+                    df, os.path.join(output_dir, trace_filter.name), plots, trace_filter,
+                    gif_backend, export_workers, html_mode, whole_trace
+                )
+            del df
+    for summary in summaries.values():
+        if summary is not None:
+            summary['seconds'] = time.perf_counter() - start_time
+    return summaries
+
+def batch_trace_files(pattern):
+    """The trace CSVs named by a directory (every *.csv in it) or a glob pattern, sorted."""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.csv')
+    return sorted(glob.glob(pattern, recursive=True))
+
+def _batch_output_dirs(trace_files, output_dir):
+    """One output directory per trace, named after the file, with a suffix when two files share a name."""
+    names = [os.path.splitext(os.path.basename(path))[0] for path in trace_files]
+    return [
+        os.path.join(output_dir, name if names.count(name) == 1 else f"{name}_{trace_idx}")
+        for trace_idx, name in enumerate(names)
+    ]
+
+def run_batch(trace_files, output_dir, plots, max_workers=2, **analyze_options):
+    """Analyze every trace in a pool of at most max_workers processes, then write batch_report.html."""
+    start_time = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    cache_dir = os.path.join(output_dir, 'trace_cache')
+    trace_dirs = _batch_output_dirs(trace_files, output_dir)
+    summaries = [None] * len(trace_files)
+    errors = {}
+    # Worker processes of a ProcessPoolExecutor are not daemonic, so each trace can still use its own
+    # parse and Chrome export pools
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(analyze_trace, trace_file, trace_dir, plots, cache_dir=cache_dir, **analyze_options): trace_idx
+            for trace_idx, (trace_file, trace_dir) in enumerate(zip(trace_files, trace_dirs))
+        }
+        for future in concurrent.futures.as_completed(futures):
+            trace_idx = futures[future]
+            try:
+                summaries[trace_idx] = future.result()
+            except Exception as e:
+                errors[trace_idx] = str(e)
+            status = 'failed' if trace_idx in errors else 'done'
+            print(f"[{sum(1 for f in futures if f.done())}/{len(futures)}] {trace_files[trace_idx]}: {status}")
+    total_seconds = time.perf_counter() - start_time
+    report_path = generate_batch_report(trace_files, summaries, errors, total_seconds, output_dir)
+    print(f"Batch of {len(trace_files)} traces complete in {total_seconds:.1f}s. Index report: {report_path}")
+    return report_path
+
+def generate_batch_report(trace_files, summaries, errors, total_seconds, output_dir):
+    """Write batch_report.html: the summary tables of every trace side by side, one column per trace."""
+    names = [os.path.basename(path) for path in trace_files]
+    html_content = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>PCIe Trace Analysis Batch Report</title>
+        <style>""" + REPORT_CSS + """</style>
+    </head>
+    <body>
+        <h1>PCIe Trace Analysis Batch Report</h1>
+    """
+
+    def row(label, values):
+        return f"<tr><td>{label}</td>" + "".join(f"<td>{value}</td>" for value in values) + "</tr>"
+
+    def value(trace_idx, get):
+        if trace_idx in errors:
+            return f"failed: {html.escape(errors[trace_idx])}"
+        return '-' if summaries[trace_idx] is None else get(summaries[trace_idx])
+
+    header = "<tr><th>Trace</th>" + "".join(f"<th>{html.escape(name)}</th>" for name in names) + "</tr>"
+    indices = range(len(trace_files))
+
+    html_content += "<h2>Summary Statistics</h2>"
+    html_content += "<table>" + header
+    html_content += row('Report', [value(i, lambda summary: (
+        f'<a href="{html.escape(os.path.relpath(summary["report_path"], output_dir))}">analysis_report.html</a>'
+    )) for i in indices])
+    html_content += row('Runtime', [value(i, lambda summary: f"{summary['seconds']:.1f}s") for i in indices])
+    filter_spec = next((summary['filter'] for summary in summaries if summary), DEFAULT_FILTER.spec)
+    html_content += row(_packet_count_label(filter_spec), [value(i, lambda summary: summary['total_packets']) for i in indices])
+    all_lengths = sorted({length for summary in summaries if summary for length in summary['length_counts']})
+    html_content += f"<tr><td colspan='{len(names) + 1}'>Length Distribution of Packets</td></tr>"
+    for length in all_lengths:
+        html_content += row(f"Length {length}", [value(i, lambda summary: summary['length_counts'].get(length, 0)) for i in indices])
+    html_content += "</table>"
+
+    html_content += "<h2>Bitwise Summary Table</h2>"
+    html_content += "<table>" + header
+    categories = next((list(summary['bit_counts']) for summary in summaries if summary), [])
+    for category in categories:
+        for bit_value in (0, 1):
+            html_content += row(f"{category} = {bit_value}", [
+                value(i, lambda summary: summary['bit_counts'][category][bit_value]) for i in indices
+            ])
+    html_content += "</table>"
+
+    if any(summary and 'ack_latency' in summary for summary in summaries):
+        html_content += "<h2>ACK Latency of Upstream TLPs</h2>"
+        html_content += "<table>" + header
+        for key, label in ACK_LATENCY_REPORT_ROWS.items():
+            html_content += row(label, [value(i, lambda summary: _format_ack_latency_value(
+                summary['ack_latency'][key]) if 'ack_latency' in summary else '-') for i in indices])
+        html_content += "</table>"
+
+    if any(summary and 'bandwidth' in summary for summary in summaries):
+        html_content += "<h2>Link Bandwidth by Direction and TLP Type (mean GB/s)</h2>"
+        html_content += "<table>" + header
+        pairs = []
+        for summary in summaries:
+            for bandwidth_row in (summary or {}).get('bandwidth', []):
+                if (bandwidth_row['link_dir'], bandwidth_row['tlp_type']) not in pairs:
+                    pairs.append((bandwidth_row['link_dir'], bandwidth_row['tlp_type']))
+        for link_dir, tlp_type in pairs:
+            def mean_gbps(summary):
+                matches = [bandwidth_row['mean_gbps'] for bandwidth_row in summary.get('bandwidth', [])
+                           if (bandwidth_row['link_dir'], bandwidth_row['tlp_type']) == (link_dir, tlp_type)]
+                return f"{matches[0]:.3f}" if matches else '-'
+            html_content += row(html.escape(f"{link_dir} {tlp_type}"), [value(i, mean_gbps) for i in indices])
+        html_content += "</table>"
+
+    trace_seconds = sum(summary['seconds'] for summary in summaries if summary)
+    html_content += "<h2>Runtime</h2>"
+    html_content += "<table>"
+    html_content += "<tr><th>Metric</th><th>Value</th></tr>"
+    html_content += f"<tr><td>Traces</td><td>{len(trace_files)} ({len(errors)} failed)</td></tr>"
+    html_content += f"<tr><td>Total wall time</td><td>{total_seconds:.1f}s</td></tr>"
+    html_content += f"<tr><td>Sum of per-trace runtimes</td><td>{trace_seconds:.1f}s</td></tr>"
+    html_content += "</table>"
+    html_content += """
+    </body>
+    </html>
+    """
+
+    report_path = os.path.join(output_dir, 'batch_report.html')
+    with open(report_path, 'w') as f:
+        f.write(html_content)
+    return report_path
+
+def main(argv=None):
+    args = parse_args(argv)
+    enable_plot = args.plots  # Set of plot numbers to enable
+    trace_filter = args.filters[0] if len(args.filters) == 1 else None
+    analyze_options = {
+        'parse_workers': args.parse_workers, 'gif_backend': args.gif_backend,
+        'export_workers': args.export_workers, 'html_mode': args.html_mode,
+        'profile': args.profile or args.cprofile, 'cprofile': args.cprofile
+    }
+    print("Starting PCIe Trace Analysis with HoloViews...")
+    if args.follow:
+        follow_trace(args.input, round(args.bin_width_us * 1e6), window=args.window, port=args.port, poll_ms=args.poll_ms,
+                     trace_filter=trace_filter)
+        return
+    if args.batch is not None:
+        trace_files = batch_trace_files(args.batch)
+        if not trace_files:
+            print(f"No trace files match {args.batch}. Exiting.")
+            return
+        run_batch(trace_files, args.output_dir, enable_plot, max_workers=args.batch_workers, trace_filter=trace_filter,
+                  **analyze_options)
+        return
+    if len(args.filters) > 1:
+        summaries = analyze_filter_sets(args.input, args.output_dir, enable_plot, args.filters, **analyze_options)
+        if not summaries or not any(summaries.values()):
+            print("Exiting.")
+            return
+        print("Analysis complete. Summary reports available at:")
+        for name, summary in summaries.items():
+            print(f"  {name}: {summary['report_path'] if summary else 'no matching packets'}")
+        return
+    summary = analyze_trace(args.input, args.output_dir, enable_plot, trace_filter=trace_filter, **analyze_options)
+    if summary is None:
+        print("Exiting.")
+        return
+    print(f"Analysis complete. Summary report available at: {summary['report_path']}")
 
 if __name__ == "__main__":
     main()
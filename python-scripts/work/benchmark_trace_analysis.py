@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+benchmark_trace_analysis.py - Time analyze_trace_data_animation.py on synthetic traces of increasing size.
+
+For every size, a synthetic trace is generated once (generate_synthetic_trace.py) and kept in --trace-dir.
+Each run analyzes it in a fresh process with --profile and an empty output directory, so the parse cache
+never hides the CSV parse and peak memory belongs to that run alone. The per-stage and per-plot metrics
+of every run are saved to one JSON file, and a scaling table of the top-level stages is printed.
+With --baseline, the table also shows each stage's time relative to an earlier results file.
+
+Usage:
+    python benchmark_trace_analysis.py --sizes 1M,10M,100M
+    python benchmark_trace_analysis.py --sizes 1M,10M --plots 16,17,18,19 --repeat 3 --parse-workers 4
+    python benchmark_trace_analysis.py --sizes 1M,10M --baseline benchmarks/results/before.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+from generate_synthetic_trace import format_row_count, generate_trace, parse_row_count
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ANALYZER = os.path.join(SCRIPT_DIR, 'analyze_trace_data_animation.py')
+
+# Must match PROFILE_METRICS_FILENAME in analyze_trace_data_animation.py
+PROFILE_METRICS_FILENAME = 'profile_metrics.json'
+
+def trace_path(trace_dir, n_rows, seed, dw2_fraction):
+    return os.path.join(trace_dir, f'synthetic_{format_row_count(n_rows)}_seed{seed}_dw2_{dw2_fraction:g}.csv')
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=SCRIPT_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _package_versions():
+    versions = {}
+    for name in ('numpy', 'pandas', 'holoviews', 'bokeh', 'panel', 'datashader'):
+        try:
+            versions[name] = __import__(name).__version__
+        except ImportError:
+            versions[name] = None
+    return versions
+
+def environment():
+    """Machine, interpreter, package versions and commit, so results from different setups are not mixed up."""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'packages': _package_versions(),
+        'git_commit': _git_commit()
+    }
+
+def run_analysis(trace_file, output_dir, plots, parse_workers, gif_backend, html_mode):
+    """Analyze trace_file in a child process with --profile; returns its metrics plus the outer wall time."""
+    shutil.rmtree(output_dir, ignore_errors=True)
+    command = [
+        sys.executable, ANALYZER, '--input', trace_file, '--output-dir', output_dir, '--plots', plots,
+        '--parse-workers', str(parse_workers), '--gif-backend', gif_backend, '--html-mode', html_mode, '--profile'
+    ]
+    start_time = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True)
+    wall_seconds = time.perf_counter() - start_time
+    metrics_path = os.path.join(output_dir, PROFILE_METRICS_FILENAME)
+    if completed.returncode != 0 or not os.path.exists(metrics_path):
+        print(completed.stdout[-4000:])
+        print(completed.stderr[-4000:])
+        raise RuntimeError(f"Analysis of {trace_file} failed with exit code {completed.returncode}")
+    with open(metrics_path, encoding='utf-8') as f:
+        metrics = json.load(f)
+    metrics['process_wall_seconds'] = wall_seconds
+    return metrics
+
+def stage_seconds(run):
+    """Map each stage of a run to its wall time."""
+    return {stage['stage']: stage['wall_seconds'] for stage in run['stages']}
+
+def median_stage_seconds(runs):
+    """Median wall time of each stage over repeated runs of one size."""
+    per_stage = {}
+    for run in runs:
+        for stage, seconds in stage_seconds(run).items():
+            per_stage.setdefault(stage, []).append(seconds)
+    return {stage: statistics.median(seconds) for stage, seconds in per_stage.items()}
+
+def print_scaling_table(results, baseline=None):
+    """Print the median wall time of each top-level stage for every size, with the ratio to the baseline."""
+    sizes = sorted({run['rows'] for run in results['runs']})
+    medians = {n_rows: median_stage_seconds([run for run in results['runs'] if run['rows'] == n_rows])
+               for n_rows in sizes}
+    baseline_medians = {}
+    if baseline is not None:
+        baseline_medians = {
+            n_rows: median_stage_seconds([run for run in baseline['runs'] if run['rows'] == n_rows])
+            for n_rows in {run['rows'] for run in baseline['runs']}
+        }
+    stages = []
+    for run in results['runs']:
+        for stage in run['stages']:
+            if stage['depth'] == 0 and stage['stage'] not in stages:
+                stages.append(stage['stage'])
+
+    name_width = max([len(stage) for stage in stages] + [len('rows/s (load)')])
+    cell_width = 22 if baseline is not None else 10
+    print(f"\nMedian wall seconds per stage ({results['config']['repeat']} run(s) per size)"
+          + (" and ratio to the baseline" if baseline is not None else "") + ":")
+    print(f"  {'stage':<{name_width}}" + ''.join(f"{format_row_count(n_rows):>{cell_width}}" for n_rows in sizes))
+    for stage in stages + ['total']:
+        cells = []
+        for n_rows in sizes:
+            if stage == 'total':
+                seconds = statistics.median(run['total_wall_seconds'] for run in results['runs'] if run['rows'] == n_rows)
+                old = baseline_medians.get(n_rows) and statistics.median(
+                    run['total_wall_seconds'] for run in baseline['runs'] if run['rows'] == n_rows)
+            else:
+                seconds = medians[n_rows].get(stage)
+                old = baseline_medians.get(n_rows, {}).get(stage)
+            text = f"{seconds:.2f}" if seconds is not None else '-'
+            if baseline is not None:
+                text += f" ({seconds / old:.2f}x)" if seconds is not None and old else " (new)"
+            cells.append(f"{text:>{cell_width}}")
+        print(f"  {stage:<{name_width}}" + ''.join(cells))
+    rates = []
+    for n_rows in sizes:
+        load = medians[n_rows].get('load')
+        rates.append(f"{n_rows / load:>{cell_width},.0f}" if load else f"{'-':>{cell_width}}")
+    print(f"  {'rows/s (load)':<{name_width}}" + ''.join(rates))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark analyze_trace_data_animation.py on synthetic traces.')
+    parser.add_argument('--sizes', default='1M,10M,100M',
+                        help='comma-separated trace sizes in rows, e.g. 1M,10M,100M (default: %(default)s)')
+    parser.add_argument('--plots', default='all', help="plots to draw, as for the analyzer's --plots (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=1, help='runs per size (default: %(default)s)')
+    parser.add_argument('--parse-workers', type=int, default=1, help="the analyzer's --parse-workers (default: %(default)s)")
+    parser.add_argument('--gif-backend', choices=['agg', 'chrome'], default='agg',
+                        help="the analyzer's --gif-backend (default: %(default)s)")
+    parser.add_argument('--html-mode', choices=['compact', 'holomap'], default='compact',
+                        help="the analyzer's --html-mode (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic traces (default: %(default)s)')
+    parser.add_argument('--dw2-fraction', type=float, default=0.25,
+                        help='share of 2-DW writes among the upstream MWr(64) packets (default: %(default)s)')
+    parser.add_argument('--trace-dir', default='benchmarks/traces',
+                        help='where generated traces are kept and reused (default: %(default)s)')
+    parser.add_argument('--output-dir', default='benchmarks/results',
+                        help='directory for the analysis outputs and the results JSON (default: %(default)s)')
+    parser.add_argument('--results', help='results JSON to write (default: <output-dir>/benchmark_<timestamp>.json)')
+    parser.add_argument('--baseline', help='earlier results JSON to compare the stage times against')
+    args = parser.parse_args(argv)
+
+    sizes = [parse_row_count(size) for size in args.sizes.split(',') if size.strip()]
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    results_path = args.results or os.path.join(args.output_dir, f'benchmark_{timestamp}.json')
+    os.makedirs(args.output_dir, exist_ok=True)
+    if os.path.dirname(results_path):
+        os.makedirs(os.path.dirname(results_path), exist_ok=True)
+
+    results = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'config': {
+            'sizes': sizes, 'plots': args.plots, 'repeat': args.repeat, 'parse_workers': args.parse_workers,
+            'gif_backend': args.gif_backend, 'html_mode': args.html_mode, 'seed': args.seed,
+            'dw2_fraction': args.dw2_fraction
+        },
+        'runs': []
+    }
+    for n_rows in sizes:
+        trace_file = trace_path(args.trace_dir, n_rows, args.seed, args.dw2_fraction)
+        if not os.path.exists(trace_file):
+            print(f"Generating {trace_file}...")
+            generate_trace(trace_file, n_rows, seed=args.seed, dw2_fraction=args.dw2_fraction)
+        for repeat in range(args.repeat):
+            print(f"Analyzing {format_row_count(n_rows)} rows (run {repeat + 1}/{args.repeat})...")
+            run_dir = os.path.join(args.output_dir, f'run_{format_row_count(n_rows)}')
+            metrics = run_analysis(trace_file, run_dir, args.plots, args.parse_workers, args.gif_backend, args.html_mode)
+            results['runs'].append({
+                'rows': n_rows, 'repeat': repeat, 'trace_file': trace_file,
+                'trace_bytes': os.path.getsize(trace_file), **metrics
+            })
+            print(f"  {metrics['total_wall_seconds']:.2f}s, peak RSS {metrics['peak_rss_mb'] or 0:,.0f} MB")
+            # Save after every run so an interrupted benchmark keeps what it measured
+            with open(results_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        changed = [key for key in ('plots', 'parse_workers', 'gif_backend', 'html_mode', 'seed', 'dw2_fraction')
+                   if baseline['config'].get(key) != results['config'][key]]
+        if changed:
+            print(f"Note: the baseline was run with different {', '.join(changed)}")
+    print_scaling_table(results, baseline)
+    print(f"\nResults written to: {results_path}")
+
+if __name__ == '__main__':
+    sys.exit(main())
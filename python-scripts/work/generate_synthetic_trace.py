@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+generate_synthetic_trace.py - Write a synthetic PCIe trace CSV for exercising analyze_trace_data_animation.py.
+
+The CSV has the protocol-analyzer column schema shown in the header of analyze_trace_data_animation.py:
+upstream MWr(64) 32-DW data writes streaming through a few buffers, interleaved 2-DW flag writes whose
+first word drifts over time, downstream ACK DLLPs (and the odd NAK) acknowledging the upstream PSNs, and a
+little traffic the analysis filters out (upstream MRd(64), downstream MWr(64)).
+
+Usage:
+    python generate_synthetic_trace.py --rows 1M --output traces/synthetic/synthetic_1M.csv
+    python generate_synthetic_trace.py --rows 100M --seed 7 --dw2-fraction 0.1 --output big.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Column schema of the protocol analyzer's CSV export, as in the header of analyze_trace_data_animation.py
+TRACE_COLUMNS = (
+    'Marker,Packet,Link Dir,Ord.Set Type,DLLP Type,TLP Type,Link Event,PSN,AckNak_Seq_Num,VC ID,HdrScale,HdrFC,'
+    'DataScale,DataFC,Feature Ack,Feature Support,TC,LN,TH,NW,TD,EP,Attributes,AT,Length,RequesterID,Tag,'
+    'CompleterID,Address,DeviceID,Register,1st BE,Last BE,Cpl Status,Byte Cnt,BCM,Lwr Addr,Msg Routing,'
+    'Message Code,TS Link,TS Lane,N_FTS,Training Control,TS Data Rate,TS Gen3 Eq Control,TS Gen3 Pre-Cursor,'
+    'TS Gen3 Cursor,TS Gen3 Post-Cursor,PMUX Channel ID,PMUX Metadata,Snoop,Requirement (Snoop),Scale (Snoop),'
+    'Value (Snoop),No-Snoop,Requirement (No-Snoop),Scale (No-Snoop),Value (No-Snoop),PTM Master Time[63:32],'
+    'PTM Master Time[31:0],PTM Propagation Delay,ARP Command,Slave Address,Target Address,Device Slave Address,'
+    'Assign Address,Read,Write,Byte Count,Address Type,PEC Support,UDID Version,Silicon Revision ID,Vendor ID,'
+    'Device ID,ZONE,IPMI,ASF,OEM,SMBus Version,Sub Vendor ID,Sub Device ID,Vendor Specific ID,PEC,LCRC,ECRC,'
+    'CRC 16,DATA,Time Delta,Time Stamp,Jammer Phase,Action,Jammer Target Packet,Jammer Result Packet,'
+    'CXL Pkt Type,CXL Pkt Subtype,OpCode,CQID,UQID,Address [51:6],NT,RSP_PRE,MESI,ChunkValid,Bogus,Poison,'
+    'Go-Err,MetaField,MetaValue,SnpType,LLCTRL Pkt Subtype,ALMP VLSM State,ALMP VLSM Target'
+).split(',')
+
+# Packet kinds, one row template each
+DW32_WRITE, DW2_WRITE, ACK, NAK, READ, DOWNSTREAM_WRITE = range(6)
+
+# Share of rows that are DLLPs and filtered-out TLPs; the rest are upstream MWr(64)
+ACK_FRACTION = 0.10
+NAK_FRACTION = 1e-5
+READ_FRACTION = 0.01
+DOWNSTREAM_WRITE_FRACTION = 0.01
+
+# PSNs are 12 bits on the wire
+PSN_MODULUS = 1 << 12
+
+# Time of the first packet, as in the sample rows of the real capture
+START_TIME_PS = 5_477_338_100_060
+
+# 32-DW writes stream through this many 1 MB buffers, 128 bytes per write
+DW32_STREAMS = 8
+DW32_ADDRESS_HIGH = 0x00001F00
+DW32_BUFFER_BYTES = 1 << 20
+
+# 2-DW flag writes go to a handful of addresses; their first word (big endian) starts here and drifts
+DW2_ADDRESS_HIGH = 0x00001F40
+DW2_ADDRESS_LOW = 0x42826200
+DW2_FLAG_ADDRESSES = 4
+FIRST_WORD_BASE = 0x1000
+FIRST_WORD_SPREAD = 600
+FLAG_WRITES_PER_FIRST_WORD_STEP = 64
+
+_HEX_DIGITS = np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)
+
+def parse_row_count(text):
+    """Parse a row count such as 250000, 250k, 10M or 1.5G."""
+    multipliers = {'k': 10**3, 'm': 10**6, 'g': 10**9}
+    text = text.strip().lower().replace('_', '')
+    if text and text[-1] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
+def format_row_count(n_rows):
+    """Short label of a row count: 1000000 -> '1M', 250000 -> '250k'."""
+    for suffix, size in (('G', 10**9), ('M', 10**6), ('k', 10**3)):
+        if n_rows >= size and n_rows % size == 0:
+            return f'{n_rows // size}{suffix}'
+    return str(n_rows)
+
+def _row_template(**cells):
+    """%-format template of a CSV row with the given columns filled; '%s' marks a per-row value."""
+    row = [''] * len(TRACE_COLUMNS)
+    for name, value in cells.items():
+        row[TRACE_COLUMNS.index(name)] = value
+    return ','.join(row)
+
+_TLP_CELLS = {'RequesterID': '184:00:0', 'Tag': '0', '1st BE': '1111', 'Last BE': '1111'}
+
+# Per-row values are, in column order: Packet, PSN or AckNak_Seq_Num, Address, CRC, DATA, Time Delta, Time Stamp
+TEMPLATES = {
+    DW32_WRITE: _row_template(**{'Packet': '%s', 'Link Dir': 'Upstream', 'TLP Type': 'MWr(64)', 'PSN': '%s',
+                                 'Length': '32', 'Address': '%s', 'LCRC': '%s', 'DATA': '%s', 'Time Delta': '%s',
+                                 'Time Stamp': '%s', **_TLP_CELLS}),
+    DW2_WRITE: _row_template(**{'Packet': '%s', 'Link Dir': 'Upstream', 'TLP Type': 'MWr(64)', 'PSN': '%s',
+                                'Length': '2', 'Address': '%s', 'LCRC': '%s', 'DATA': '%s', 'Time Delta': '%s',
+                                'Time Stamp': '%s', **_TLP_CELLS}),
+    ACK: _row_template(**{'Packet': '%s', 'Link Dir': 'Downstream', 'DLLP Type': 'ACK', 'AckNak_Seq_Num': '%s',
+                          'CRC 16': '%s', 'Time Delta': '%s', 'Time Stamp': '%s'}),
+    NAK: _row_template(**{'Packet': '%s', 'Link Dir': 'Downstream', 'DLLP Type': 'NAK', 'AckNak_Seq_Num': '%s',
+                          'CRC 16': '%s', 'Time Delta': '%s', 'Time Stamp': '%s'}),
+    READ: _row_template(**{'Packet': '%s', 'Link Dir': 'Upstream', 'TLP Type': 'MRd(64)', 'PSN': '%s',
+                           'Length': '32', 'Address': '%s', 'LCRC': '%s', 'Time Delta': '%s', 'Time Stamp': '%s',
+                           **_TLP_CELLS}),
+    DOWNSTREAM_WRITE: _row_template(**{'Packet': '%s', 'Link Dir': 'Downstream', 'TLP Type': 'MWr(64)', 'PSN': '%s',
+                                       'Length': '2', 'Address': '%s', 'LCRC': '%s', 'DATA': '%s',
+                                       'Time Delta': '%s', 'Time Stamp': '%s', **_TLP_CELLS}),
+}
+
+# Mean gap before each kind of packet in picoseconds; a few 32-DW writes also follow an idle period
+MEAN_GAP_PS = {DW32_WRITE: 2_000, DW2_WRITE: 1_500, ACK: 2_500, NAK: 2_500, READ: 1_500, DOWNSTREAM_WRITE: 1_500}
+MIN_GAP_PS = 900
+IDLE_PROBABILITY = 0.002
+MEAN_IDLE_PS = 200_000
+
+def hex_dwords(words):
+    """Format an (n, k) uint32 array as the analyzer's DATA text: k upper-case hex dwords, each followed by a space."""
+    n_rows, n_words = words.shape
+    shifts = np.arange(28, -4, -4, dtype=np.uint32)
+    digits = np.empty((n_rows, n_words, 9), dtype=np.uint8)
+    digits[:, :, :8] = _HEX_DIGITS[(words[:, :, None] >> shifts) & 0xF]
+    digits[:, :, 8] = ord(' ')
+    return digits.reshape(n_rows, n_words * 9).view(f'S{n_words * 9}').ravel().astype(str).tolist()
+
+class SyntheticTrace:
+    """Generates the rows of a synthetic trace a chunk at a time, carrying time, PSN and address state over."""
+
+    def __init__(self, seed=0, dw2_fraction=0.25):
+        self.rng = np.random.default_rng(seed)
+        self.dw2_fraction = dw2_fraction
+        self.packet = 0
+        self.time_ps = START_TIME_PS
+        self.upstream_psn = 0       # unwrapped; the next upstream TLP gets this PSN
+        self.downstream_psn = 0
+        self.acked_psn = -1         # unwrapped; highest PSN acknowledged so far
+        self.stream_writes = np.zeros(DW32_STREAMS, dtype=np.int64)
+        self.flag_writes = 0
+
+    def _kinds(self, n_rows):
+        mwr_fraction = 1 - ACK_FRACTION - NAK_FRACTION - READ_FRACTION - DOWNSTREAM_WRITE_FRACTION
+        probabilities = {
+            DW32_WRITE: mwr_fraction * (1 - self.dw2_fraction), DW2_WRITE: mwr_fraction * self.dw2_fraction,
+            ACK: ACK_FRACTION, NAK: NAK_FRACTION, READ: READ_FRACTION, DOWNSTREAM_WRITE: DOWNSTREAM_WRITE_FRACTION
+        }
+        return self.rng.choice(list(probabilities), size=n_rows, p=list(probabilities.values())).astype(np.int8)
+
+    def chunk(self, n_rows):
+        """Return the next n_rows CSV lines (without newlines), in time order."""
+        rng = self.rng
+        kinds = self._kinds(n_rows)
+        mean_gaps = np.array([MEAN_GAP_PS[kind] for kind in range(len(MEAN_GAP_PS))], dtype=np.float64)
+        gaps = MIN_GAP_PS + rng.exponential(mean_gaps[kinds] - MIN_GAP_PS)
+        idle = (kinds == DW32_WRITE) & (rng.random(n_rows) < IDLE_PROBABILITY)
+        gaps[idle] += rng.exponential(MEAN_IDLE_PS, size=int(idle.sum()))
+        gaps = np.rint(gaps).astype(np.int64)
+        gaps[0] = 0 if self.packet == 0 else gaps[0]
+        times = self.time_ps + np.cumsum(gaps)
+        self.time_ps = int(times[-1])
+        packets = np.arange(self.packet, self.packet + n_rows)
+        self.packet += n_rows
+
+        seconds, fraction = np.divmod(times, 10**12)
+        time_stamps = [f'{s:04d}.{f:012d}s' for s, f in zip(seconds.tolist(), fraction.tolist())]
+        time_deltas = [f'{gap / 1000:.3f} ns' for gap in gaps.tolist()]
+
+        # Upstream TLPs take consecutive PSNs; each ACK acknowledges everything up to a few TLPs before it
+        upstream = (kinds == DW32_WRITE) | (kinds == DW2_WRITE) | (kinds == READ)
+        psns = self.upstream_psn + np.cumsum(upstream) - 1
+        self.upstream_psn += int(upstream.sum())
+        downstream_psns = self.downstream_psn + np.cumsum(kinds == DOWNSTREAM_WRITE) - 1
+        self.downstream_psn += int((kinds == DOWNSTREAM_WRITE).sum())
+        dllp = (kinds == ACK) | (kinds == NAK)
+        ack_lag = rng.integers(0, 4, size=n_rows)
+        ack_psns = np.maximum.accumulate(np.maximum(np.where(dllp, psns - ack_lag, -1), self.acked_psn))
+        self.acked_psn = int(ack_psns[-1])
+        sequence_numbers = np.where(upstream, psns, np.where(kinds == DOWNSTREAM_WRITE, downstream_psns, ack_psns))
+        sequence_numbers = np.mod(sequence_numbers, PSN_MODULUS).tolist()
+
+        # 32-DW writes advance through their buffer 128 bytes at a time
+        addresses = np.zeros(n_rows, dtype=np.int64)
+        dw32 = kinds == DW32_WRITE
+        streams = rng.integers(0, DW32_STREAMS, size=int(dw32.sum()))
+        stream_index = np.zeros((len(streams), DW32_STREAMS), dtype=np.int64)
+        stream_index[np.arange(len(streams)), streams] = 1
+        stream_index = np.cumsum(stream_index, axis=0)[np.arange(len(streams)), streams] - 1
+        offsets = ((self.stream_writes[streams] + stream_index) * 128) % DW32_BUFFER_BYTES
+        addresses[dw32] = streams * DW32_BUFFER_BYTES + offsets
+        self.stream_writes += np.bincount(streams, minlength=DW32_STREAMS)
+        dw2 = (kinds == DW2_WRITE) | (kinds == DOWNSTREAM_WRITE)
+        addresses[dw2] = DW2_ADDRESS_LOW + 0x40 * rng.integers(0, DW2_FLAG_ADDRESSES, size=int(dw2.sum()))
+        addresses[kinds == READ] = rng.integers(0, DW32_BUFFER_BYTES // 128, size=int((kinds == READ).sum())) * 128
+        address_high = np.where(dw2, DW2_ADDRESS_HIGH, DW32_ADDRESS_HIGH)
+        address_text = [f'{high:08X}:{low:08X}' for high, low in zip(address_high.tolist(), addresses.tolist())]
+
+        crcs = rng.integers(0, 1 << 32, size=n_rows, dtype=np.uint64)
+        crc_text = [f'0x{crc:08X}' if kind not in (ACK, NAK) else f'0x{crc & 0xFFFF:04X}'
+                    for kind, crc in zip(kinds.tolist(), crcs.tolist())]
+
+        # Payloads: random 32-DW data; the 2-DW flags carry a slowly rising first word, stored little endian
+        data = [''] * n_rows
+        dw32_rows = np.flatnonzero(dw32)
+        for row, text in zip(dw32_rows.tolist(), hex_dwords(rng.integers(0, 1 << 32, size=(len(dw32_rows), 32),
+                                                                         dtype=np.uint32))):
+            data[row] = text
+        dw2_rows = np.flatnonzero(dw2)
+        flag_index = self.flag_writes + np.arange(len(dw2_rows))
+        self.flag_writes += len(dw2_rows)
+        first_word = (FIRST_WORD_BASE + flag_index // FLAG_WRITES_PER_FIRST_WORD_STEP
+                      + rng.integers(0, FIRST_WORD_SPREAD, size=len(dw2_rows))) & 0xFFFF
+        first_word_le = ((first_word & 0xFF) << 8) | (first_word >> 8)
+        flag_words = np.stack([first_word_le << 16, np.full(len(dw2_rows), 0x1C000000)], axis=1).astype(np.uint32)
+        for row, text in zip(dw2_rows.tolist(), hex_dwords(flag_words)):
+            data[row] = text
+
+        lines = []
+        for kind, packet, sequence, address, crc, payload, delta, stamp in zip(
+                kinds.tolist(), packets.tolist(), sequence_numbers, address_text, crc_text, data, time_deltas,
+                time_stamps):
+            if kind in (ACK, NAK):
+                lines.append(TEMPLATES[kind] % (packet, sequence, crc, delta, stamp))
+            elif kind == READ:
+                lines.append(TEMPLATES[kind] % (packet, sequence, address, crc, delta, stamp))
+            else:
+                lines.append(TEMPLATES[kind] % (packet, sequence, address, crc, payload, delta, stamp))
+        return lines
+
+def generate_trace(output_path, n_rows, seed=0, dw2_fraction=0.25, chunk_rows=100_000, quiet=False):
+    """Write an n_rows synthetic trace CSV to output_path; returns output_path."""
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    trace = SyntheticTrace(seed=seed, dw2_fraction=dw2_fraction)
+    start_time = time.perf_counter()
+    written = 0
+    next_report = 0.1
+    # Write to a temporary name so an interrupted run never leaves a truncated trace behind
+    partial_path = output_path + '.partial'
+    with open(partial_path, 'w', encoding='ascii', newline='\n', buffering=1 << 22) as f:
+        f.write(','.join(TRACE_COLUMNS) + '\n')
+        while written < n_rows:
+            lines = trace.chunk(min(chunk_rows, n_rows - written))
+            if written == 0:
+                lines[0] = 'Marker' + lines[0]
+            f.write('\n'.join(lines))
+            f.write('\n')
+            written += len(lines)
+            if not quiet and written >= next_report * n_rows:
+                elapsed = time.perf_counter() - start_time
+                print(f"  {written:,} / {n_rows:,} rows ({written / elapsed:,.0f} rows/s)")
+                next_report += 0.1
+    os.replace(partial_path, output_path)
+    if not quiet:
+        print(f"Wrote {n_rows:,} rows ({os.path.getsize(output_path) / 2**20:,.1f} MB) to {output_path} "
+              f"in {time.perf_counter() - start_time:.1f}s")
+    return output_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a synthetic PCIe trace CSV in the protocol analyzer schema.')
+    parser.add_argument('--rows', type=parse_row_count, default=parse_row_count('1M'),
+                        help='number of rows (packets), e.g. 250k, 1M, 10M, 100M (default: 1M)')
+    parser.add_argument('--output', help='CSV to write (default: synthetic_<rows>_seed<seed>.csv)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: %(default)s)')
+    parser.add_argument('--dw2-fraction', type=float, default=0.25,
+                        help='share of the upstream MWr(64) packets that are 2-DW flag writes (default: %(default)s)')
+    parser.add_argument('--chunk-rows', type=int, default=100_000, help='rows generated per chunk (default: %(default)s)')
+    args = parser.parse_args(argv)
+    if not 0 <= args.dw2_fraction <= 1:
+        parser.error('--dw2-fraction must be between 0 and 1')
+    output = args.output or f'synthetic_{format_row_count(args.rows)}_seed{args.seed}.csv'
+    generate_trace(output, args.rows, seed=args.seed, dw2_fraction=args.dw2_fraction, chunk_rows=args.chunk_rows)
+
+if __name__ == '__main__':
+    sys.exit(main())